@@ -2,6 +2,11 @@ import math
 import sys
 import pygame
 
+from grid_sim.astar import astar
+from grid_sim.entities import Wall
+from grid_sim.grid import Grid
+from grid_sim.smoothing import blocked_mask, smooth_path, waypoints_to_pixels
+
 
 # Config stuff
 WIDTH = 1000
@@ -19,6 +24,12 @@ TARGET_COLOR = (255, 220, 120)
 ENTITY_RADIUS = 14
 ENTITY_SPEED_PX_PER_SEC = 220.0  # Movement speed
 
+# Demo map: a 30x30 grid drawn at 20 px per cell on the left of the window
+DEMO_CELL_SIZE = 20
+WALL_COLOR = (70, 70, 90)
+DEMO_START = (3, 24)
+DEMO_END = (26, 4)
+
 
 # Helper functions
 def vec2(x, y) -> pygame.Vector2:
@@ -40,6 +51,24 @@ def move_toward(current: pygame.Vector2, target: pygame.Vector2, max_step: float
     return current + to_target.normalize() * max_step
 
 
+def build_demo_route():
+    """
+    Lays out a few walls, plans a grid path across them and smooths it to
+    any-angle waypoints. Returns (grid, grid path cells, pixel waypoints).
+    """
+    grid = Grid()
+    for y in range(6, 30):
+        grid.add_entity(Wall(10, y))
+    for y in range(0, 22):
+        grid.add_entity(Wall(19, y))
+    for x in range(11, 16):
+        grid.add_entity(Wall(x, 12))
+
+    cells = astar(grid, DEMO_START, DEMO_END)
+    waypoints = smooth_path(blocked_mask(grid), cells)
+    return grid, cells, [vec2(x, y) for x, y in waypoints_to_pixels(waypoints, DEMO_CELL_SIZE)]
+
+
 # Main block, this will be split into different classes soon
 def main():
     pygame.init()
@@ -48,15 +77,9 @@ def main():
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    # List of waypoints and an end point. Path is fixed
-    path = [
-        vec2(120, 450),
-        vec2(200, 180),
-        vec2(420, 160),
-        vec2(650, 260),
-        vec2(820, 120),
-        vec2(880, 420),  # end point
-    ]
+    # Waypoints from a planned grid path, smoothed so the follower only
+    # turns where a wall forces it to
+    grid, grid_cells, path = build_demo_route()
 
     start_pos = path[0]
     end_pos = path[-1]
@@ -105,6 +128,11 @@ def main():
         # Rendering BS
         screen.fill(BG_COLOR)
 
+        for (wx, wy), entity in grid.entities.items():
+            if entity.blocking:
+                rect = (wx * DEMO_CELL_SIZE, wy * DEMO_CELL_SIZE, DEMO_CELL_SIZE, DEMO_CELL_SIZE)
+                pygame.draw.rect(screen, WALL_COLOR, rect)
+
         # Drawing path lines
         pygame.draw.lines(screen, PATH_COLOR, False, [(p.x, p.y) for p in path], 4)
 
@@ -129,6 +157,7 @@ def main():
         hud_lines = [
             f"Status: {status}",
             f"Waypoint: {waypoint_index}/{len(path)-1}   (End: {int(end_pos.x)}, {int(end_pos.y)})",
+            f"Grid path: {len(grid_cells)} cells -> {len(path)} waypoints",
             "Controls: SPACE = pause/resume, R = reset, ESC = quit",
         ]
         y = 10
@@ -0,0 +1,90 @@
+"""
+benchmarks/alt_vs_manhattan.py
+
+Measures ALT landmark heuristics (landmarks.LandmarkSet) against plain
+Manhattan-distance A* on generated noise maps with Forest and Water
+sprinkled in: the one-off preprocessing cost per map and the node
+expansions and wall time per query.
+
+Run from the repository root:
+    python -m benchmarks.alt_vs_manhattan
+    python -m benchmarks.alt_vs_manhattan --sizes 128 --landmarks 4 8 16
+"""
+
+import argparse
+import random
+import time
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.landmarks import LandmarkSet
+
+from .jps_vs_astar import generated_costs
+
+
+def run(size: int, landmark_count: int, queries: int, terrain_share: float, seed: int):
+    rng = random.Random(seed)
+    costs = generated_costs(size, terrain_share, rng)
+    cost = costs.__getitem__
+    free = [(i % size, i // size) for i, c in enumerate(costs) if c != BLOCKED]
+
+    t0 = time.perf_counter()
+    landmarks = LandmarkSet.select(size, size, costs, landmark_count, seed=seed)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    totals = {"manhattan": [0, 0.0], "alt": [0, 0.0]}
+    solved = 0
+    for _ in range(queries):
+        start, goal = rng.sample(free, 2)
+
+        t0 = time.perf_counter()
+        plain = search(size, size, cost, start, goal)
+        t1 = time.perf_counter()
+        guided = search(size, size, cost, start, goal, landmarks.heuristic(goal, start=start))
+        t2 = time.perf_counter()
+
+        if plain.found != guided.found or (plain.found and abs(plain.cost - guided.cost) > 1e-9):
+            raise AssertionError(f"ALT disagrees with A* for {start} -> {goal}")
+        if not plain.found:
+            continue
+        solved += 1
+        totals["manhattan"][0] += plain.expanded
+        totals["manhattan"][1] += t1 - t0
+        totals["alt"][0] += guided.expanded
+        totals["alt"][1] += t2 - t1
+
+    if not solved:
+        print(f"{size:>5}  no connected queries")
+        return
+    m_nodes, m_time = totals["manhattan"]
+    a_nodes, a_time = totals["alt"]
+    saved = m_time - a_time
+    break_even = f"{build_ms / (saved / solved * 1000):.0f}" if saved > 0 else "never"
+    print(
+        f"{size:>5} {terrain_share:>8.2f} {landmark_count:>4} {build_ms:>9.0f}"
+        f" {m_nodes / solved:>10.0f} {a_nodes / solved:>9.0f}"
+        f" {m_time / solved * 1000:>8.2f} {a_time / solved * 1000:>8.2f}"
+        f" {m_time / a_time if a_time else 0:>7.2f}x {break_even:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--landmarks", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--terrain", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("Preprocessing is the one-off landmark build per map; nodes and ms are")
+    print("means per query; break-even is the number of queries that pays for it.")
+    print(f"{'size':>5} {'terrain':>8} {'K':>4} {'prep ms':>9} {'Manh nodes':>10} {'ALT nodes':>9}"
+          f" {'Manh ms':>8} {'ALT ms':>8} {'speedup':>8} {'break-even':>10}")
+    for size in args.sizes:
+        for share in args.terrain:
+            for count in args.landmarks:
+                run(size, count, args.queries, share, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+benchmarks/jps_vs_astar.py
+
+Compares plain A* (astar.search) with Jump Point Search, both the scanning
+version (jps.jps_search) and JPS+ with a precomputed jump table
+(jps.jps_plus_search), on maps generated the same way as generation.generate_walls: fractal
+Perlin noise thresholded into walls, with an optional share of Forest and
+Water cells sprinkled over the open ground.
+
+Run from the repository root:
+    python -m benchmarks.jps_vs_astar
+    python -m benchmarks.jps_vs_astar --sizes 64 128 --queries 50 --terrain 0.1
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from perlin_numpy import generate_fractal_noise_2d
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.generation import NOISE_RES, OCTAVES, PERSISTENCE, WALL_THRESHOLD
+from grid_sim.jps import JumpTable, jps_plus_search, jps_search
+from grid_sim.terrain import FOREST_COST_MULTIPLIER, WATER_COST_MULTIPLIER
+
+
+def generated_costs(size: int, terrain_share: float, rng: random.Random):
+    """Flat cost list for a size x size noise map."""
+    factor = NOISE_RES[0] * (2 ** (OCTAVES - 1))
+    padded = ((size + factor - 1) // factor) * factor
+    np.random.seed(rng.randrange(2 ** 32))
+    noise = generate_fractal_noise_2d(
+        shape=(padded, padded),
+        res=NOISE_RES,
+        octaves=OCTAVES,
+        persistence=PERSISTENCE,
+    )[:size, :size]
+
+    costs = []
+    for value in noise.ravel():
+        if value > WALL_THRESHOLD:
+            costs.append(BLOCKED)
+        elif rng.random() < terrain_share:
+            costs.append(rng.choice((FOREST_COST_MULTIPLIER, WATER_COST_MULTIPLIER)))
+        else:
+            costs.append(1.0)
+    return costs
+
+
+def run(size: int, queries: int, terrain_share: float, seed: int):
+    rng = random.Random(seed)
+    costs = generated_costs(size, terrain_share, rng)
+    cost = costs.__getitem__
+    free = [(i % size, i // size) for i, c in enumerate(costs) if c != BLOCKED]
+
+    t0 = time.perf_counter()
+    table = JumpTable(size, size, cost)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    totals = {"astar": [0, 0.0], "jps": [0, 0.0], "jps+": [0, 0.0]}
+    solved = 0
+    for _ in range(queries):
+        start, goal = rng.sample(free, 2)
+
+        t0 = time.perf_counter()
+        plain = search(size, size, cost, start, goal)
+        t1 = time.perf_counter()
+        jumped = jps_search(size, size, cost, start, goal)
+        t2 = time.perf_counter()
+        tabled = jps_plus_search(table, cost, start, goal)
+        t3 = time.perf_counter()
+
+        for other in (jumped, tabled):
+            if plain.found != other.found or (plain.found and abs(plain.cost - other.cost) > 1e-9):
+                raise AssertionError(f"JPS disagrees with A* for {start} -> {goal}")
+        if not plain.found:
+            continue
+        solved += 1
+        for name, result, elapsed in (("astar", plain, t1 - t0), ("jps", jumped, t2 - t1), ("jps+", tabled, t3 - t2)):
+            totals[name][0] += result.expanded
+            totals[name][1] += elapsed
+
+    if not solved:
+        print(f"{size:>5}  no connected queries")
+        return
+    a_nodes, a_time = totals["astar"]
+    j_nodes, j_time = totals["jps"]
+    p_nodes, p_time = totals["jps+"]
+    print(
+        f"{size:>5} {terrain_share:>8.2f} {solved:>6}"
+        f" {a_nodes / solved:>9.0f} {j_nodes / solved:>9.0f} {p_nodes / solved:>9.0f}"
+        f" {a_time / solved * 1000:>8.2f} {j_time / solved * 1000:>8.2f} {p_time / solved * 1000:>8.2f}"
+        f" {build_ms:>9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--terrain", type=float, nargs="+", default=[0.0, 0.05, 0.2])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("Nodes are expansions per query, times are mean ms per query;")
+    print("table is the one-off JPS+ preprocessing time in ms.")
+    print(f"{'size':>5} {'terrain':>8} {'paths':>6} {'A* nodes':>9} {'JPS':>9} {'JPS+':>9}"
+          f" {'A* ms':>8} {'JPS':>8} {'JPS+':>8} {'table ms':>9}")
+    for size in args.sizes:
+        for share in args.terrain:
+            run(size, args.queries, share, args.seed)
+
+
+if __name__ == "__main__":
+    main()
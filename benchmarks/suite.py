@@ -0,0 +1,364 @@
+"""
+benchmarks/suite.py
+
+Regression benchmark for every single-agent planner: plain A*, ALT, JPS,
+JPS+, HPA*, bidirectional A* and ARA*, on seeded generated maps at several
+sizes and on every stored mission (map_storage.list_custom_missions).
+For each map and planner it reports the one-off preprocessing cost, and
+per query the wall time, nodes expanded, peak Python memory (tracemalloc)
+and path cost, and can write it all as JSON to diff between versions.
+
+Generated maps go through the same pipeline as a random game world, at
+the requested size: generation.generate_walls followed by
+Grid.rand_gen_water, rand_gen_barriers and rand_gen_forest, with their
+feature counts scaled to the map's area.
+
+Queries are fixed per map: start/goal pairs drawn with the suite seed
+from cells in the same connected component, so every planner answers the
+same questions on every run. Mission maps also route every movable spawn
+to the objective zone centre.
+
+Timing and memory come from separate passes, so tracemalloc overhead never
+shows up in the times.
+
+Run from the repository root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 30 90 --queries 20 --json results.json
+    python -m benchmarks.suite --json new.json --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from grid_sim.astar import BLOCKED, Point, search
+from grid_sim.config import GRID_WIDTH
+from grid_sim.cost_model import CostMap, cost_map_for
+from grid_sim.generation import generate_walls, scaled_feature_count
+from grid_sim.grid import Grid
+from grid_sim.hpa import HierarchicalMap
+from grid_sim.jps import JumpTable, jps_plus_search, jps_search
+from grid_sim.landmarks import LandmarkSet
+from grid_sim.map_runtime import build_runtime_world
+from grid_sim.map_storage import list_custom_missions, load_custom_mission
+from grid_sim.metrics import Zone
+from grid_sim.planner import MODE_ANYTIME, MODE_BIDIRECTIONAL, plan_path
+from grid_sim.wavefront import label_components
+
+# Planners checked against plain A* for optimality; HPA* only promises
+# near-optimal routes, so its cost ratio is reported instead
+EXACT_PLANNERS = ("alt", "jps", "jps+", "bidirectional", "ara*")
+
+# Relative slowdown in mean ms (or growth in expansions) that --compare
+# reports as a regression
+DEFAULT_TOLERANCE = 0.15
+
+# One query: returns (path found, path cost, nodes expanded)
+Query = Callable[[Point, Point], Tuple[bool, float, int]]
+
+
+# ──────────────────────────────────────────────
+# MAPS
+# ──────────────────────────────────────────────
+
+def generated_map(size: int, seed: int) -> CostMap:
+    """A random size x size game world (walls, water, barriers, forest) as a CostMap."""
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    grid = Grid(size, size)
+    start_zone = Zone("Start", x=1, y=1, width=4, height=4)
+    dest_zone = Zone("Objective", x=size - 6, y=size - 6, width=4, height=4)
+    generate_walls(grid, start_zone, dest_zone, [(start_zone.x + 2, start_zone.y + 2)])
+    grid.rand_gen_water(body_count=scaled_feature_count(3, size, size))
+    grid.rand_gen_barriers(count=scaled_feature_count(15, size, size))
+    grid.rand_gen_forest(patch_count=scaled_feature_count(4, size, size))
+    return cost_map_for(grid)
+
+
+def mission_maps() -> List[Tuple[str, CostMap, List[Tuple[Point, Point]]]]:
+    """(title, cost map, spawn -> objective centre queries) per stored mission."""
+    maps = []
+    for mission in list_custom_missions():
+        try:
+            world = build_runtime_world(load_custom_mission(mission["path"]))
+        except (ValueError, KeyError, TypeError) as exc:
+            print(f"skipping mission {mission['title']!r}: {exc}", file=sys.stderr)
+            continue
+        zone = world.dest_zone
+        goal = (zone.x + zone.width // 2, zone.y + zone.height // 2)
+        spawns = [((m.x_pos, m.y_pos), goal) for m in world.movables]
+        maps.append((str(mission["title"]), cost_map_for(world.grid), spawns))
+    return maps
+
+
+def query_pairs(cost_map: CostMap, count: int, rng: random.Random) -> List[Tuple[Point, Point]]:
+    """count start/goal pairs, each inside one connected component."""
+    width = cost_map.width
+    passable = np.array([m != BLOCKED for m in cost_map.modifiers]).reshape(cost_map.height, width)
+    labels, components = label_components(passable)
+    members: Dict[int, List[Point]] = {}
+    for index, label in enumerate(labels.ravel().tolist()):
+        if label >= 0:
+            members.setdefault(label, []).append((index % width, index // width))
+    # Weight components by size so queries land where most of the map is
+    pool = [cells for cells in members.values() if len(cells) > 1]
+    if not pool:
+        return []
+    weights = [len(cells) for cells in pool]
+    pairs = []
+    for _ in range(count):
+        cells = rng.choices(pool, weights)[0]
+        pairs.append(tuple(rng.sample(cells, 2)))
+    return pairs
+
+
+# ──────────────────────────────────────────────
+# PLANNERS
+# ──────────────────────────────────────────────
+
+def planners(cost_map: CostMap, seed: int) -> Dict[str, Callable[[], Query]]:
+    """
+    Name -> setup function per planner. Calling the setup does the
+    planner's preprocessing and returns its query function.
+    """
+    width = cost_map.width
+    height = cost_map.height
+    costs = cost_map.step_costs()
+    cost = costs.__getitem__
+
+    def astar():
+        def query(start, goal):
+            result = search(width, height, cost, start, goal)
+            return result.found, result.cost, result.expanded
+        return query
+
+    def alt():
+        landmarks = LandmarkSet.select(width, height, costs, 8, seed=seed)
+
+        def query(start, goal):
+            result = search(width, height, cost, start, goal, landmarks.heuristic(goal, start=start))
+            return result.found, result.cost, result.expanded
+        return query
+
+    def jps():
+        def query(start, goal):
+            result = jps_search(width, height, cost, start, goal)
+            return result.found, result.cost, result.expanded
+        return query
+
+    def jps_plus():
+        table = JumpTable(width, height, cost)
+
+        def query(start, goal):
+            result = jps_plus_search(table, cost, start, goal)
+            return result.found, result.cost, result.expanded
+        return query
+
+    def hpa():
+        hierarchy = HierarchicalMap(width, height, costs)
+
+        def query(start, goal):
+            route = hierarchy.find_path(start, goal)
+            if route is None or route.cells() is None:
+                return False, BLOCKED, 0 if route is None else route.expanded
+            return True, route.cost, route.expanded
+        return query
+
+    def by_mode(mode):
+        def setup():
+            def query(start, goal):
+                result = plan_path(width, height, cost, start, goal, mode)
+                return result.found, result.cost, result.expanded
+            return query
+        return setup
+
+    return {
+        "astar": astar,
+        "alt": alt,
+        "jps": jps,
+        "jps+": jps_plus,
+        "hpa": hpa,
+        "bidirectional": by_mode(MODE_BIDIRECTIONAL),
+        "ara*": by_mode(MODE_ANYTIME),
+    }
+
+
+# ──────────────────────────────────────────────
+# MEASUREMENT
+# ──────────────────────────────────────────────
+
+def _peak_kb(run: Callable[[], object]) -> Tuple[object, float]:
+    tracemalloc.start()
+    try:
+        value = run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return value, peak / 1024.0
+
+
+def measure(setup: Callable[[], Query], pairs: List[Tuple[Point, Point]]) -> dict:
+    """Preprocessing and per-query numbers for one planner on one map."""
+    t0 = time.perf_counter()
+    query = setup()
+    prep_ms = (time.perf_counter() - t0) * 1000.0
+    _, prep_peak_kb = _peak_kb(setup)
+
+    times = []
+    outcomes = []
+    for start, goal in pairs:
+        t0 = time.perf_counter()
+        outcomes.append(query(start, goal))
+        times.append((time.perf_counter() - t0) * 1000.0)
+
+    peak_kb = 0.0
+    for start, goal in pairs:
+        _, peak = _peak_kb(lambda: query(start, goal))
+        peak_kb = max(peak_kb, peak)
+
+    found = [(cost, expanded) for ok, cost, expanded in outcomes if ok]
+    return {
+        "queries": len(pairs),
+        "found": len(found),
+        "prep_ms": round(prep_ms, 3),
+        "prep_peak_kb": round(prep_peak_kb, 1),
+        "mean_ms": round(statistics.fmean(times), 4) if times else 0.0,
+        "p50_ms": round(statistics.median(times), 4) if times else 0.0,
+        "max_ms": round(max(times), 4) if times else 0.0,
+        "mean_expanded": round(statistics.fmean(e for _, e in found), 1) if found else 0.0,
+        "peak_kb": round(peak_kb, 1),
+        "total_cost": round(sum(c for c, _ in found), 6),
+        "costs": [cost if ok else None for ok, cost, _ in outcomes],
+    }
+
+
+def run_map(name: str, source: str, cost_map: CostMap, pairs, names: List[str], seed: int) -> List[dict]:
+    setups = planners(cost_map, seed)
+    rows = []
+    reference = None
+    for planner in names:
+        stats = measure(setups[planner], pairs)
+        costs = stats.pop("costs")
+        if planner == "astar":
+            reference = costs
+        elif reference is not None:
+            ratios = [c / r for c, r in zip(costs, reference) if c is not None and r]
+            stats["cost_ratio"] = round(statistics.fmean(ratios), 4) if ratios else None
+            if planner in EXACT_PLANNERS and any(
+                (c is None) != (r is None) or (c is not None and abs(c - r) > 1e-6)
+                for c, r in zip(costs, reference)
+            ):
+                raise AssertionError(f"{planner} disagrees with A* on {name}")
+        rows.append({"map": name, "source": source, "size": [cost_map.width, cost_map.height], "planner": planner, **stats})
+    return rows
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(rows: List[dict], baseline_path: str, tolerance: float) -> int:
+    """Prints changes against a saved run and returns the regression count."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {(r["map"], r["planner"]): r for r in json.load(fh)["results"]}
+
+    print(f"\nAgainst {baseline_path} (regression = more than {tolerance:.0%} worse):")
+    print(f"{'map':<28} {'planner':<14} {'ms':>8} {'nodes':>8} {'cost':>8}")
+    regressions = 0
+    for row in rows:
+        old = baseline.get((row["map"], row["planner"]))
+        if old is None:
+            continue
+        changes = []
+        flagged = False
+        for key in ("mean_ms", "mean_expanded", "total_cost"):
+            before, after = old[key], row[key]
+            ratio = after / before if before else 1.0
+            changes.append(f"{ratio:>7.2f}x")
+            if key != "mean_ms" or before >= 0.05:  # sub-50us timings are noise
+                flagged |= ratio > 1.0 + tolerance
+        regressions += flagged
+        print(f"{row['map']:<28} {row['planner']:<14} {' '.join(changes)}{'  REGRESSION' if flagged else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[GRID_WIDTH, 90, 180])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--planners", nargs="+", default=None, help="subset of planners (astar is always run)")
+    parser.add_argument("--no-missions", action="store_true", help="skip the stored missions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier --json output to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    names = list(planners(CostMap(1, 1, [1.0]), args.seed))
+    if args.planners:
+        unknown = set(args.planners) - set(names)
+        if unknown:
+            parser.error(f"unknown planners: {', '.join(sorted(unknown))}")
+        names = ["astar"] + [n for n in names if n in args.planners and n != "astar"]
+
+    rng = random.Random(args.seed)
+    maps = []
+    for size in args.sizes:
+        cost_map = generated_map(size, args.seed + size)
+        maps.append((f"generated-{size}", "generated", cost_map, query_pairs(cost_map, args.queries, rng)))
+    if not args.no_missions:
+        for title, cost_map, spawns in mission_maps():
+            maps.append((title, "mission", cost_map, spawns + query_pairs(cost_map, args.queries, rng)))
+
+    print("Times are ms per query (mean / max), nodes are mean expansions, peak is")
+    print("the largest tracemalloc peak of one query; prep is the one-off setup.")
+    print(f"{'map':<28} {'planner':<14} {'found':>7} {'prep ms':>8} {'mean ms':>8} {'max ms':>8}"
+          f" {'nodes':>8} {'peak KB':>8} {'cost':>10} {'ratio':>6}")
+    rows = []
+    for name, source, cost_map, pairs in maps:
+        for row in run_map(name, source, cost_map, pairs, names, args.seed):
+            rows.append(row)
+            ratio = row.get("cost_ratio")
+            print(
+                f"{name[:28]:<28} {row['planner']:<14} {row['found']:>3}/{row['queries']:<3}"
+                f" {row['prep_ms']:>8.1f} {row['mean_ms']:>8.2f} {row['max_ms']:>8.2f}"
+                f" {row['mean_expanded']:>8.0f} {row['peak_kb']:>8.1f} {row['total_cost']:>10.1f}"
+                f" {'' if ratio is None else f'{ratio:.3f}':>6}"
+            )
+
+    if args.json:
+        payload = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+            },
+            "results": rows,
+        }
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+        print(f"\nWrote {len(rows)} results to {args.json}")
+
+    if args.compare and compare(rows, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+grid_sim/assignment.py
+
+Minimum-cost matching of movables to objective cells.
+
+Handing out objective cells at random often sends an entity to the far
+corner of the zone while a team-mate crosses its path to the near one.
+Here the true route cost between every agent and every objective is
+computed and the assignment with the lowest total is chosen.
+
+    path_cost_matrix    - agents x objectives route costs, in fuel
+                          (terrain multipliers times each agent's
+                          fuel_per_step) or in steps
+    min_cost_assignment - the Hungarian method (Jonker-Volgenant shortest
+                          augmenting paths), O(n^2 m) with the inner loop
+                          over columns vectorized in NumPy
+    assign_objectives   - both together
+
+The matrix needs the cost-to-go field of every objective; one field
+prices every agent at once, and wavefront.cost_to_go_many computes all of
+them in a single batched NumPy pass.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .astar import BLOCKED, Point
+from .cost_model import MINIMISE_FUEL, MINIMISE_STEPS, CostMap
+from .wavefront import cost_to_go_many
+
+
+def path_cost_matrix(
+    cost_map: CostMap,
+    starts: Sequence[Point],
+    goals: Sequence[Point],
+    fuel_scales: Optional[Sequence[float]] = None,
+    minimise: str = MINIMISE_FUEL,
+) -> np.ndarray:
+    """
+    (len(starts), len(goals)) array of cheapest route costs, BLOCKED
+    (inf) where a goal cannot be reached. fuel_scales are the agents'
+    fuel_per_step (1.0 each by default); routes scale linearly with them,
+    so one cost-to-go field per objective serves every agent.
+    """
+    if minimise == MINIMISE_STEPS:
+        modifiers = cost_map.unit_costs()
+    elif minimise == MINIMISE_FUEL:
+        modifiers = cost_map.modifiers
+    else:
+        raise ValueError(f"Unknown minimise mode: {minimise}")
+
+    if not starts or not goals:
+        return np.full((len(starts), len(goals)), BLOCKED)
+    costs = np.asarray(modifiers, dtype=float).reshape(cost_map.height, cost_map.width)
+    xs = np.array([x for x, _ in starts])
+    ys = np.array([y for _, y in starts])
+    # (goals, height, width): every goal's cost-to-go field in one batch
+    matrix = cost_to_go_many(costs, goals)[:, ys, xs].T.copy()
+
+    if fuel_scales is not None and minimise == MINIMISE_FUEL:
+        matrix *= np.asarray(fuel_scales, dtype=float)[:, None]
+    return matrix
+
+
+def min_cost_assignment(cost: np.ndarray) -> List[int]:
+    """
+    Minimum-total-cost assignment for a (rows, cols) cost matrix.
+
+    Returns, for every row, the column it is matched to, or -1 when there
+    are more rows than columns and the row is left out. Infinite costs are
+    allowed; they are only used when nothing else completes the matching.
+    """
+    cost = np.asarray(cost, dtype=float)
+    rows, cols = cost.shape
+    if rows == 0 or cols == 0:
+        return [-1] * rows
+    if rows > cols:
+        matched = [-1] * rows
+        for col, row in enumerate(min_cost_assignment(cost.T)):
+            matched[row] = col
+        return matched
+
+    # Stand-in for inf that is worse than any complete finite matching
+    finite = np.isfinite(cost)
+    if not finite.all():
+        ceiling = (np.abs(cost[finite]).max() if finite.any() else 0.0) * rows + 1.0
+        cost = np.where(finite, cost, ceiling)
+
+    # 1-based potentials and matching as in the textbook formulation;
+    # column 0 is the virtual column the new row starts from
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    owner = np.zeros(cols + 1, dtype=np.int64)  # owner[j] = row matched to column j
+    way = np.zeros(cols + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        owner[0] = row
+        col = 0
+        min_slack = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = owner[col]
+            slack = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            col = next_col
+            if owner[col] == 0:
+                break
+        # Flip the augmenting path back to the virtual column
+        while col:
+            previous = way[col]
+            owner[col] = owner[previous]
+            col = previous
+
+    matched = [-1] * rows
+    for col in range(1, cols + 1):
+        if owner[col]:
+            matched[owner[col] - 1] = col - 1
+    return matched
+
+
+def assign_objectives(
+    cost_map: CostMap,
+    starts: Sequence[Point],
+    goals: Sequence[Point],
+    fuel_scales: Optional[Sequence[float]] = None,
+    minimise: str = MINIMISE_FUEL,
+) -> List[Optional[Point]]:
+    """
+    The objective cell for each start that minimises the team's total
+    route cost, or None for agents left without one (more agents than
+    objectives).
+    """
+    matrix = path_cost_matrix(cost_map, starts, goals, fuel_scales, minimise)
+    return [goals[col] if col >= 0 else None for col in min_cost_assignment(matrix)]
@@ -0,0 +1,276 @@
+"""
+grid_sim/astar.py
+
+Heap-based A* over 4-connected grids.
+
+Works on three kinds of input:
+    - a plain List[List[int]] occupancy grid (grid[y][x], 0 = open, anything
+      else = blocked), as used by the unit tests
+    - a live Grid, where blocking comes from grid.is_blocked(x, y) and the
+      cost of stepping into a cell comes from grid.get_terrain_modifier(x, y)
+    - a precomputed cost_model.CostMap, read straight from its flat list
+
+Cells are addressed internally by a flat index (y * width + x) so the open
+list and the score tables are plain ints and lists rather than tuples in
+dicts. The open list is a binary heap with lazy deletion: when a cheaper
+route to a cell is found the new entry is pushed and the stale one is
+skipped on pop, which is far cheaper than a decrease-key on a Python list.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from .config import GRID_HEIGHT, GRID_WIDTH
+
+Point = Tuple[int, int]
+
+NEIGHBORS_4 = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# Step cost used for cells that can never be entered
+BLOCKED = float("inf")
+
+
+@dataclass
+class SearchResult:
+    """Outcome of one search: the path (or None), its cost and the work done."""
+    path: Optional[List[Point]]
+    cost: float = BLOCKED
+    expanded: int = 0
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+
+# ──────────────────────────────────────────────
+# GRID ADAPTERS
+# ──────────────────────────────────────────────
+
+def is_live_grid(grid) -> bool:
+    """True for a Grid-like object, False for a List[List[int]] occupancy grid."""
+    return hasattr(grid, "is_blocked")
+
+
+def grid_size(grid) -> Tuple[int, int]:
+    """Returns (width, height) for any supported grid type."""
+    if is_live_grid(grid) or hasattr(grid, "cost_function"):
+        return getattr(grid, "width", GRID_WIDTH), getattr(grid, "height", GRID_HEIGHT)
+    if not grid:
+        return 0, 0
+    return len(grid[0]), len(grid)
+
+
+def step_cost_function(grid) -> Callable[[int], float]:
+    """
+    Returns cost(index) -> float giving the cost of stepping into a cell,
+    or BLOCKED if the cell cannot be entered.
+    """
+    # Precomputed cost arrays (cost_model.CostMap) hand over their flat list
+    if hasattr(grid, "cost_function"):
+        return grid.cost_function()
+
+    width, _ = grid_size(grid)
+
+    if is_live_grid(grid):
+        def live_cost(index: int) -> float:
+            y, x = divmod(index, width)
+            if grid.is_blocked(x, y):
+                return BLOCKED
+            return grid.get_terrain_modifier(x, y)
+        return live_cost
+
+    # Occupancy grids are flattened once so the search only does list reads
+    flat = [BLOCKED if cell else 1.0 for row in grid for cell in row]
+    return flat.__getitem__
+
+
+def manhattan(a: Point, b: Point) -> float:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+# ──────────────────────────────────────────────
+# SEARCH
+# ──────────────────────────────────────────────
+
+def reconstruct_path(came_from, width: int, goal_index: int) -> List[Point]:
+    """Walks parent links back from goal_index and returns the (x, y) path."""
+    path = []
+    index = goal_index
+    while index != -1:
+        y, x = divmod(index, width)
+        path.append((x, y))
+        index = came_from[index]
+    path.reverse()
+    return path
+
+
+def search(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    heuristic: Optional[Callable[[int, int], float]] = None,
+) -> SearchResult:
+    """
+    Core A* loop over a width x height grid.
+
+    cost(index) is the price of entering a cell (BLOCKED = impassable).
+    heuristic(x, y) must never overestimate the remaining cost to goal;
+    it defaults to Manhattan distance, which is admissible as long as every
+    step costs at least 1.0.
+
+    The start cell is never checked for blocking, because on a live Grid it
+    is occupied by the entity that is planning.
+    """
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+        return SearchResult(None)
+
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    if start_index == goal_index:
+        return SearchResult([start], 0.0, 0)
+    if cost(goal_index) == BLOCKED:
+        return SearchResult(None)
+
+    if heuristic is None:
+        def heuristic(x, y):
+            return abs(x - gx) + abs(y - gy)
+
+    size = width * height
+    g_score = [BLOCKED] * size
+    came_from = [-1] * size
+    closed = bytearray(size)
+
+    g_score[start_index] = 0.0
+    # Entries are (f, -g, index). Preferring larger g on ties pushes the
+    # search deeper along one of many equal-cost routes instead of
+    # widening across all of them.
+    open_heap = [(heuristic(sx, sy), 0.0, start_index)]
+    expanded = 0
+
+    while open_heap:
+        _, neg_g, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue  # stale entry left behind by lazy deletion
+        if current == goal_index:
+            path = reconstruct_path(came_from, width, goal_index)
+            return SearchResult(path, -neg_g, expanded)
+
+        closed[current] = 1
+        expanded += 1
+        current_g = -neg_g
+        cy, cx = divmod(current, width)
+
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            if closed[neighbor]:
+                continue
+            step = cost(neighbor)
+            if step == BLOCKED:
+                continue
+            tentative = current_g + step
+            if tentative < g_score[neighbor]:
+                g_score[neighbor] = tentative
+                came_from[neighbor] = current
+                heapq.heappush(open_heap, (tentative + heuristic(nx, ny), -tentative, neighbor))
+
+    return SearchResult(None, BLOCKED, expanded)
+
+
+def astar_search(grid, start: Point, goal: Point, heuristic=None) -> SearchResult:
+    """Runs A* on a List[List[int]] or a live Grid and returns a SearchResult."""
+    width, height = grid_size(grid)
+    return search(width, height, step_cost_function(grid), start, goal, heuristic)
+
+
+def astar(grid, start: Point, goal: Point) -> Optional[List[Point]]:
+    """
+    Returns the cheapest 4-connected path from start to goal, inclusive of
+    both endpoints, or None if the goal cannot be reached.
+    """
+    return astar_search(grid, start, goal).path
+
+
+def cost_to_go(width: int, height: int, cost: Callable[[int], float], targets) -> List[float]:
+    """
+    Reverse Dijkstra: for every cell, the cheapest cost of walking from it to
+    the nearest of targets ((x, y) points), where cost(index) is the price of
+    entering a cell. Unreachable and blocked cells get BLOCKED.
+
+    This is the exact heuristic for any search towards the same targets.
+    """
+    dist = [BLOCKED] * (width * height)
+    heap = []
+    for tx, ty in targets:
+        if 0 <= tx < width and 0 <= ty < height:
+            index = ty * width + tx
+            if cost(index) != BLOCKED and dist[index] != 0.0:
+                dist[index] = 0.0
+                heap.append((0.0, index))
+    heapq.heapify(heap)
+
+    while heap:
+        d, current = heapq.heappop(heap)
+        if d > dist[current]:
+            continue
+        # Stepping from a neighbour into current costs cost(current)
+        d_next = d + cost(current)
+        cy, cx = divmod(current, width)
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            if d_next < dist[neighbor] and cost(neighbor) != BLOCKED:
+                dist[neighbor] = d_next
+                heapq.heappush(heap, (d_next, neighbor))
+
+    return dist
+
+
+def cost_from(width: int, height: int, cost: Callable[[int], float], sources) -> List[float]:
+    """
+    Forward Dijkstra: for every cell, the cheapest cost of walking to it
+    from the nearest of sources ((x, y) points). The mirror image of
+    cost_to_go; the two differ because stepping costs depend on the cell
+    being entered. Sources are never checked for blocking.
+    """
+    dist = [BLOCKED] * (width * height)
+    heap = []
+    for sx, sy in sources:
+        if 0 <= sx < width and 0 <= sy < height:
+            index = sy * width + sx
+            if dist[index] != 0.0:
+                dist[index] = 0.0
+                heap.append((0.0, index))
+    heapq.heapify(heap)
+
+    while heap:
+        d, current = heapq.heappop(heap)
+        if d > dist[current]:
+            continue
+        cy, cx = divmod(current, width)
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            step = cost(neighbor)
+            if step == BLOCKED:
+                continue
+            d_next = d + step
+            if d_next < dist[neighbor]:
+                dist[neighbor] = d_next
+                heapq.heappush(heap, (d_next, neighbor))
+
+    return dist
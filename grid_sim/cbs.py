@@ -0,0 +1,381 @@
+"""
+grid_sim/cbs.py
+
+Optimal multi-agent planning with Conflict-Based Search (Sharon et al., 2015)
+for small, high-stakes teams (roughly 2-10 movables).
+
+The high level searches a tree of constraint sets, cheapest first. Each node
+holds one path per agent, planned independently by a space-time A* that
+respects that agent's constraints. When two paths conflict the node is split
+in two, each child forbidding one of the agents from the contested cell at
+that tick. The first conflict-free node popped is optimal.
+
+Cost is sum-of-costs in fuel: each agent pays its speed tier's
+fuel_per_step times the terrain multiplier of every cell it enters, plus
+wait_cost per tick spent waiting before it finally arrives. Waiting burns no
+fuel, but wait_cost must still be positive: with free waits every
+constraint can be dodged by waiting one tick longer at no cost, and the
+constraint tree never runs out of nodes at the current cost. The default of
+1.0 (as in plan_cooperative) prices a tick of waiting like a plain step;
+smaller values favour fuel more strongly but make the tree deeper.
+
+Conflicts:
+    vertex    - two agents in the same cell at the same tick
+    following - an agent enters a cell in the tick another agent leaves it
+                (this also covers swaps). Ruled out because
+                SimulationManager moves entities one at a time.
+
+The search is bounded by a node budget and a wall-clock budget so a call
+from the pygame loop never freezes the UI. The wall-clock deadline covers
+the heuristic fields, the seed and every low-level search, not just the
+high-level loop. A cooperative (WHCA*) plan seeds the incumbent, so a
+budget cut still returns a valid plan together with the proven lower bound
+and the optimality gap. A child whose low-level search runs out of budget
+is dropped unexplored; from then on the bound can rise no higher than its
+parent's cost, so the result is no longer reported optimal.
+"""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED, Point
+from .cooperative import MOVES_AND_WAIT, plan_cooperative
+from .wavefront import cost_to_go_many
+
+
+@dataclass
+class CBSResult:
+    """Best plan found and how close to optimal it is proven to be."""
+    paths: Optional[List[List[Point]]]
+    cost: float
+    lower_bound: float
+    optimal: bool
+    nodes_expanded: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def gap(self) -> float:
+        """Relative optimality gap: 0.0 = proven optimal, 1.0 = no bound."""
+        if self.paths is None or self.cost == BLOCKED:
+            return 1.0
+        if self.cost <= 0:
+            return 0.0
+        return max(0.0, (self.cost - self.lower_bound) / self.cost)
+
+    def planned_cells(self, agent: int) -> List[Point]:
+        """Agent's route in Movable.planned_cells form: start dropped, waits kept."""
+        if self.paths is None:
+            return []
+        path = list(self.paths[agent])
+        while len(path) > 1 and path[-1] == path[-2]:
+            path.pop()
+        return path[1:]
+
+
+@dataclass
+class _Node:
+    constraints: List[Set[Tuple[int, int]]]
+    paths: List[List[Point]]
+    costs: List[float]
+    cost: float = field(init=False)
+
+    def __post_init__(self):
+        self.cost = sum(self.costs)
+
+
+def solve_cbs(
+    cost_map,
+    agents: Sequence[Tuple[Point, Point]],
+    fuel_scales: Optional[Sequence[float]] = None,
+    wait_cost: float = 1.0,
+    max_nodes: int = 2000,
+    time_budget_ms: float = 50.0,
+    low_level_budget: int = 200000,
+) -> CBSResult:
+    """
+    Minimum sum-of-costs conflict-free plan for agents = [(start, goal), ...].
+
+    Returns the optimal plan if it is found within max_nodes high-level
+    expansions and time_budget_ms; otherwise the best known plan (possibly
+    None) with its lower bound. Once time_budget_ms has passed the call
+    returns within one low-level check interval, whatever stage it is in.
+    """
+    if wait_cost <= 0:
+        raise ValueError("CBS needs a positive wait_cost.")
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000.0
+    width, height = cost_map.width, cost_map.height
+    if fuel_scales is None:
+        fuel_scales = [1.0] * len(agents)
+
+    def elapsed_ms():
+        return (time.perf_counter() - started) * 1000.0
+
+    costs = [cost_map.step_costs(scale) for scale in fuel_scales]
+    grid_costs = np.array(cost_map.step_costs()).reshape(height, width)
+    goal_fields: Dict[Point, List[float]] = {}
+    heuristics = []
+    for (_, goal), scale in zip(agents, fuel_scales):
+        base_field = goal_fields.get(goal)
+        if base_field is None:
+            if time.perf_counter() > deadline:
+                return CBSResult(None, BLOCKED, 0.0, False, 0, elapsed_ms())
+            base_field = cost_to_go_many(grid_costs, [goal])[0].ravel().tolist()
+            goal_fields[goal] = base_field
+        heuristics.append(base_field if scale == 1.0 else [d * scale for d in base_field])
+
+    # Incumbent from the fast cooperative planner, sharing the goal fields
+    incumbent_paths = None
+    incumbent_cost = BLOCKED
+    seed = plan_cooperative(
+        cost_map, agents, fuel_scales, wait_cost=wait_cost, goal_fields=goal_fields, deadline=deadline,
+    )
+    if all(seed.reached):
+        incumbent_paths = [_trim(path) for path in seed.paths]
+        incumbent_cost = sum(
+            _path_cost(path, costs[i], width, wait_cost) for i, path in enumerate(incumbent_paths)
+        )
+
+    def low_level(agent, constraints):
+        start, goal = agents[agent]
+        return _constrained_astar(
+            width, height, costs[agent], heuristics[agent], start, goal,
+            constraints, wait_cost, low_level_budget, deadline,
+        )
+
+    root_paths = []
+    root_costs = []
+    for agent in range(len(agents)):
+        path, cost = low_level(agent, set())
+        if cost is None:
+            # Out of budget before the root was planned: nothing is proven
+            return CBSResult(incumbent_paths, incumbent_cost, 0.0, False, 0, elapsed_ms())
+        if path is None:
+            return CBSResult(None, BLOCKED, BLOCKED, True, 0, elapsed_ms())
+        root_paths.append(path)
+        root_costs.append(cost)
+
+    root = _Node([set() for _ in agents], root_paths, root_costs)
+    lower_bound = root.cost
+    counter = itertools.count()
+    open_list = [(root.cost, 0, next(counter), root)]
+    expanded = 0
+    # Lowest cost of a node with a child dropped unexplored for lack of budget
+    dropped_bound = BLOCKED
+
+    while open_list:
+        node_cost, _, _, node = open_list[0]
+        lower_bound = max(lower_bound, node_cost)
+        if node_cost >= incumbent_cost:
+            # Nothing left can beat the incumbent, barring a dropped child
+            bound = min(incumbent_cost, dropped_bound)
+            return CBSResult(
+                incumbent_paths, incumbent_cost, bound, bound >= incumbent_cost, expanded, elapsed_ms(),
+            )
+        if expanded >= max_nodes or time.perf_counter() > deadline:
+            break
+
+        heapq.heappop(open_list)
+        expanded += 1
+        conflict = _first_conflict(node.paths, width)
+        if conflict is None:
+            bound = min(node.cost, dropped_bound)
+            return CBSResult(node.paths, node.cost, bound, bound >= node.cost, expanded, elapsed_ms())
+
+        for agent, cell, tick in conflict:
+            constraints = list(node.constraints)
+            constraints[agent] = constraints[agent] | {(cell, tick)}
+            path, cost = low_level(agent, constraints[agent])
+            if cost is None:
+                dropped_bound = min(dropped_bound, node.cost)
+                continue
+            if path is None:
+                continue
+            paths = list(node.paths)
+            paths[agent] = path
+            child_costs = list(node.costs)
+            child_costs[agent] = cost
+            child = _Node(constraints, paths, child_costs)
+            heapq.heappush(open_list, (child.cost, _count_conflicts(paths), next(counter), child))
+
+    if not open_list:
+        # Tree exhausted: the incumbent (if any) is the only solution left
+        lower_bound = incumbent_cost
+    lower_bound = min(lower_bound, dropped_bound)
+    return CBSResult(
+        incumbent_paths,
+        incumbent_cost,
+        min(lower_bound, incumbent_cost),
+        incumbent_paths is not None and lower_bound >= incumbent_cost,
+        expanded,
+        elapsed_ms(),
+    )
+
+
+# ──────────────────────────────────────────────
+# LOW LEVEL
+# ──────────────────────────────────────────────
+
+# Low-level expansions between looks at the clock
+_DEADLINE_CHECK_EVERY = 256
+
+
+def _constrained_astar(
+    width: int,
+    height: int,
+    costs: Sequence[float],
+    h: Sequence[float],
+    start: Point,
+    goal: Point,
+    constraints: Set[Tuple[int, int]],
+    wait_cost: float,
+    budget: int,
+    deadline: Optional[float] = None,
+):
+    """
+    Space-time A* for one agent that never occupies (cell_index, tick) for
+    any pair in constraints. Returns (path, cost), (None, BLOCKED) if there
+    is no such path, or (None, None) if it gave up after budget expansions
+    or once time.perf_counter() passed deadline.
+
+    After the last constrained tick waiting can never help, so every later
+    tick is folded into one, which keeps the state space finite.
+    """
+    sx, sy = start
+    gx, gy = goal
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    if h[start_index] == BLOCKED:
+        return None, BLOCKED
+
+    last_tick = max((t for _, t in constraints), default=-1)
+    goal_clear_after = max((t for c, t in constraints if c == goal_index), default=-1)
+    horizon = last_tick + 1
+
+    g_score = {(start_index, 0): 0.0}
+    parent = {(start_index, 0): None}
+    heap = [(h[start_index], 0, 0.0, start_index, 0)]
+    expanded = 0
+
+    while heap:
+        _, _, g, index, tick = heapq.heappop(heap)
+        if g > g_score.get((index, tick), BLOCKED):
+            continue
+        if index == goal_index and tick > goal_clear_after:
+            return _rebuild(parent, (index, tick), width), g
+
+        expanded += 1
+        if expanded > budget:
+            return None, None
+        if deadline is not None and not expanded % _DEADLINE_CHECK_EVERY and time.perf_counter() > deadline:
+            return None, None
+
+        next_tick = min(tick + 1, horizon)
+        cy, cx = divmod(index, width)
+        for dx, dy in MOVES_AND_WAIT:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            if dx == 0 and dy == 0:
+                if tick == horizon:
+                    continue  # waiting past the last constraint changes nothing
+                step = wait_cost
+            else:
+                step = costs[neighbor]
+                if step == BLOCKED:
+                    continue
+            if (neighbor, tick + 1) in constraints:
+                continue
+            state = (neighbor, next_tick)
+            tentative = g + step
+            if tentative < g_score.get(state, BLOCKED):
+                g_score[state] = tentative
+                parent[state] = (index, tick)
+                heapq.heappush(heap, (tentative + h[neighbor], -next_tick, tentative, neighbor, next_tick))
+
+    return None, BLOCKED
+
+
+def _rebuild(parent, state, width: int) -> List[Point]:
+    # Each parent link is one tick, folded or not, so this is the timed path
+    cells = []
+    while state is not None:
+        y, x = divmod(state[0], width)
+        cells.append((x, y))
+        state = parent[state]
+    cells.reverse()
+    return cells
+
+
+# ──────────────────────────────────────────────
+# CONFLICTS
+# ──────────────────────────────────────────────
+
+def _at(path: List[Point], t: int) -> Point:
+    return path[t] if t < len(path) else path[-1]
+
+
+def _first_conflict(paths: List[List[Point]], width: int):
+    """
+    Returns the two branch constraints [(agent, cell_index, tick), ...] for
+    the earliest conflict, or None if the paths are conflict-free. Any
+    conflict-free plan satisfies at least one of the two, so splitting on
+    them never cuts off the optimum.
+    """
+    horizon = max(len(path) for path in paths)
+    count = len(paths)
+    for t in range(horizon):
+        occupied = {}
+        for agent in range(count):
+            cell = _at(paths[agent], t)
+            other = occupied.get(cell)
+            if other is not None:
+                index = cell[1] * width + cell[0]
+                return [(other, index, t), (agent, index, t)]
+            occupied[cell] = agent
+        if t == 0:
+            continue
+        previous = {_at(paths[agent], t - 1): agent for agent in range(count)}
+        for agent in range(count):
+            cell = _at(paths[agent], t)
+            if cell == _at(paths[agent], t - 1):
+                continue
+            other = previous.get(cell)
+            if other is not None and other != agent:
+                # agent moved into the cell other occupied a tick earlier
+                index = cell[1] * width + cell[0]
+                return [(agent, index, t), (other, index, t - 1)]
+    return None
+
+
+def _count_conflicts(paths: List[List[Point]]) -> int:
+    horizon = max(len(path) for path in paths)
+    conflicts = 0
+    for t in range(horizon):
+        cells = [_at(path, t) for path in paths]
+        conflicts += len(cells) - len(set(cells))
+    return conflicts
+
+
+def _trim(path: List[Point]) -> List[Point]:
+    path = list(path)
+    while len(path) > 1 and path[-1] == path[-2]:
+        path.pop()
+    return path
+
+
+def _path_cost(path: List[Point], costs: Sequence[float], width: int, wait_cost: float) -> float:
+    total = 0.0
+    for previous, cell in zip(path, path[1:]):
+        if previous == cell:
+            total += wait_cost
+        else:
+            total += costs[cell[1] * width + cell[0]]
+    return total
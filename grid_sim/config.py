@@ -1,9 +1,13 @@
 CELL_SIZE = 20
 
+# Default map size; each Grid and MapData carries its own width and height
 GRID_WIDTH = 30
 GRID_HEIGHT = 30
+# The play area in pixels. Larger maps are scaled down to fit, to no fewer
+# than MIN_CELL_SIZE pixels per cell, and scroll beyond that
 WINDOW_WIDTH = CELL_SIZE * GRID_WIDTH
 WINDOW_HEIGHT = CELL_SIZE * GRID_HEIGHT
+MIN_CELL_SIZE = 4
 
 HUD_PANEL_WIDTH = 360
 APP_WINDOW_WIDTH = WINDOW_WIDTH + HUD_PANEL_WIDTH
@@ -30,3 +34,27 @@ BACK_BUTTON_RECT = (
 )
 
 FPS = 60
+
+# Landmarks precomputed per map for ALT heuristics (0 disables them).
+# Skipped on maps larger than LANDMARK_MAX_CELLS, where building them
+# would take longer than the searches they speed up
+LANDMARK_COUNT = 8
+LANDMARK_MAX_CELLS = 250_000
+
+# Planner time per frame while routes are computed during the planning phase
+PLANNING_FRAME_BUDGET_MS = 6.0
+
+# Auto-planning builds objective flow fields in batches of about this many
+# map cells (objectives x width x height) so one batch fits in a frame
+AUTO_PLAN_BATCH_CELLS = 100_000
+
+# Monte Carlo fire risk forecast (F in the planning phase): rollouts, fire
+# ticks ahead, and the share of rollouts at which a cell counts as burning
+# for fire-safe planning
+FIRE_RISK_RUNS = 200
+FIRE_RISK_TICKS = 60
+FIRE_RISK_CONFIDENCE = 0.1
+
+# Simulation ticks SimulationManager.run_to_completion plays before giving
+# up on a mission that never finishes
+RUN_MAX_TICKS = 10_000
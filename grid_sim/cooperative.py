@@ -0,0 +1,328 @@
+"""
+grid_sim/cooperative.py
+
+Cooperative multi-agent pathfinding (windowed hierarchical cooperative A*,
+Silver 2005) with a space-time reservation table.
+
+Movables are blocking, so independently planned routes that cross end up
+as "collisions" at execution time. Here agents are planned one after another
+in priority order. Each agent searches in (x, y, tick) space, may wait in
+place, and avoids every cell and edge already reserved by higher-priority
+agents. Searches only look `window` ticks ahead; beyond that the exact
+cost-to-go from a reverse Dijkstra (shared by all agents with the same goal)
+stands in as the heuristic. After each window every agent commits its first
+`commit` ticks and the window rolls forward.
+
+Conflicts ruled out by the reservations:
+    vertex    - two agents in the same cell at the same tick
+    swap      - two agents exchanging cells in the same tick
+    following - entering a cell in the tick its occupant leaves it
+The last one matters because SimulationManager advances movables one at a
+time; without it the execution order would decide whether a move succeeds.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, cost_to_go
+
+MOVES_AND_WAIT = NEIGHBORS_4 + ((0, 0),)
+
+
+class ReservationTable:
+    """Space-time reservations keyed by (x, y, tick) plus directed edges."""
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int, int], int] = {}
+        self.edges: Dict[Tuple[int, int, int, int, int], int] = {}
+        self._keys_by_tick: Dict[int, List[tuple]] = {}
+
+    def owner(self, x: int, y: int, t: int) -> Optional[int]:
+        return self.cells.get((x, y, t))
+
+    def reserve_cell(self, agent: int, x: int, y: int, t: int):
+        key = (x, y, t)
+        self.cells[key] = agent
+        self._keys_by_tick.setdefault(t, []).append(key)
+
+    def reserve_path(self, agent: int, path: Sequence[Point], start_tick: int):
+        """Reserves path[i] at start_tick + i and every move between them."""
+        for offset, (x, y) in enumerate(path):
+            t = start_tick + offset
+            self.reserve_cell(agent, x, y, t)
+            if offset > 0:
+                px, py = path[offset - 1]
+                if (px, py) != (x, y):
+                    key = (px, py, x, y, t - 1)
+                    self.edges[key] = agent
+                    # Filed under the arrival tick so release_after drops it
+                    # together with the cell it leads into
+                    self._keys_by_tick.setdefault(t, []).append(key)
+
+    def release_after(self, tick: int):
+        """Drops every reservation strictly later than tick."""
+        for t in [t for t in self._keys_by_tick if t > tick]:
+            for key in self._keys_by_tick.pop(t):
+                if len(key) == 3:
+                    self.cells.pop(key, None)
+                else:
+                    self.edges.pop(key, None)
+
+    def can_move(self, agent: int, x1: int, y1: int, x2: int, y2: int, t: int) -> bool:
+        """True if agent may go from (x1, y1) at tick t to (x2, y2) at t + 1."""
+        cells = self.cells
+        arrival = cells.get((x2, y2, t + 1))
+        if arrival is not None and arrival != agent:
+            return False
+        if (x1, y1) == (x2, y2):
+            return True
+        # Following: the target is still occupied by someone else at tick t
+        occupant = cells.get((x2, y2, t))
+        if occupant is not None and occupant != agent:
+            return False
+        # Being followed: someone else moves into the cell we are leaving
+        follower = cells.get((x1, y1, t + 1))
+        if follower is not None and follower != agent:
+            return False
+        swap = self.edges.get((x2, y2, x1, y1, t))
+        return swap is None or swap == agent
+
+
+@dataclass
+class CooperativePlan:
+    """Timed routes for every agent: paths[i][t] is agent i's cell at tick t."""
+    paths: List[List[Point]]
+    reached: List[bool]
+    expanded: int = 0
+    windows: int = 0
+
+    @property
+    def makespan(self) -> int:
+        return max((len(path) - 1 for path in self.paths), default=0)
+
+    def planned_cells(self, agent: int) -> List[Point]:
+        """Agent's route in Movable.planned_cells form: start dropped, waits kept."""
+        path = list(self.paths[agent])
+        # Standing still at the end of the route is not part of the plan
+        while len(path) > 1 and path[-1] == path[-2]:
+            path.pop()
+        return path[1:]
+
+
+@dataclass
+class _Agent:
+    index: int
+    position: Point
+    goal: Point
+    costs: Sequence[float]
+    cost_to_go: Sequence[float]
+    path: List[Point] = field(default_factory=list)
+
+
+def plan_cooperative(
+    cost_map,
+    agents: Sequence[Tuple[Point, Point]],
+    fuel_scales: Optional[Sequence[float]] = None,
+    window: int = 16,
+    commit: Optional[int] = None,
+    wait_cost: float = 1.0,
+    max_ticks: Optional[int] = None,
+    max_retries: int = 3,
+    goal_fields: Optional[Dict[Point, List[float]]] = None,
+    deadline: Optional[float] = None,
+) -> CooperativePlan:
+    """
+    Plans conflict-free timed routes for agents = [(start, goal), ...].
+
+    fuel_scales[i] multiplies agent i's terrain costs (its fuel_per_step);
+    wait_cost is charged for each tick spent waiting anywhere but the goal.
+    Agents that cannot reach their goal stay where they are and are
+    reported in plan.reached as False. If an agent gets boxed in by
+    higher-priority reservations the window is replanned with that agent
+    promoted to the front, up to max_retries times, and then once more
+    with every unplanned agent treated as an obstacle, which always
+    succeeds.
+
+    goal_fields caches the cost-to-go field of each goal at fuel scale 1
+    and is filled in for goals it lacks, so callers can share the fields.
+    Planning stops after the window in which time.perf_counter() passes
+    deadline; agents still on their way are then reported as not reached.
+    """
+    width, height = cost_map.width, cost_map.height
+    commit = max(1, min(commit or window // 2, window))
+    if max_ticks is None:
+        max_ticks = 4 * (width + height) + len(agents) * 2
+    if fuel_scales is None:
+        fuel_scales = [1.0] * len(agents)
+
+    # One reverse Dijkstra per goal, shared by every agent heading there
+    base_cost = cost_map.cost_function()
+    if goal_fields is None:
+        goal_fields = {}
+    states: List[_Agent] = []
+    for index, ((start, goal), scale) in enumerate(zip(agents, fuel_scales)):
+        base_field = goal_fields.get(goal)
+        if base_field is None:
+            base_field = cost_to_go(width, height, base_cost, [goal])
+            goal_fields[goal] = base_field
+        field_scaled = base_field if scale == 1.0 else [d * scale for d in base_field]
+        states.append(_Agent(index, start, goal, cost_map.step_costs(scale), field_scaled, [start]))
+
+    table = ReservationTable()
+    for agent in states:
+        table.reserve_cell(agent.index, agent.position[0], agent.position[1], 0)
+
+    tick = 0
+    expanded = 0
+    windows = 0
+    while tick < max_ticks:
+        # Stop once everyone has arrived or is cut off from their goal
+        if all(a.position == a.goal or a.cost_to_go[a.position[1] * width + a.position[0]] == BLOCKED for a in states):
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+        # Agents still travelling go first, farthest first; parked agents
+        # plan last so they step aside for anyone who needs to pass
+        order = sorted(
+            states,
+            key=lambda a: (a.position == a.goal, -a.cost_to_go[a.position[1] * width + a.position[0]]),
+        )
+        for attempt in range(max_retries + 2):
+            # Last resort: agents not planned yet are treated as standing
+            # still for the whole window, so nobody can box them in
+            cautious = attempt == max_retries + 1
+            pending = {a.position[1] * width + a.position[0] for a in order} if cautious else None
+            window_paths: Dict[int, List[Point]] = {}
+            boxed_in = None
+            for agent in order:
+                if cautious:
+                    pending.discard(agent.position[1] * width + agent.position[0])
+                segment, work = _window_search(table, agent, tick, window, width, height, wait_cost, pending)
+                expanded += work
+                if len(segment) < window + 1:
+                    if boxed_in is None:
+                        boxed_in = agent
+                    # A boxed-in agent stays where its segment ends; reserve
+                    # the rest of the window too, so nobody later in the
+                    # order is routed through it
+                    segment = segment + [segment[-1]] * (window + 1 - len(segment))
+                table.reserve_path(agent.index, segment, tick)
+                window_paths[agent.index] = segment
+            if boxed_in is None or cautious:
+                break
+            # An agent had nowhere to go; replan the window with it first
+            table.release_after(tick)
+            order.remove(boxed_in)
+            order.insert(0, boxed_in)
+        windows += 1
+
+        # Keep only the committed prefix; the rest is replanned next window
+        steps = min(commit, max_ticks - tick)
+        table.release_after(tick + steps)
+        for agent in states:
+            # Every segment spans the window, so the committed ticks are reserved
+            segment = window_paths[agent.index]
+            agent.path.extend(segment[1: steps + 1])
+            agent.position = agent.path[-1]
+        tick += steps
+
+    reached = [a.position == a.goal for a in states]
+    return CooperativePlan([a.path for a in states], reached, expanded, windows)
+
+
+def _window_search(
+    table: ReservationTable,
+    agent: _Agent,
+    start_tick: int,
+    window: int,
+    width: int,
+    height: int,
+    wait_cost: float,
+    frozen: Optional[set] = None,
+) -> Tuple[List[Point], int]:
+    """
+    Space-time A* for one agent over `window` ticks. Returns the cells it
+    occupies at start_tick .. start_tick + window and the expansions used.
+    Cells whose index is in frozen are off limits for the whole window.
+    """
+    costs = agent.costs
+    h = agent.cost_to_go
+    sx, sy = agent.position
+    gx, gy = agent.goal
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    stride = window + 1
+
+    # Goal unreachable from here: hold position if the table allows it
+    if h[start_index] == BLOCKED:
+        return _hold_position(table, agent, start_tick, window), 0
+
+    start_state = start_index * stride
+    g_score = {start_state: 0.0}
+    parent = {start_state: -1}
+    heap = [(h[start_index], 0, 0.0, start_state)]
+    expanded = 0
+
+    while heap:
+        _, neg_depth, g, state = heapq.heappop(heap)
+        if g > g_score.get(state, BLOCKED):
+            continue
+        index, depth = divmod(state, stride)
+        if depth == window:
+            return _rebuild(parent, state, stride, width), expanded
+
+        expanded += 1
+        t = start_tick + depth
+        cy, cx = divmod(index, width)
+        for dx, dy in MOVES_AND_WAIT:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            if dx == 0 and dy == 0:
+                step = 0.0 if index == goal_index else wait_cost
+            else:
+                step = costs[neighbor]
+                if step == BLOCKED:
+                    continue
+            remaining = h[neighbor]
+            if remaining == BLOCKED:
+                continue
+            if frozen and neighbor in frozen:
+                continue
+            if not table.can_move(agent.index, cx, cy, nx, ny, t):
+                continue
+            next_state = neighbor * stride + depth + 1
+            tentative = g + step
+            if tentative < g_score.get(next_state, BLOCKED):
+                g_score[next_state] = tentative
+                parent[next_state] = state
+                heapq.heappush(heap, (tentative + remaining, -(depth + 1), tentative, next_state))
+
+    # Boxed in by reservations for the whole window: wait as long as allowed
+    return _hold_position(table, agent, start_tick, window), expanded
+
+
+def _rebuild(parent: Dict[int, int], state: int, stride: int, width: int) -> List[Point]:
+    cells = []
+    while state != -1:
+        index = state // stride
+        y, x = divmod(index, width)
+        cells.append((x, y))
+        state = parent[state]
+    cells.reverse()
+    return cells
+
+
+def _hold_position(table: ReservationTable, agent: _Agent, start_tick: int, window: int) -> List[Point]:
+    x, y = agent.position
+    cells = [(x, y)]
+    for depth in range(window):
+        if not table.can_move(agent.index, x, y, x, y, start_tick + depth):
+            break
+        cells.append((x, y))
+    return cells
@@ -0,0 +1,274 @@
+"""
+grid_sim/cost_model.py
+
+Per-cell movement cost for planners, built once per map instead of being
+looked up through the grid for every neighbour.
+
+Core concepts:
+    - A CostMap holds the terrain multiplier of every cell in a flat list
+      (row-major, index = y * width + x). Blocked terrain is BLOCKED.
+    - Fuel for stepping into a cell is the entity's speed-tier
+      fuel_per_step times that multiplier, the same rule as
+      metrics.cell_movement_cost.
+    - Movables are not baked into the map. They move every tick, so
+      planners treat them separately (reservations, collision checks).
+
+The map for a Grid is cached on the grid and rebuilt only when
+grid.version changes.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, SearchResult, search
+from .entities import Movable
+from .fire import FIRE_DISTANCE_CAP
+from .jps import jps_path
+from .metrics import EntityMetrics, cell_movement_cost
+
+
+class CostMap:
+    """Precomputed terrain multipliers for one snapshot of a grid."""
+
+    def __init__(self, width: int, height: int, modifiers: List[float], version: int = 0):
+        if len(modifiers) != width * height:
+            raise ValueError("CostMap needs exactly width * height modifiers.")
+        self.width = width
+        self.height = height
+        self.modifiers = modifiers
+        self.version = version
+        self._scaled: Dict[float, List[float]] = {}
+
+    @classmethod
+    def from_grid(cls, grid) -> "CostMap":
+        width = grid.width
+        height = grid.height
+        # Terrain comes straight from the layer arrays in one conversion
+        modifiers = grid.layers.cost.ravel().tolist()
+
+        # Then the few non-terrain objects, except movables
+        for (x, y), modifier in object_costs(grid).items():
+            modifiers[y * width + x] = modifier
+
+        return cls(width, height, modifiers, version=grid.version)
+
+    @classmethod
+    def from_occupancy(cls, rows: Sequence[Sequence[int]]) -> "CostMap":
+        """Builds a map from a List[List[int]] grid (0 = open, else blocked)."""
+        height = len(rows)
+        width = len(rows[0]) if rows else 0
+        modifiers = [BLOCKED if cell else 1.0 for row in rows for cell in row]
+        return cls(width, height, modifiers)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def modifier(self, x: int, y: int) -> float:
+        return self.modifiers[y * self.width + x]
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        return self.modifiers[y * self.width + x] == BLOCKED
+
+    def step_costs(self, fuel_per_step: float = 1.0) -> List[float]:
+        """Flat per-cell cost of stepping in, scaled by fuel_per_step (cached)."""
+        costs = self._scaled.get(fuel_per_step)
+        if costs is None:
+            if fuel_per_step == 1.0:
+                costs = self.modifiers
+            else:
+                costs = [m * fuel_per_step for m in self.modifiers]
+            self._scaled[fuel_per_step] = costs
+        return costs
+
+    def unit_costs(self) -> List[float]:
+        """Flat per-cell cost where every passable cell costs one step."""
+        costs = self._scaled.get(0.0)
+        if costs is None:
+            costs = [BLOCKED if m == BLOCKED else 1.0 for m in self.modifiers]
+            self._scaled[0.0] = costs
+        return costs
+
+    def cost_function(self, fuel_per_step: float = 1.0) -> Callable[[int], float]:
+        return self.step_costs(fuel_per_step).__getitem__
+
+
+def object_costs(grid) -> Dict[Point, float]:
+    """Cost multiplier of every in-bounds non-terrain object except movables."""
+    costs = {}
+    for (x, y), entity in grid.objects.items():
+        if isinstance(entity, Movable) or not grid.in_bounds(x, y):
+            continue
+        costs[(x, y)] = BLOCKED if entity.blocking else getattr(entity, "COST_MULTIPLIER", 1.0)
+    return costs
+
+
+def cost_map_for(grid) -> CostMap:
+    """Returns the cached CostMap for grid, rebuilding it if the grid changed."""
+    cached = getattr(grid, "_cost_map", None)
+    if cached is None or cached.version != grid.version:
+        cached = CostMap.from_grid(grid)
+        grid._cost_map = cached
+    return cached
+
+
+# ──────────────────────────────────────────────
+# FUEL ACCOUNTING
+# ──────────────────────────────────────────────
+
+def cell_fuel_costs(metrics: EntityMetrics, cost_map: CostMap, cells: Iterable[Point]) -> List[float]:
+    """
+    Fuel needed to step into each cell, e.g. the cells of a path or of a
+    search frontier. Out-of-bounds cells are reported as BLOCKED.
+    """
+    costs = []
+    for x, y in cells:
+        if not cost_map.in_bounds(x, y):
+            costs.append(BLOCKED)
+            continue
+        costs.append(cell_movement_cost(metrics, cost_map.modifier(x, y)))
+    return costs
+
+
+def path_fuel_cost(metrics: EntityMetrics, cost_map: CostMap, planned_cells: Iterable[Point]) -> float:
+    """
+    Exact fuel to walk planned_cells (the cells stepped into, not including
+    the start position) with this entity's speed tier.
+    """
+    return sum(cell_fuel_costs(metrics, cost_map, planned_cells))
+
+
+# ──────────────────────────────────────────────
+# SHORTEST PATHS
+# ──────────────────────────────────────────────
+
+MINIMISE_FUEL = "fuel"
+MINIMISE_STEPS = "steps"
+
+
+def shortest_path(
+    cost_map: CostMap,
+    start: Point,
+    goal: Point,
+    metrics: Optional[EntityMetrics] = None,
+    minimise: str = MINIMISE_FUEL,
+    use_jps: bool = False,
+    landmarks=None,
+) -> SearchResult:
+    """
+    A* over a CostMap.
+
+    minimise="fuel" weighs each cell by the entity's fuel_per_step times
+    its terrain multiplier (multiplier only if metrics is None), so the
+    route through forest or water is taken only when it is really cheaper.
+    minimise="steps" counts every passable cell as 1.
+
+    use_jps switches to JPS+ (jps.py), which jumps across open ground
+    and expands Forest/Water cells normally. Same cost, far fewer
+    expansions on mostly open maps; the jump table is built on first use
+    and cached on the CostMap.
+
+    landmarks (a landmarks.LandmarkSet, e.g. from landmarks_for) replaces
+    the Manhattan heuristic with the much tighter ALT bound when
+    minimising fuel.
+
+    The result's cost is in the units being minimised.
+    """
+    gx, gy = goal
+
+    if minimise == MINIMISE_STEPS:
+        cost = cost_map.unit_costs().__getitem__
+        scale = 1.0
+    elif minimise == MINIMISE_FUEL:
+        scale = metrics.get_speed_tier().fuel_per_step if metrics is not None else 1.0
+        cost = cost_map.cost_function(scale)
+    else:
+        raise ValueError(f"Unknown minimise mode: {minimise}")
+
+    if use_jps:
+        return jps_path(cost_map, start, goal, scale, unit_steps=minimise == MINIMISE_STEPS)
+
+    if landmarks is not None and minimise == MINIMISE_FUEL:
+        return search(cost_map.width, cost_map.height, cost, start, goal, landmarks.heuristic(goal, scale, start))
+
+    # Every multiplier is >= 1.0, so scaled Manhattan distance stays admissible
+    def heuristic(x, y):
+        return (abs(x - gx) + abs(y - gy)) * scale
+
+    return search(cost_map.width, cost_map.height, cost, start, goal, heuristic)
+
+
+def planned_path_cells(result: SearchResult) -> List[Tuple[int, int]]:
+    """Converts a search path to Movable.planned_cells form (start dropped)."""
+    if result.path is None:
+        return []
+    return list(result.path[1:])
+
+
+# ──────────────────────────────────────────────
+# FIRE RISK
+# ──────────────────────────────────────────────
+
+# Extra cost for routing through or beside fire. Matches the base damage
+# Movable.apply_fire_damage deals per tick in each case.
+FIRE_COST_PENALTY = 10.0
+NEAR_FIRE_COST_PENALTY = 3.0
+
+
+def fire_penalty(fire_tiles: Set[Point], x: int, y: int) -> float:
+    """Risk added to a cell for being on fire or next to fire."""
+    if (x, y) in fire_tiles:
+        return FIRE_COST_PENALTY
+    for dx, dy in NEIGHBORS_4:
+        if (x + dx, y + dy) in fire_tiles:
+            return NEAR_FIRE_COST_PENALTY
+    return 0.0
+
+
+def fire_aware_cost(cost_map: CostMap, fire_tiles: Set[Point], x: int, y: int, fuel_per_step: float = 1.0) -> float:
+    base = cost_map.modifier(x, y)
+    if base == BLOCKED:
+        return BLOCKED
+    return base * fuel_per_step + fire_penalty(fire_tiles, x, y)
+
+
+def fire_aware_costs(cost_map: CostMap, fire_tiles: Set[Point], fuel_per_step: float = 1.0) -> List[float]:
+    """Flat step costs with fire risk folded in, for planners that avoid fire."""
+    costs = list(cost_map.step_costs(fuel_per_step))
+    for x, y in fire_affected_cells(fire_tiles, cost_map.width, cost_map.height):
+        index = y * cost_map.width + x
+        if costs[index] != BLOCKED:
+            costs[index] += fire_penalty(fire_tiles, x, y)
+    return costs
+
+
+def fire_aware_costs_from_field(cost_map: CostMap, fire_distance: np.ndarray, fuel_per_step: float = 1.0) -> List[float]:
+    """
+    fire_aware_costs from a fire distance field (Grid.fire.distance)
+    instead of a tile set: one vectorized pass, however large the fire.
+    """
+    costs = np.asarray(cost_map.step_costs(fuel_per_step)) + fire_penalty_field(fire_distance).ravel()
+    return costs.tolist()
+
+
+def fire_penalty_field(fire_distance: np.ndarray) -> np.ndarray:
+    """The fire risk penalty fire_aware_costs adds to each cell, from Grid.fire.distance."""
+    penalty = np.zeros(FIRE_DISTANCE_CAP + 1)
+    penalty[0] = FIRE_COST_PENALTY
+    penalty[1] = NEAR_FIRE_COST_PENALTY
+    return penalty[fire_distance]
+
+
+def fire_affected_cells(fire_tiles: Iterable[Point], width: int, height: int) -> Set[Point]:
+    """The given fire tiles plus their in-bounds 4-neighbours."""
+    affected = set()
+    for fx, fy in fire_tiles:
+        affected.add((fx, fy))
+        for dx, dy in NEIGHBORS_4:
+            nx, ny = fx + dx, fy + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                affected.add((nx, ny))
+    return affected
@@ -1,5 +1,13 @@
-import pygame
-from .config import CELL_SIZE, GRID_WIDTH, GRID_HEIGHT
+import numpy as np
+from .viewport import DEFAULT_VIEW
+
+# Fire damage per tick on a burning tile and next to one. Consecutive
+# exposed ticks scale it by 1 + EXPOSURE_RAMP per earlier tick, up to
+# MAX_EXPOSURE_MULTIPLIER
+FIRE_DAMAGE = 10
+NEAR_FIRE_DAMAGE = 3
+EXPOSURE_RAMP = 0.25
+MAX_EXPOSURE_MULTIPLIER = 2.0
 
 class Entity():
     def __init__(self, color, x_pos, y_pos, blocking=False):
@@ -12,13 +20,10 @@ class Entity():
         self.blocking=blocking
 
 
-    def draw(self, window):
-        rect = pygame.Rect(
-            self.x_pos * CELL_SIZE,
-            self.y_pos * CELL_SIZE,
-            CELL_SIZE,
-            CELL_SIZE
-        )
+    def draw(self, window, view=None):
+        import pygame
+
+        rect = (view or DEFAULT_VIEW).rect(self.x_pos, self.y_pos)
 
         pygame.draw.rect(window, self.color, rect)
 
@@ -55,7 +60,7 @@ class Fire(Entity):
         x = self.x_pos + dx
         y = self.y_pos + dy
 
-        if not (0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT):
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
             return
 
         if (x, y) not in grid.entities:
@@ -75,6 +80,9 @@ class Movable(Entity):
         self.start_x = x_pos
         self.start_y = y_pos
 
+        # When True the simulation repairs the rest of the route as fire spreads
+        self.replan_on_fire = False
+
         # planning / movement state
         self._reset_planning_state()
         # thermal damage / metrics 
@@ -109,18 +117,17 @@ class Movable(Entity):
         self.exposure_ticks = 0
         self.destroyed = False
 
-    def handle_click(self, mouse_pos):
+    def handle_click(self, mouse_pos, view=None):
         # Gets the position on the grid from mouse_pos (which is in pixels)
-        grid_x = mouse_pos[0] // CELL_SIZE
-        grid_y = mouse_pos[1] // CELL_SIZE
-        self.selected = (grid_x == self.x_pos and grid_y == self.y_pos)
+        cell = (view or DEFAULT_VIEW).to_cell(*mouse_pos)
+        self.selected = cell == (self.x_pos, self.y_pos)
 
     # -------- Planning --------
     def plan_step(self, dx, dy, grid):
         new_x = self.plan_cursor_x + dx
         new_y = self.plan_cursor_y + dy
 
-        if not (0 <= new_x < GRID_WIDTH and 0 <= new_y < GRID_HEIGHT):
+        if not (0 <= new_x < grid.width and 0 <= new_y < grid.height):
             return False
         if grid.is_blocked(new_x, new_y):
             return False
@@ -144,6 +151,30 @@ class Movable(Entity):
     def clear_plan(self):
         self._reset_planning_state()
 
+    def set_planned_path(self, cells):
+        # Replaces the whole plan, e.g. with a route from one of the planners.
+        # Arrow-key planning carries on from the end of it.
+        self._reset_planning_state()
+        self.planned_cells = list(cells)
+        if self.planned_cells:
+            self.plan_cursor_x, self.plan_cursor_y = self.planned_cells[-1]
+
+    def next_step_is_wait(self):
+        # Cooperative plans hold position by repeating the current cell
+        return self.next_planned_cell() == (self.x_pos, self.y_pos)
+
+    def remaining_cells(self):
+        # The planned cells not walked yet
+        return self.planned_cells[self._next_step_idx:]
+
+    def replace_remaining_path(self, cells):
+        # Keeps the steps already walked and swaps in a new tail from here on
+        self.planned_cells = self.planned_cells[: self._next_step_idx] + list(cells)
+        if self.planned_cells:
+            self.plan_cursor_x, self.plan_cursor_y = self.planned_cells[-1]
+        else:
+            self.plan_cursor_x, self.plan_cursor_y = self.x_pos, self.y_pos
+
     # -------- Movement --------
     def start_movement(self):
         self._next_step_idx = 0
@@ -152,6 +183,12 @@ class Movable(Entity):
         # Entity is considered done if it finished its path or was destroyed by fire
         return self.destroyed or self._next_step_idx >= len(self.planned_cells)
 
+    def next_planned_cell(self):
+        # The cell the next movement step will enter, or None when finished
+        if self.is_done():
+            return None
+        return self.planned_cells[self._next_step_idx]
+
     def advance_one_step(self, grid):
         
         if self.destroyed:
@@ -161,8 +198,9 @@ class Movable(Entity):
 
         target_x, target_y = self.planned_cells[self._next_step_idx]
 
-        # Should already be valid from plannin but doing this to be safe
-        if grid.is_blocked(target_x, target_y):
+        # Should already be valid from plannin but doing this to be safe.
+        # The entity's own cell is allowed so planned waits go through.
+        if (target_x, target_y) != (self.x_pos, self.y_pos) and grid.is_blocked(target_x, target_y):
             return False
 
         grid.move_entity(self, target_x, target_y)
@@ -175,24 +213,24 @@ class Movable(Entity):
         if self.destroyed:
             return
 
-        on_fire = grid.is_fire(self.x_pos, self.y_pos)
-        near_fire = grid.is_adjacent_to_fire(self.x_pos, self.y_pos)
+        # One read of the grid's fire distance field: 0 on fire, 1 beside it
+        distance = grid.fire_distance(self.x_pos, self.y_pos)
 
         damage = 0
 
-        if on_fire:
+        if distance == 0:
             # Direct fire contact causes high damage
             self.time_in_fire += 1
             self.exposure_ticks += 1
-            multiplier = min(1 + 0.25 * (self.exposure_ticks - 1), 2.0)
-            damage = 10 * multiplier
+            multiplier = min(1 + EXPOSURE_RAMP * (self.exposure_ticks - 1), MAX_EXPOSURE_MULTIPLIER)
+            damage = FIRE_DAMAGE * multiplier
 
-        elif near_fire:
+        elif distance == 1:
             # Direct fire contact causes high damage
             self.time_near_fire += 1
             self.exposure_ticks += 1
-            multiplier = min(1 + 0.25 * (self.exposure_ticks - 1), 2.0)
-            damage = 3 * multiplier
+            multiplier = min(1 + EXPOSURE_RAMP * (self.exposure_ticks - 1), MAX_EXPOSURE_MULTIPLIER)
+            damage = NEAR_FIRE_DAMAGE * multiplier
 
         else:
             # Exposure resets when the entity reaches a safe tile
@@ -220,23 +258,50 @@ class Movable(Entity):
     #             self.y_pos = new_y
     #             grid.entities[(self.x_pos, self.y_pos)] = self
 
-    def draw(self, window):
+    def draw(self, window, view=None):
+        import pygame
+
+        view = view or DEFAULT_VIEW
         # Draw planned path dots first so entity draws on top
+        inset = view.scale(self.PATH_DOT_INSET)
         for (x, y) in self.planned_cells:
-            dot = pygame.Rect(
-                x * CELL_SIZE + self.PATH_DOT_INSET,
-                y * CELL_SIZE + self.PATH_DOT_INSET,
-                CELL_SIZE - 2 * self.PATH_DOT_INSET,
-                CELL_SIZE - 2 * self.PATH_DOT_INSET,
-            )
-            pygame.draw.rect(window, self.PATH_DOT_COLOR, dot)
-
-        super().draw(window)
+            if view.is_visible(x, y):
+                dot = view.rect(x, y).inflate(-2 * inset, -2 * inset)
+                pygame.draw.rect(window, self.PATH_DOT_COLOR, dot)
+
+        super().draw(window, view)
         if self.selected:
-            rect = pygame.Rect(
-                self.x_pos * CELL_SIZE,
-                self.y_pos * CELL_SIZE,
-                CELL_SIZE,
-                CELL_SIZE
-            )
-            pygame.draw.rect(window, (255, 255, 255), rect, 3)
+            rect = view.rect(self.x_pos, self.y_pos)
+            pygame.draw.rect(window, (255, 255, 255), rect, max(1, view.scale(3)))
+
+
+def apply_fire_damage_all(movables, grid):
+    """
+    Movable.apply_fire_damage for every movable at once: their distances
+    to fire come from one read of the grid's fire distance field and the
+    damage is worked out for all of them together.
+    """
+    live = [m for m in movables if not m.destroyed]
+    if not live:
+        return
+    distance = grid.fire_distances([(m.x_pos, m.y_pos) for m in live])
+    on_fire = distance == 0
+    near_fire = distance == 1
+
+    exposure = np.array([m.exposure_ticks for m in live])
+    exposure = np.where(on_fire | near_fire, exposure + 1, 0)
+    multiplier = np.minimum(1 + EXPOSURE_RAMP * (exposure - 1), MAX_EXPOSURE_MULTIPLIER)
+    damage = np.where(on_fire, FIRE_DAMAGE * multiplier, np.where(near_fire, NEAR_FIRE_DAMAGE * multiplier, 0.0))
+
+    rows = zip(live, exposure.tolist(), damage.tolist(), on_fire.tolist(), near_fire.tolist())
+    for movable, exposure_ticks, hit, in_fire, beside_fire in rows:
+        movable.exposure_ticks = exposure_ticks
+        movable.time_in_fire += in_fire
+        movable.time_near_fire += beside_fire
+        if hit > 0:
+            movable.health -= hit
+            movable.fire_damage_taken += hit
+        if movable.health <= 0:
+            movable.health = 0
+            movable.destroyed = True
+            movable.selected = False
@@ -0,0 +1,257 @@
+"""
+grid_sim/fire.py
+
+Vectorized fire spread on a boolean burning array.
+
+Each fire tick every burning cell, with probability FIRE_SPREAD_CHANCE,
+picks one of its four neighbours at random and tries to ignite it. The
+neighbour catches with its ignition probability: 1 on open ground and
+water, FOREST_IGNITION_CHANCE in forest, 0 for blocked cells (walls,
+barriers, movables) and objective cells. These are the rules the old
+per-tile loop in Grid.spread_fire followed, so fire_forecast's arrival
+times still hold.
+
+A tick is a handful of NumPy operations over the burning cells: one draw
+decides which of them spread, one picks their directions, the targets are
+the burning indices shifted by the matching row or column offset, and one
+more draw against the ignition probabilities decides which targets catch.
+All draws come from one numpy.random.Generator, so a seeded FireSpread
+replays the same fire.
+
+FireSpread also keeps a distance field next to the burning array: for
+each cell, the Manhattan distance to the nearest burning cell, capped at
+FIRE_DISTANCE_CAP. Fire only grows, so each ignition can only lower the
+distances within the cap around it, and the field is updated from the
+newly ignited cells alone. Damage, spawn-safety and risk checks are then
+one read. As with TerrainLayers, single cells are read from a bytearray
+that shares memory with the NumPy array.
+
+These are the default rules; fire_models.py holds the alternatives a
+scenario can pick, which step takes as its model argument. FireSpread
+counts its ticks and records the tick each cell caught, for models whose
+spread depends on how long a cell has been burning.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .layers import FOREST
+
+# Per fire tick, each burning tile tries to spread with this chance, into
+# one random neighbour; forest then catches with FOREST_IGNITION_CHANCE
+FIRE_SPREAD_CHANCE = 0.35
+FOREST_IGNITION_CHANCE = 0.8
+
+# Distances to fire at or beyond this are all stored as FIRE_DISTANCE_CAP:
+# 0 burning, 1 next to fire, 2 anywhere else
+FIRE_DISTANCE_CAP = 2
+
+# Neighbour offsets in the order a direction draw indexes them
+_DX = np.array([1, -1, 0, 0])
+_DY = np.array([0, 0, 1, -1])
+
+# (distance, dx, dy) of every offset closer than FIRE_DISTANCE_CAP, nearest first
+_NEAR_OFFSETS = [
+    (abs(dx) + abs(dy), dx, dy)
+    for dy in range(-FIRE_DISTANCE_CAP + 1, FIRE_DISTANCE_CAP)
+    for dx in range(-FIRE_DISTANCE_CAP + 1, FIRE_DISTANCE_CAP)
+    if 0 < abs(dx) + abs(dy) < FIRE_DISTANCE_CAP
+]
+_NEAR_OFFSETS.sort()
+
+
+def terrain_ignition(grid) -> np.ndarray:
+    """
+    (height, width) chance that a cell catches when fire spreads into it,
+    from the terrain and the objective cells. Movables are left out, since
+    they move every tick. Cached on the grid until either changes (read-only).
+    """
+    objectives = frozenset(grid.objective_cells)
+    stamp = (grid.version, objectives)
+    cached = getattr(grid, "_fire_ignition", None)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    layers = grid.layers
+    ignition = np.where(layers.blocking, 0.0, np.where(layers.codes == FOREST, FOREST_IGNITION_CHANCE, 1.0))
+    for x, y in objectives:
+        if 0 <= x < grid.width and 0 <= y < grid.height:
+            ignition[y, x] = 0.0
+    ignition.flags.writeable = False
+    grid._fire_ignition = (stamp, ignition)
+    return ignition
+
+
+def blocking_object_cells(grid) -> np.ndarray:
+    """Flat (y * width + x) indices of the blocking objects on grid, movables included."""
+    width, height = grid.width, grid.height
+    return np.array(
+        [y * width + x for (x, y), entity in grid.objects.items() if entity.blocking and 0 <= x < width and 0 <= y < height],
+        dtype=np.intp,
+    )
+
+
+def ignition_probability(grid) -> np.ndarray:
+    """(height, width) chance that each cell catches right now, movables included."""
+    ignition = terrain_ignition(grid).copy()
+    ignition.flat[blocking_object_cells(grid)] = 0.0
+    return ignition
+
+
+class FireSpread:
+    """
+    The burning cells of a width x height map, their distance field and
+    the generator that spreads them. Change the fire through ignite,
+    ignite_cell and clear, which keep the distance field in step.
+    """
+
+    def __init__(self, width: int, height: int, seed: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.burning = np.zeros((height, width), dtype=bool)
+        # Capped distance to the nearest burning cell; distance is a NumPy
+        # view of the same memory as distance_flat
+        self.distance_flat = bytearray([FIRE_DISTANCE_CAP]) * (width * height)
+        self.distance = np.frombuffer(self.distance_flat, dtype=np.uint8).reshape(height, width)
+        # Fire ticks stepped so far, and the tick each burning cell caught
+        self.ticks = 0
+        self.ignited_at = np.full((height, width), -1, dtype=np.int32)
+        self.rng = np.random.default_rng(seed)
+
+    def seed(self, seed: Optional[int]):
+        self.rng = np.random.default_rng(seed)
+
+    def ignite_cell(self, x: int, y: int):
+        """Sets an in-bounds cell burning."""
+        width, height = self.width, self.height
+        self.burning[y, x] = True
+        self.ignited_at[y, x] = self.ticks
+        distance = self.distance_flat
+        distance[y * width + x] = 0
+        for d, dx, dy in _NEAR_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and distance[ny * width + nx] > d:
+                distance[ny * width + nx] = d
+
+    def ignite(self, cells: np.ndarray):
+        """Sets the cells at the given flat indices burning."""
+        self.burning.ravel()[cells] = True
+        self._mark_ignited(cells)
+
+    def clear(self):
+        self.burning[:] = False
+        self.distance[:] = FIRE_DISTANCE_CAP
+        self.ignited_at[:] = -1
+
+    def _mark_ignited(self, cells: np.ndarray):
+        """Records the ignition tick of newly burning cells and lowers the distances around them."""
+        width, height = self.width, self.height
+        self.ignited_at.ravel()[cells] = self.ticks
+        distance = self.distance.ravel()
+        distance[cells] = 0
+        x = cells % width
+        y = cells // width
+        for d, dx, dy in _NEAR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            near = ny[inside] * width + nx[inside]
+            distance[near] = np.minimum(distance[near], d)
+
+    def step(
+        self,
+        ignition: np.ndarray,
+        blocked: Optional[Iterable[int]] = None,
+        model=None,
+        codes: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Advances one fire tick. ignition is the (height, width) catch
+        chance per cell and blocked any extra flat indices that cannot
+        catch this tick. model is a fire_models model (default: the rules
+        above) and codes the (height, width) terrain codes it reads.
+        Returns the sorted flat indices of the newly ignited cells.
+        """
+        self.ticks += 1
+        sources = np.flatnonzero(self.burning)
+        if model is None:
+            ignited = spread_tick(self.rng, sources, self.burning.ravel(), ignition.ravel(), self.width, self.height, blocked)
+        else:
+            ignited = model.tick(
+                self.rng,
+                sources,
+                self.burning.ravel(),
+                ignition.ravel(),
+                self.width,
+                self.height,
+                blocked,
+                codes=None if codes is None else codes.ravel(),
+                ignited_at=self.ignited_at.ravel(),
+                now=self.ticks,
+            )
+        if ignited.size:
+            self._mark_ignited(ignited)
+        return ignited
+
+
+def spread_tick(
+    rng: np.random.Generator,
+    sources: np.ndarray,
+    burning: np.ndarray,
+    ignition: np.ndarray,
+    width: int,
+    height: int,
+    blocked: Optional[Iterable[int]] = None,
+) -> np.ndarray:
+    """
+    One fire tick from the flat indices in sources over the flat burning
+    array, which is updated in place. Returns the sorted flat indices of
+    the newly ignited cells. Burning cells left out of sources cannot
+    spread this tick.
+
+    burning may hold several copies of the map back to back, indexed
+    copy * width * height + y * width + x; each copy spreads on its own
+    against the same ignition array.
+    """
+    cells = width * height
+    sources = sources[rng.random(sources.size) < FIRE_SPREAD_CHANCE]
+    direction = rng.integers(0, 4, size=sources.size)
+    cell = sources % cells
+    x = cell % width + _DX[direction]
+    y = cell // width + _DY[direction]
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    targets = (sources - cell + y * width + x)[inside]
+
+    chance = ignition[targets % cells]
+    if blocked is not None:
+        blocked = np.asarray(blocked, dtype=np.intp)
+        if blocked.size:
+            chance = np.where(np.isin(targets, blocked), 0.0, chance)
+    targets = targets[rng.random(targets.size) < chance]
+
+    ignited = np.unique(targets[~burning[targets]])
+    burning[ignited] = True
+    return ignited
+
+
+def open_front(cells: np.ndarray, burning: np.ndarray, ignition: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    The burning cells among the flat indices in cells that still have a
+    neighbour that is not burning and can catch. Only these can spread:
+    an attempt from anywhere else always fails, so leaving the rest out of
+    spread_tick's sources does not change how the fire grows. Indices may
+    address stacked copies of the map, as in spread_tick.
+    """
+    size = width * height
+    cell = cells % size
+    base = cells - cell
+    x = cell % width
+    y = cell // width
+    open_neighbour = np.zeros(cells.size, dtype=bool)
+    for dx, dy in zip(_DX.tolist(), _DY.tolist()):
+        nx = x + dx
+        ny = y + dy
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        neighbour = np.where(inside, ny * width + nx, 0)
+        open_neighbour |= inside & ~burning[base + neighbour] & (ignition[neighbour] > 0)
+    return cells[open_neighbour]
@@ -0,0 +1,184 @@
+"""
+grid_sim/fire_ensemble.py
+
+Monte Carlo fire forecasts: many independent spread rollouts from the
+current fire, summarised as the chance that each cell is burning after
+each tick.
+
+fire_forecast gives one expected arrival time per cell. Fire spread is
+random, though, and single runs scatter widely around it; an ensemble
+shows how likely each cell is to burn, and by when. forecast_fire runs
+`runs` rollouts of `ticks` fire ticks with the grid's fire model
+(fire_models.py).
+
+Rollouts go in fixed-size batches, each batch a stack of map copies that
+the model's tick advances together, so one tick of NumPy calls serves
+every run in the batch. Each batch draws from its own child of one
+SeedSequence; batch sizes depend only on the run count and the map size,
+so the result does not depend on how many worker processes share them.
+
+Rollouts only draw for the open front (fire.open_front): burning cells
+with a neighbour that can still catch. Deep inside a fire every spread
+attempt fails anyway, so leaving those cells out changes nothing but the
+cost, which then grows with the length of the fire's edge rather than
+its area.
+
+Each worker returns how many of its runs ignited each cell at each tick,
+as sparse (tick * cells + cell, count) pairs; the parent adds them into
+one dense histogram and takes a running sum over the ticks.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED
+from .fire import ignition_probability, open_front
+
+DEFAULT_RUNS = 1000
+DEFAULT_TICKS = 200
+
+# Rollouts advanced together in one stack of map copies, as long as the
+# stack stays under BATCH_CELLS cells
+BATCH_RUNS = 50
+BATCH_CELLS = 16_000_000
+
+# Below this much work (runs * ticks * cells) starting the pool costs more
+# than it saves, and the batches run in this process
+MIN_PARALLEL_WORK = 1_000_000_000
+
+
+@dataclass
+class FireEnsemble:
+    """
+    burned[t, y, x] is the number of the `runs` rollouts in which (x, y)
+    is burning after t fire ticks; t = 0 is the fire the forecast started
+    from.
+    """
+
+    runs: int
+    ticks: int
+    burned: np.ndarray
+
+    @property
+    def width(self) -> int:
+        return self.burned.shape[2]
+
+    @property
+    def height(self) -> int:
+        return self.burned.shape[1]
+
+    def probability(self, tick: int) -> np.ndarray:
+        """(height, width) chance that each cell is burning after tick fire ticks."""
+        tick = min(max(tick, 0), self.ticks)
+        return self.burned[tick] / float(self.runs)
+
+    def probabilities(self) -> np.ndarray:
+        """(ticks + 1, height, width) float32 chance of burning, per tick."""
+        return (self.burned / np.float32(self.runs)).astype(np.float32)
+
+    def arrival_ticks(self, confidence: float = 0.1) -> List[float]:
+        """
+        Flat (y * width + x) first tick at which at least `confidence` of
+        the runs have the cell burning, BLOCKED if that never happens within
+        the forecast. Feeds fire_forecast.arrival_steps and plan_fire_safe
+        in place of fire_arrival_ticks.
+        """
+        reached = self.burned >= max(confidence, 0.0) * self.runs
+        first = np.argmax(reached, axis=0).astype(float)
+        first[~reached.any(axis=0)] = BLOCKED
+        return first.ravel().tolist()
+
+
+def forecast_fire(
+    grid,
+    runs: int = DEFAULT_RUNS,
+    ticks: int = DEFAULT_TICKS,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> FireEnsemble:
+    """
+    Runs `runs` seeded spread rollouts of `ticks` fire ticks from the
+    grid's current fire, terrain, movables and objective cells, across a
+    process pool of `workers` processes (default: one per CPU). Small
+    forecasts run in this process.
+    """
+    width, height = grid.width, grid.height
+    cells = width * height
+    burning = grid.fire.burning.ravel().copy()
+    ignition = ignition_probability(grid).ravel()
+    model = grid.fire_model
+    # Models that age their cells carry on from the grid's own fire clock
+    clock = (
+        (grid.layers.codes.ravel().copy(), grid.fire.ignited_at.ravel().copy(), grid.fire.ticks)
+        if model.tracks_age
+        else None
+    )
+
+    size = max(1, min(BATCH_RUNS, BATCH_CELLS // cells))
+    counts = [min(size, runs - start) for start in range(0, runs, size)]
+    batches = list(zip(np.random.SeedSequence(seed).spawn(len(counts)), counts))
+
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers > 1 and runs * ticks * cells >= MIN_PARALLEL_WORK:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(burning, ignition, width, height, ticks, model, clock),
+        ) as pool:
+            results = list(pool.map(_rollout_batch, batches))
+    else:
+        _init_worker(burning, ignition, width, height, ticks, model, clock)
+        results = [_rollout_batch(batch) for batch in batches]
+
+    dtype = np.uint16 if runs < 2 ** 16 else np.uint32
+    burned = np.zeros((ticks + 1) * cells, dtype=dtype)
+    burned[:cells][burning] = runs
+    for keys, hits in results:
+        burned[keys] += hits.astype(dtype)
+    burned = burned.reshape(ticks + 1, height, width)
+    np.cumsum(burned, axis=0, out=burned)
+    return FireEnsemble(runs, ticks, burned)
+
+
+# Set once per worker process by _init_worker, so the map is not sent with every batch
+_worker_state = None
+
+
+def _init_worker(burning, ignition, width, height, ticks, model, clock):
+    global _worker_state
+    _worker_state = (burning, ignition, width, height, ticks, model, clock)
+
+
+def _rollout_batch(batch) -> Tuple[np.ndarray, np.ndarray]:
+    """(tick * cells + cell, runs) for every cell the batch's rollouts ignited."""
+    seed, count = batch
+    start, ignition, width, height, ticks, model, clock = _worker_state
+    cells = width * height
+    rng = np.random.default_rng(seed)
+    # count copies of the map back to back, one per rollout
+    burning = np.tile(start, count)
+    codes = ignited_at = None
+    now = 0
+    if clock is not None:
+        codes, start_ignited_at, now = clock
+        ignited_at = np.tile(start_ignited_at, count)
+    front = open_front(np.flatnonzero(burning), burning, ignition, width, height)
+    keys = []
+    for tick in range(1, ticks + 1):
+        if not front.size:
+            break
+        ignited = model.tick(
+            rng, front, burning, ignition, width, height, codes=codes, ignited_at=ignited_at, now=now + tick
+        )
+        if ignited.size:
+            if ignited_at is not None:
+                ignited_at[ignited] = now + tick
+            keys.append(ignited % cells + tick * cells)
+            front = open_front(np.concatenate((front, ignited)), burning, ignition, width, height)
+    if not keys:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.unique(np.concatenate(keys), return_counts=True)
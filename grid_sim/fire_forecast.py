@@ -0,0 +1,181 @@
+"""
+grid_sim/fire_forecast.py
+
+Predicted fire arrival times, and a planner that routes around the fire
+where it will be when the entity gets there rather than where it is now.
+
+Grid.spread_fire (fire.py) gives every burning tile a FIRE_SPREAD_CHANCE per fire
+tick of spreading into one of its four neighbours, picked at random, and
+forest only catches with FOREST_IGNITION_CHANCE. A cell with k burning
+neighbours therefore ignites with probability about
+
+    p = k * FIRE_SPREAD_CHANCE / 4      (x FOREST_IGNITION_CHANCE in forest)
+
+per tick, which takes 1 / p ticks on average. Once a fire is a few tiles
+across, a cell on its edge typically borders FRONT_NEIGHBOURS = 2 burning
+tiles, and the front advances one cell per 1 / p ticks in every direction
+(Monte Carlo runs of spread_fire on an open map agree to within ~25%,
+erring early along the axes).
+Blocked cells and objective cells never burn. One Dijkstra pass from the
+burning tiles, with 1 / p as the price of entering each cell, gives the
+expected tick at which each cell ignites: fire_arrival_ticks.
+
+That is a typical arrival time and single runs scatter widely around it,
+so planners scale it by a safety factor and treat a cell as burning from
+that earlier step on.
+
+plan_fire_safe then searches over (cell, step). Entering a cell that will
+be burning at that step is not allowed; entering one next to a cell that
+will be burning costs NEAR_FIRE_COST_PENALTY on top of fuel. Fire only
+ever grows, so of two ways to reach a cell the later one can never be
+better: labels are pruned on (cost, step) dominance, as in fuel_routing.
+"""
+
+import heapq
+from typing import List
+
+import numpy as np
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, SearchResult, cost_from
+from .cost_model import CostMap, NEAR_FIRE_COST_PENALTY
+from .fire import FIRE_SPREAD_CHANCE, ignition_probability
+
+# Burning neighbours of a typical cell on the edge of a spreading fire
+FRONT_NEIGHBOURS = 2
+
+# Fraction of the predicted arrival time at which a cell is treated as
+# burning; 0.7 is about the 10th percentile of simulated arrival times
+DEFAULT_SAFETY = 0.7
+
+DEFAULT_MAX_LABELS = 500_000
+
+
+def ignition_delays(grid) -> List[float]:
+    """Expected fire ticks for each cell to catch once it is on the fire front."""
+    plain = 4.0 / (FRONT_NEIGHBOURS * FIRE_SPREAD_CHANCE)
+    # The spread rules' own catch chances; cells that never catch stay BLOCKED
+    ignition = ignition_probability(grid)
+    delays = np.full(ignition.shape, BLOCKED)
+    np.divide(plain, ignition, out=delays, where=ignition > 0)
+    return delays.ravel().tolist()
+
+
+def fire_arrival_ticks(grid) -> List[float]:
+    """
+    Flat (y * width + x) expected fire tick at which each cell ignites:
+    0 for cells burning now, BLOCKED for cells the fire can never reach.
+    Cached on the grid until the terrain or the fire changes.
+    """
+    stamp = (grid.version, grid.fire_version)
+    cached = getattr(grid, "_fire_arrival", None)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    delays = ignition_delays(grid)
+    arrival = cost_from(grid.width, grid.height, delays.__getitem__, grid.fire_tiles)
+    grid._fire_arrival = (stamp, arrival)
+    return arrival
+
+
+def arrival_steps(arrival_ticks: List[float], steps_per_fire_tick: float, safety: float = DEFAULT_SAFETY) -> List[float]:
+    """
+    Converts fire ticks to movement steps (SimulationTiming gives
+    fire_tick_ms / simulation_step_ms steps per fire tick), scaled by
+    safety. Burning cells stay at 0 and unreachable ones at BLOCKED.
+    """
+    scale = steps_per_fire_tick * safety
+    return [t * scale for t in arrival_ticks]
+
+
+def plan_fire_safe(
+    cost_map: CostMap,
+    ignite_step: List[float],
+    start: Point,
+    goal: Point,
+    fuel_per_step: float = 1.0,
+    max_labels: int = DEFAULT_MAX_LABELS,
+) -> SearchResult:
+    """
+    Cheapest route (fuel plus near-fire penalties) from start to goal that
+    never enters a cell at or after the step it is predicted to ignite
+    (ignite_step from arrival_steps). The start cell is exempt: the entity
+    is already there. Step t is the t-th cell entered.
+    """
+    width = cost_map.width
+    height = cost_map.height
+    sx, sy = start
+    gx, gy = goal
+    if not (cost_map.in_bounds(sx, sy) and cost_map.in_bounds(gx, gy)):
+        return SearchResult(None)
+    if start == goal:
+        return SearchResult([start], 0.0, 0)
+    if cost_map.is_blocked(gx, gy):
+        return SearchResult(None)
+
+    fuel = cost_map.step_costs(fuel_per_step)
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+
+    label_cell = [start_index]
+    label_parent = [-1]
+    label_cost = [0.0]
+    # Earliest step at which each cell has been settled; a later arrival
+    # with a higher cost is dominated
+    settled_step = [BLOCKED] * (width * height)
+    heap = [((abs(sx - gx) + abs(sy - gy)) * fuel_per_step, 0, 0)]
+    expanded = 0
+
+    while heap:
+        _, step, label = heapq.heappop(heap)
+        current = label_cell[label]
+        if step >= settled_step[current]:
+            continue
+        settled_step[current] = step
+        if current == goal_index:
+            return SearchResult(_label_path(label, label_cell, label_parent, width), label_cost[label], expanded)
+        if len(label_cell) >= max_labels:
+            break
+        expanded += 1
+
+        next_step = step + 1
+        spent = label_cost[label]
+        cy, cx = divmod(current, width)
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            step_fuel = fuel[neighbor]
+            if step_fuel == BLOCKED or next_step >= settled_step[neighbor]:
+                continue
+            if ignite_step[neighbor] <= next_step:
+                continue  # will be burning by the time we get there
+            cost = spent + step_fuel
+            if _near_fire(ignite_step, nx, ny, width, height, next_step):
+                cost += NEAR_FIRE_COST_PENALTY
+            label_cell.append(neighbor)
+            label_parent.append(label)
+            label_cost.append(cost)
+            h = (abs(nx - gx) + abs(ny - gy)) * fuel_per_step
+            heapq.heappush(heap, (cost + h, next_step, len(label_cell) - 1))
+
+    return SearchResult(None, BLOCKED, expanded)
+
+
+def _near_fire(ignite_step: List[float], x: int, y: int, width: int, height: int, step: int) -> bool:
+    for dx, dy in NEIGHBORS_4:
+        nx = x + dx
+        ny = y + dy
+        if 0 <= nx < width and 0 <= ny < height and ignite_step[ny * width + nx] <= step:
+            return True
+    return False
+
+
+def _label_path(label: int, label_cell: List[int], label_parent: List[int], width: int) -> List[Point]:
+    path = []
+    while label != -1:
+        y, x = divmod(label_cell[label], width)
+        path.append((x, y))
+        label = label_parent[label]
+    path.reverse()
+    return path
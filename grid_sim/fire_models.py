@@ -0,0 +1,254 @@
+"""
+grid_sim/fire_models.py
+
+Pluggable rules for how fire spreads, chosen per scenario.
+
+A fire model decides, each fire tick, which neighbours of the burning cells
+catch. Grid.spread_fire and forecast_fire hand it the same arguments as
+fire.spread_tick, plus the terrain codes, the tick each cell caught
+(ignited_at, laid out like burning) and the current tick, and it returns
+the sorted flat indices it ignited.
+
+    isotropic - the default, fire.spread_tick unchanged: one random
+                direction per burning cell, FIRE_SPREAD_CHANCE to spread,
+                FOREST_IGNITION_CHANCE to catch in forest
+    wind      - every neighbour gets its own draw, against a chance read
+                from a precomputed kernel
+
+The wind kernel is a (direction, source terrain, burn age, target terrain)
+table of catch chances, built once from the scenario's parameters:
+
+    base spread chance * wind factor(direction)
+        * ignitability(target terrain) * still burning(source terrain, age)
+
+The wind factor follows Alexandridis et al. (2008):
+exp(c1 * V) * exp(c2 * V * (cos(theta) - 1)), with V the wind speed and
+theta the angle between the wind and the direction of spread, so fire runs
+downwind and barely creeps upwind. A cell spreads for burn_ticks of its
+terrain, then smoulders: it stays on fire (and still hurts whatever stands
+in it) but ignites nothing more. Fuel load shows up twice, as how readily
+a terrain catches and how long it burns. With no wind the per-neighbour
+chance is FIRE_SPREAD_CHANCE / 4, so a young fire spreads at the default
+rate.
+
+A tick is one lookup into the flattened kernel for every (burning cell,
+direction) pair and one draw against it, as NumPy operations.
+
+Scenarios pick a model with string fields in MapData.metadata:
+
+    fire_model              "isotropic" (default) or "wind"
+    fire_wind_direction     degrees the wind blows towards; 0 north (up), 90 east
+    fire_wind_speed         m/s
+    fire_spread_chance      per-neighbour chance per tick, before wind
+    fire_ignitability_<t>   catch multiplier for t in open, water, forest
+    fire_burn_ticks_<t>     ticks a burning t cell spreads; 0 never burns out
+"""
+
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+
+from .fire import _DX, _DY, FIRE_SPREAD_CHANCE, FOREST_IGNITION_CHANCE, spread_tick
+from .layers import CODE_BLOCKING, EMPTY, FOREST, WATER
+
+# Alexandridis et al. wind coefficients, per m/s
+WIND_C1 = 0.045
+WIND_C2 = 0.131
+
+# Terrain classes that can burn, by the name used in metadata keys
+BURNABLE_TERRAIN = {"open": EMPTY, "water": WATER, "forest": FOREST}
+
+DEFAULT_IGNITABILITY = {"open": 1.0, "water": 0.0, "forest": FOREST_IGNITION_CHANCE}
+DEFAULT_BURN_TICKS = {"open": 20, "water": 1, "forest": 40}
+
+# Compass bearing of each neighbour offset in fire._DX/_DY: east, west, south, north
+_BEARINGS = np.radians([90.0, 270.0, 180.0, 0.0])
+
+_CODES = len(CODE_BLOCKING)
+
+
+class IsotropicFireModel:
+    """The default rules of fire.py."""
+
+    name = "isotropic"
+    tracks_age = False
+
+    def tick(
+        self,
+        rng: np.random.Generator,
+        sources: np.ndarray,
+        burning: np.ndarray,
+        ignition: np.ndarray,
+        width: int,
+        height: int,
+        blocked: Optional[Iterable[int]] = None,
+        codes: Optional[np.ndarray] = None,
+        ignited_at: Optional[np.ndarray] = None,
+        now: int = 0,
+    ) -> np.ndarray:
+        return spread_tick(rng, sources, burning, ignition, width, height, blocked)
+
+    def to_metadata(self) -> Dict[str, str]:
+        return {}
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, str]) -> "IsotropicFireModel":
+        return cls()
+
+
+DEFAULT_FIRE_MODEL = IsotropicFireModel()
+
+
+def wind_factors(direction: float, speed: float) -> np.ndarray:
+    """Spread multiplier towards each neighbour in fire._DX/_DY order."""
+    cos = np.cos(_BEARINGS - np.radians(direction))
+    return np.exp(WIND_C1 * speed) * np.exp(WIND_C2 * speed * (cos - 1.0))
+
+
+class WindFireModel:
+    """
+    Wind- and fuel-driven spread from a precomputed kernel; see the module
+    docstring for the parameters.
+    """
+
+    name = "wind"
+    tracks_age = True
+
+    def __init__(
+        self,
+        wind_direction: float = 0.0,
+        wind_speed: float = 0.0,
+        spread_chance: float = FIRE_SPREAD_CHANCE / 4,
+        ignitability: Optional[Mapping[str, float]] = None,
+        burn_ticks: Optional[Mapping[str, int]] = None,
+    ):
+        self.wind_direction = float(wind_direction)
+        self.wind_speed = float(wind_speed)
+        self.spread_chance = float(spread_chance)
+        ignitability = dict(DEFAULT_IGNITABILITY, **(ignitability or {}))
+        burn_ticks = dict(DEFAULT_BURN_TICKS, **(burn_ticks or {}))
+        for terrain in (*ignitability, *burn_ticks):
+            if terrain not in BURNABLE_TERRAIN:
+                raise ValueError(f"Unknown terrain {terrain!r} in fire model parameters.")
+        self.ignitability = {terrain: float(value) for terrain, value in ignitability.items()}
+        self.burn_ticks = {terrain: int(value) for terrain, value in burn_ticks.items()}
+        self.kernel = self._build_kernel()
+        # Ages past max_age all share the last slice of the kernel
+        self.max_age = self.kernel.shape[2] - 1
+        self._kernel_flat = self.kernel.ravel()
+
+    def _build_kernel(self) -> np.ndarray:
+        """(direction, source code, age, target code) chance that the target catches."""
+        max_age = max(self.burn_ticks.values())
+        catch = np.zeros(_CODES)
+        burns = np.zeros((_CODES, max_age + 1), dtype=bool)
+        for terrain, code in BURNABLE_TERRAIN.items():
+            catch[code] = self.ignitability[terrain]
+            ticks = self.burn_ticks[terrain]
+            burns[code] = True if ticks <= 0 else np.arange(max_age + 1) < ticks
+        wind = wind_factors(self.wind_direction, self.wind_speed)
+        kernel = (
+            self.spread_chance
+            * wind[:, None, None, None]
+            * burns[None, :, :, None]
+            * catch[None, None, None, :]
+        )
+        return np.clip(kernel, 0.0, 1.0)
+
+    def tick(
+        self,
+        rng: np.random.Generator,
+        sources: np.ndarray,
+        burning: np.ndarray,
+        ignition: np.ndarray,
+        width: int,
+        height: int,
+        blocked: Optional[Iterable[int]] = None,
+        codes: Optional[np.ndarray] = None,
+        ignited_at: Optional[np.ndarray] = None,
+        now: int = 0,
+    ) -> np.ndarray:
+        """
+        spread_tick with one draw per neighbour against the kernel. codes is
+        the flat terrain of one map; burning, ignited_at and the indices may
+        address stacked copies of it, as in spread_tick. ignition only
+        marks which cells can catch at all (objective cells, movables).
+        """
+        cells = width * height
+        cell = sources % cells
+        base = sources - cell
+        age = np.clip(now - 1 - ignited_at[sources], 0, self.max_age)
+        source_row = codes[cell].astype(np.intp) * (self.max_age + 1) + age
+
+        x = cell % width + _DX[:, None]
+        y = cell // width + _DY[:, None]
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        neighbour = np.where(inside, y * width + x, 0)
+        direction = np.arange(4)[:, None] * (_CODES * (self.max_age + 1))
+        chance = self._kernel_flat[(direction + source_row) * _CODES + codes[neighbour]]
+        chance = np.where(inside & (ignition[neighbour] > 0), chance, 0.0)
+
+        targets = base + neighbour
+        if blocked is not None:
+            blocked = np.asarray(blocked, dtype=np.intp)
+            if blocked.size:
+                chance = np.where(np.isin(targets, blocked), 0.0, chance)
+        targets = targets[rng.random(targets.shape) < chance]
+
+        ignited = np.unique(targets[~burning[targets]])
+        burning[ignited] = True
+        return ignited
+
+    def to_metadata(self) -> Dict[str, str]:
+        metadata = {
+            "fire_model": self.name,
+            "fire_wind_direction": repr(self.wind_direction),
+            "fire_wind_speed": repr(self.wind_speed),
+            "fire_spread_chance": repr(self.spread_chance),
+        }
+        for terrain in BURNABLE_TERRAIN:
+            metadata[f"fire_ignitability_{terrain}"] = repr(self.ignitability[terrain])
+            metadata[f"fire_burn_ticks_{terrain}"] = str(self.burn_ticks[terrain])
+        return metadata
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, str]) -> "WindFireModel":
+        def number(key, default, kind=float):
+            value = metadata.get(key)
+            if value is None or value == "":
+                return default
+            try:
+                return kind(value)
+            except ValueError:
+                raise ValueError(f"Fire model parameter {key} must be a number, not {value!r}.") from None
+
+        return cls(
+            wind_direction=number("fire_wind_direction", 0.0),
+            wind_speed=number("fire_wind_speed", 0.0),
+            spread_chance=number("fire_spread_chance", FIRE_SPREAD_CHANCE / 4),
+            ignitability={
+                terrain: number(f"fire_ignitability_{terrain}", DEFAULT_IGNITABILITY[terrain])
+                for terrain in BURNABLE_TERRAIN
+            },
+            burn_ticks={
+                terrain: number(f"fire_burn_ticks_{terrain}", DEFAULT_BURN_TICKS[terrain], int)
+                for terrain in BURNABLE_TERRAIN
+            },
+        )
+
+
+FIRE_MODELS = {
+    IsotropicFireModel.name: IsotropicFireModel,
+    WindFireModel.name: WindFireModel,
+}
+
+
+def fire_model_from_metadata(metadata: Mapping[str, str]):
+    """The fire model a map's metadata asks for; the default when it names none."""
+    name = metadata.get("fire_model") or IsotropicFireModel.name
+    if name not in FIRE_MODELS:
+        known = ", ".join(sorted(FIRE_MODELS))
+        raise ValueError(f"Unknown fire model {name!r}; expected one of {known}.")
+    if name == IsotropicFireModel.name:
+        return DEFAULT_FIRE_MODEL
+    return FIRE_MODELS[name].from_metadata(metadata)
@@ -0,0 +1,167 @@
+"""
+grid_sim/flow_field.py
+
+Shared flow fields towards a set of objective cells.
+
+One multi-source reverse Dijkstra from every objective cell gives, for
+every cell on the map, the cheapest cost to the nearest objective. Any
+movable can then walk downhill from wherever it stands, one O(1) lookup
+per step, so routing N movables costs a single field computation plus
+O(path) work each instead of N separate searches.
+
+Fields are built on fire-aware costs (terrain plus fire risk at
+fuel_per_step = 1) and cached on the grid per objective set. They are
+recomputed only when grid.version (terrain edits) or grid.fire_version
+(fire ticks) changes. flow_fields_to_cells builds many single-cell fields
+(one per movable's own objective) in one batched NumPy pass;
+flow_fields_to_cells_steps does the same a chunk at a time.
+"""
+
+from typing import Dict, FrozenSet, Generator, Iterable, List, Optional, Sequence
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, cost_to_go, search
+from .cost_model import cost_map_for, fire_aware_costs_from_field, fire_penalty_field
+from .wavefront import array_steps, cost_to_go_steps, drain, list_steps
+
+
+class FlowField:
+    """Cost-to-nearest-target for every cell, plus downhill routing."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        costs: Sequence[float],
+        targets: Iterable[Point],
+        distance: Optional[List[float]] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.costs = costs
+        self.targets = frozenset(targets)
+        # distance may come precomputed from a batch (flow_fields_to_cells)
+        if distance is None:
+            distance = cost_to_go(width, height, costs.__getitem__, self.targets)
+        self.distance = distance
+
+    def distance_at(self, x: int, y: int) -> float:
+        """Cost from (x, y) to the nearest target, BLOCKED if unreachable."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return BLOCKED
+        return self.distance[y * self.width + x]
+
+    def next_cell(self, x: int, y: int) -> Optional[Point]:
+        """
+        The neighbour to step into from (x, y) along a cheapest route, or
+        None at a target or where no target can be reached.
+        """
+        if (x, y) in self.targets:
+            return None
+        width = self.width
+        costs = self.costs
+        distance = self.distance
+        best = None
+        best_cost = BLOCKED
+        for dx, dy in NEIGHBORS_4:
+            nx = x + dx
+            ny = y + dy
+            if not (0 <= nx < width and 0 <= ny < self.height):
+                continue
+            neighbor = ny * width + nx
+            candidate = costs[neighbor] + distance[neighbor]
+            if candidate < best_cost:
+                best_cost = candidate
+                best = (nx, ny)
+        return best
+
+    def path_from(self, start: Point) -> Optional[List[Point]]:
+        """
+        Cheapest route from start to the nearest target, inclusive of both
+        ends, or None if no target is reachable. The start itself may be
+        blocked (an entity standing on it).
+        """
+        x, y = start
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        path = [start]
+        limit = self.width * self.height
+        while (x, y) not in self.targets:
+            step = self.next_cell(x, y)
+            if step is None or len(path) > limit:
+                return None
+            x, y = step
+            path.append(step)
+        return path
+
+    def path_to(self, start: Point, goal: Point) -> Optional[List[Point]]:
+        """
+        Route from start to one particular goal near the targets (e.g. an
+        entity's own objective cell in the zone): downhill to the nearest
+        target, then a short A* hop from there to goal.
+        """
+        path = self.path_from(start)
+        if path is None or path[-1] == goal:
+            return path
+        hop = search(self.width, self.height, self.costs.__getitem__, path[-1], goal)
+        if not hop.found:
+            return None
+        return path + hop.path[1:]
+
+
+def _field_cache(grid) -> Dict[FrozenSet[Point], FlowField]:
+    """The grid's field cache, emptied whenever the terrain or the fire changed."""
+    stamp = (grid.version, grid.fire_version)
+    cache: Dict[FrozenSet[Point], FlowField] = getattr(grid, "_flow_fields", None)
+    if cache is None or getattr(grid, "_flow_fields_stamp", None) != stamp:
+        cache = {}
+        grid._flow_fields = cache
+        grid._flow_fields_stamp = stamp
+    return cache
+
+
+def flow_field_for(grid, targets: Iterable[Point]) -> FlowField:
+    """
+    Returns the cached FlowField towards targets on grid, building it on
+    first use and again only after the terrain or the fire changed.
+    """
+    cache = _field_cache(grid)
+    key = frozenset(targets)
+    field = cache.get(key)
+    if field is None:
+        cost_map = cost_map_for(grid)
+        costs = fire_aware_costs_from_field(cost_map, grid.fire.distance)
+        field = FlowField(cost_map.width, cost_map.height, costs, key)
+        cache[key] = field
+    return field
+
+
+def flow_fields_to_cells(grid, cells: Sequence[Point]) -> List[FlowField]:
+    """
+    One cached FlowField per cell (towards that cell alone), like calling
+    flow_field_for(grid, [cell]) for each, except that every missing field
+    is computed together by wavefront.cost_to_go_many.
+    """
+    return drain(flow_fields_to_cells_steps(grid, cells))
+
+
+def flow_fields_to_cells_steps(grid, cells: Sequence[Point]) -> Generator[None, None, List[FlowField]]:
+    """
+    flow_fields_to_cells as a generator that yields None between chunks of
+    the wavefront, and between the whole-map conversions before and after
+    it, and returns the fields.
+    """
+    cache = _field_cache(grid)
+    missing = list(dict.fromkeys(cell for cell in cells if frozenset([cell]) not in cache))
+    if missing:
+        cost_map = cost_map_for(grid)
+        yield
+        shape = (cost_map.height, cost_map.width)
+        grid_costs = yield from array_steps(cost_map.step_costs(), shape)
+        grid_costs += fire_penalty_field(grid.fire.distance)
+        costs = yield from list_steps(grid_costs)
+        fields = yield from cost_to_go_steps(grid_costs, missing)
+        for cell, distance in zip(missing, fields):
+            key = frozenset([cell])
+            distance = yield from list_steps(distance)
+            cache[key] = FlowField(cost_map.width, cost_map.height, costs, key, distance)
+    return [cache[frozenset([cell])] for cell in cells]
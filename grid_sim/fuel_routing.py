@@ -0,0 +1,235 @@
+"""
+grid_sim/fuel_routing.py
+
+Fuel-constrained routing (a resource-constrained shortest path).
+
+Every other planner minimises one cost and hopes the entity's tank is big
+enough; metrics.can_complete_path only checks afterwards, and at run time
+has_fuel_for_step simply starts failing. Here the fuel actually burned
+(fuel_per_step times the terrain multiplier of each cell entered, exactly
+as EntityMetrics.burn_fuel_for_step charges it) is a hard budget, and the
+route is the best one under a separate objective:
+
+    MINIMISE_STEPS  - fastest: fewest ticks
+    MINIMISE_RISK   - safest: lowest fire-aware cost (terrain plus the
+                      fire penalties from cost_model)
+
+Label-setting search: a label is (objective so far, fuel so far, cell),
+several labels may sit on one cell, and labels are popped in order of
+objective plus an exact objective-to-go heuristic. Two pruning rules keep
+it small:
+
+    - fuel bound: a label whose fuel plus the cheapest possible fuel to
+      the goal exceeds the budget can never finish. If that already holds
+      at the start, no route exists and nothing is searched at all.
+    - dominance: labels reach each cell in non-decreasing objective order,
+      so a label is dominated exactly when an earlier one at that cell used
+      no more fuel. One float per cell (the least fuel settled there) is
+      the whole Pareto check.
+
+The first label to reach the goal is the optimal route within budget, and
+an empty queue proves no route fits.
+
+fuel_constrained_steps runs the same search as a generator that pauses
+while the two to-go fields are built and every FUEL_SEARCH_CHUNK labels,
+for callers that spread it over frames.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Generator, List, Optional, Set
+
+from .astar import BLOCKED, NEIGHBORS_4, Point
+from .cost_model import MINIMISE_STEPS, CostMap, fire_aware_costs
+from .metrics import EntityMetrics
+from .wavefront import array_steps, cost_to_go_steps, drain, list_steps
+
+MINIMISE_RISK = "risk"
+
+# Fuel left over is compared against this rather than 0, so repeated
+# float subtraction in burn_fuel_for_step can never come up short
+FUEL_EPSILON = 1e-9
+
+# Safety valve on pathological maps; the search reports it gave up
+DEFAULT_MAX_LABELS = 500_000
+
+# Labels popped between pauses of fuel_constrained_steps
+FUEL_SEARCH_CHUNK = 500
+
+
+@dataclass
+class FuelRoute:
+    """Outcome of a fuel-constrained search."""
+    path: Optional[List[Point]]
+    cost: float = BLOCKED
+    fuel: float = BLOCKED
+    labels: int = 0
+    # True if the search finished: the path is optimal within the budget,
+    # or (path None) it is proven that no route fits in the budget
+    complete: bool = True
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+
+def fuel_constrained_path(
+    cost_map: CostMap,
+    start: Point,
+    goal: Point,
+    fuel_per_step: float,
+    fuel_budget: float,
+    minimise: str = MINIMISE_STEPS,
+    fire_tiles: Optional[Set[Point]] = None,
+    max_labels: int = DEFAULT_MAX_LABELS,
+) -> FuelRoute:
+    """
+    The route from start to goal that is best under minimise and burns at
+    most fuel_budget. fire_tiles feed the MINIMISE_RISK objective.
+    """
+    return drain(
+        fuel_constrained_steps(cost_map, start, goal, fuel_per_step, fuel_budget, minimise, fire_tiles, max_labels)
+    )
+
+
+def fuel_constrained_steps(
+    cost_map: CostMap,
+    start: Point,
+    goal: Point,
+    fuel_per_step: float,
+    fuel_budget: float,
+    minimise: str = MINIMISE_STEPS,
+    fire_tiles: Optional[Set[Point]] = None,
+    max_labels: int = DEFAULT_MAX_LABELS,
+    chunk: int = FUEL_SEARCH_CHUNK,
+) -> Generator[None, None, FuelRoute]:
+    """
+    fuel_constrained_path as a generator: it yields None between chunks of
+    work and returns the FuelRoute.
+    """
+    width = cost_map.width
+    height = cost_map.height
+    sx, sy = start
+    gx, gy = goal
+    if not (cost_map.in_bounds(sx, sy) and cost_map.in_bounds(gx, gy)) or cost_map.is_blocked(gx, gy):
+        return FuelRoute(None)
+    if start == goal:
+        return FuelRoute([start], 0.0, 0.0)
+
+    fuel = cost_map.step_costs(fuel_per_step)
+    if minimise == MINIMISE_STEPS:
+        objective = cost_map.unit_costs()
+    elif minimise == MINIMISE_RISK:
+        objective = fire_aware_costs(cost_map, fire_tiles or set())
+    else:
+        raise ValueError(f"Unknown minimise mode: {minimise}")
+    yield
+
+    goal_list = [goal]
+    fuel_to_go = yield from _cost_to_go(fuel, width, height, goal_list)
+    objective_to_go = yield from _cost_to_go(objective, width, height, goal_list)
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    budget = fuel_budget - FUEL_EPSILON
+    # The start is never checked for blocking, so its bounds come from its
+    # neighbours: entering one of them is the first step of any route
+    start_fuel_bound = _start_bound(fuel, fuel_to_go, sx, sy, width, height)
+    if start_fuel_bound > budget:
+        return FuelRoute(None)
+
+    # Labels live in parallel lists; the heap holds (f, fuel, label)
+    label_cell = [start_index]
+    label_parent = [-1]
+    label_objective = [0.0]
+    settled_fuel = [BLOCKED] * (width * height)
+    heap = [(_start_bound(objective, objective_to_go, sx, sy, width, height), 0.0, 0)]
+    popped = 0
+
+    while heap:
+        popped += 1
+        if popped % chunk == 0:
+            yield
+        _, used, label = heapq.heappop(heap)
+        current = label_cell[label]
+        if used >= settled_fuel[current]:
+            continue  # dominated: an earlier label got here on less fuel
+        settled_fuel[current] = used
+        if current == goal_index:
+            return FuelRoute(_label_path(label, label_cell, label_parent, width), label_objective[label], used, len(label_cell))
+        if len(label_cell) >= max_labels:
+            return FuelRoute(None, labels=len(label_cell), complete=False)
+
+        spent = label_objective[label]
+        cy, cx = divmod(current, width)
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            step_fuel = fuel[neighbor]
+            if step_fuel == BLOCKED:
+                continue
+            next_fuel = used + step_fuel
+            if next_fuel >= settled_fuel[neighbor] or next_fuel + fuel_to_go[neighbor] > budget:
+                continue
+            next_objective = spent + objective[neighbor]
+            label_cell.append(neighbor)
+            label_parent.append(label)
+            label_objective.append(next_objective)
+            heapq.heappush(heap, (next_objective + objective_to_go[neighbor], next_fuel, len(label_cell) - 1))
+
+    return FuelRoute(None, labels=len(label_cell))
+
+
+def route_within_fuel(
+    cost_map: CostMap,
+    metrics: EntityMetrics,
+    start: Point,
+    goal: Point,
+    minimise: str = MINIMISE_STEPS,
+    fire_tiles: Optional[Set[Point]] = None,
+) -> FuelRoute:
+    """fuel_constrained_path with the entity's speed tier and current fuel."""
+    return drain(route_within_fuel_steps(cost_map, metrics, start, goal, minimise, fire_tiles))
+
+
+def route_within_fuel_steps(
+    cost_map: CostMap,
+    metrics: EntityMetrics,
+    start: Point,
+    goal: Point,
+    minimise: str = MINIMISE_STEPS,
+    fire_tiles: Optional[Set[Point]] = None,
+) -> Generator[None, None, FuelRoute]:
+    """route_within_fuel as a generator, like fuel_constrained_steps."""
+    fuel_per_step = metrics.get_speed_tier().fuel_per_step
+    return fuel_constrained_steps(cost_map, start, goal, fuel_per_step, metrics.fuel, minimise, fire_tiles)
+
+
+def _cost_to_go(costs: List[float], width: int, height: int, targets: List[Point]):
+    # The same field as astar.cost_to_go, from the pausing NumPy wavefront
+    grid_costs = yield from array_steps(costs, (height, width))
+    fields = yield from cost_to_go_steps(grid_costs, targets)
+    return (yield from list_steps(fields[0]))
+
+
+def _start_bound(step: List[float], to_go: List[float], sx: int, sy: int, width: int, height: int) -> float:
+    best = BLOCKED
+    for dx, dy in NEIGHBORS_4:
+        nx = sx + dx
+        ny = sy + dy
+        if 0 <= nx < width and 0 <= ny < height:
+            index = ny * width + nx
+            best = min(best, step[index] + to_go[index])
+    return best
+
+
+def _label_path(label: int, label_cell: List[int], label_parent: List[int], width: int) -> List[Point]:
+    path = []
+    while label != -1:
+        y, x = divmod(label_cell[label], width)
+        path.append((x, y))
+        label = label_parent[label]
+    path.reverse()
+    return path
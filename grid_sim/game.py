@@ -24,7 +24,7 @@ def game(simulation=None, return_action="launcher"):
 
     while simulation.running:
         input_handler.handle_events(pygame.event.get())
-        simulation.update(pygame.time.get_ticks())
+        simulation.update(simulation.clock())
         renderer.render(simulation)
         pygame.display.flip()
         clock.tick(FPS)
@@ -1,65 +1,216 @@
-import pygame
+import numpy as np
+from collections.abc import Mapping
 from .config import *
 import random
-from .entities import Wall
+from .entities import Movable, Wall
+from .fire import (
+    FIRE_DISTANCE_CAP,
+    FIRE_SPREAD_CHANCE,
+    FOREST_IGNITION_CHANCE,
+    FireSpread,
+    blocking_object_cells,
+    terrain_ignition,
+)
+from .fire_models import DEFAULT_FIRE_MODEL
+from .layers import CODE_BLOCKS, CODE_MODIFIER, EMPTY, FOREST, TerrainLayers, terrain_code
 from .terrain import Water, Barrier, Forest
+from .viewport import DEFAULT_VIEW
+
+# Flat tile colours by terrain code for zoomed-out maps; EMPTY is the
+# transparent colour key
+TERRAIN_COLORS = np.array([(255, 0, 255), (128, 128, 128), (30, 100, 160), (32, 80, 20), (140, 50, 50)], dtype=np.uint8)
+
+
+class EntityView(Mapping):
+    """
+    Read-only {(x, y): entity} view over a Grid, for code written against
+    the old entity dict. Movables and other objects come first, then the
+    terrain, built on demand from the layers. Where a movable stands on
+    terrain the movable is what the view shows.
+    """
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __getitem__(self, key):
+        entity = self._grid.objects.get(key)
+        if entity is None:
+            x, y = key
+            if self._grid.in_bounds(x, y):
+                entity = self._grid.layers.entity_at(x, y)
+        if entity is None:
+            raise KeyError(key)
+        return entity
+
+    def __contains__(self, key):
+        grid = self._grid
+        x, y = key
+        if 0 <= x < grid.width and 0 <= y < grid.height and grid.layers.flat[y * grid.width + x]:
+            return True
+        return key in grid.objects
+
+    def __iter__(self):
+        objects = self._grid.objects
+        yield from objects
+        for cell in self._grid.layers.cells():
+            if cell not in objects:
+                yield cell
+
+    def __len__(self):
+        objects = self._grid.objects
+        covered = sum(1 for x, y in objects if self._grid.in_bounds(x, y) and self._grid.layers.code_at(x, y) != EMPTY)
+        return len(objects) + int((self._grid.layers.codes != EMPTY).sum()) - covered
+
+    def items(self):
+        objects = self._grid.objects
+        pairs = list(objects.items())
+        pairs += [(cell, entity) for cell, entity in self._grid.layers.entities() if cell not in objects]
+        return pairs
+
+    def values(self):
+        return [entity for _, entity in self.items()]
+
 
 class Grid:
-    def __init__(self):
-        self.entities = {}  #{(x, y): entity}
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        # Static terrain (walls, water, forest, barriers) as a uint8 code
+        # per cell; see layers.py
+        self.layers = TerrainLayers(self.width, self.height)
+        # Everything else - movables, in practice - by cell: {(x, y): entity}
+        self.objects = {}
+        self.entities = EntityView(self)
         self.fire_tiles = set() # Mark entity as destroyed when health is depleted
+        # The same fire as a bool array, for the vectorized spread in fire.py
+        self.fire = FireSpread(self.width, self.height)
+        # How the fire spreads; a map picks one through its metadata (fire_models.py)
+        self.fire_model = DEFAULT_FIRE_MODEL
         self.objective_cells = set()
+        # Bumped whenever static content changes so planners can cache
+        # anything derived from the map (cost arrays, flow fields, ...)
+        self.version = 0
+        # Bumped whenever the set of fire tiles changes; kept apart from
+        # version so a fire tick does not invalidate terrain-only caches
+        self.fire_version = 0
+        self._terrain_sprites = None
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def add_entity(self, entity):
-        self.entities[(entity.x_pos, entity.y_pos)] = entity
+        x, y = entity.x_pos, entity.y_pos
+        code = terrain_code(entity)
+        if code != EMPTY and self.in_bounds(x, y):
+            if self.layers.set(x, y, code):
+                self.version += 1
+        else:
+            self.objects[(x, y)] = entity
+            # Other objects are part of the static map (CostMap overlays
+            # them); movables come and go every tick and are not
+            if not isinstance(entity, Movable):
+                self.version += 1
+
+    def place_terrain(self, mask, code):
+        """
+        Puts terrain code (layers.WALL, ...) on every cell of a (height,
+        width) bool mask that is free of terrain and objects, in one go.
+        """
+        mask = np.asarray(mask, dtype=bool).copy()
+        for x, y in self.objects:
+            if self.in_bounds(x, y):
+                mask[y, x] = False
+        if self.layers.fill(mask, code):
+            self.version += 1
+
+    def remove_entity(self, x, y):
+        entity = self.objects.pop((x, y), None)
+        if entity is not None and not isinstance(entity, Movable):
+            self.version += 1
+        if entity is None and self.in_bounds(x, y):
+            entity = self.layers.entity_at(x, y)
+            if entity is not None:
+                self.layers.set(x, y, EMPTY)
+                self.version += 1
+        return entity
 
     def is_blocked(self, x, y):
-        entity = self.entities.get((x, y))
+        width = self.width
+        if 0 <= x < width and 0 <= y < self.height and CODE_BLOCKS[self.layers.flat[y * width + x]]:
+            return True
+        entity = self.objects.get((x, y))
         return entity is not None and entity.blocking
     
     def get_terrain_modifier(self, x, y):
         """
         Returns the movement cost modifier for a cell.
-        Forest = 2.0, everything else = 1.0.
-        
+        Terrain tiles report their COST_MULTIPLIER (Water = 2.5,
+        Forest = 1.6, Barrier = inf), everything else = 1.0.
+
         Hook this into metrics.cell_movement_cost for fuel-aware pathing.
         """
-        entity = self.entities.get((x, y))
-        if isinstance(entity, Forest):
-            return Forest.COST_MULTIPLIER
+        width = self.width
+        if 0 <= x < width and 0 <= y < self.height:
+            return CODE_MODIFIER[self.layers.flat[y * width + x]]
         return 1.0
 
     def is_forest(self, x, y):
         """Check if a cell contains a forest tile."""
-        entity = self.entities.get((x, y))
-        return isinstance(entity, Forest)
+        width = self.width
+        return 0 <= x < width and 0 <= y < self.height and self.layers.flat[y * width + x] == FOREST
 
     def add_fire(self, x, y):
         # Fire is stored separately from entities so it behaves like a hazard layer
-        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+        if 0 <= x < self.width and 0 <= y < self.height and (x, y) not in self.fire_tiles:
             self.fire_tiles.add((x, y))
+            self.fire.ignite_cell(x, y)
+            self.fire_version += 1
+
+    def clear_fire(self):
+        if self.fire_tiles:
+            self.fire_tiles.clear()
+            self.fire.clear()
+            self.fire_version += 1
+
+    def seed_fire(self, seed):
+        """Seeds the generator behind spread_fire, so the same fire plays out every run."""
+        self.fire.seed(seed)
 
     def is_fire(self, x, y):
         # Returns True if this grid cell currently contains fire
         return (x, y) in self.fire_tiles
 
+    def fire_distance(self, x, y):
+        """
+        Steps to the nearest fire tile: 0 on fire, 1 next to it, and
+        FIRE_DISTANCE_CAP for anything farther away or off the map.
+        """
+        width = self.width
+        if 0 <= x < width and 0 <= y < self.height:
+            return self.fire.distance_flat[y * width + x]
+        return FIRE_DISTANCE_CAP
+
+    def fire_distances(self, cells):
+        """fire_distance for a list of in-bounds (x, y) cells, as one array read."""
+        if not cells:
+            return np.zeros(0, dtype=np.uint8)
+        xs, ys = zip(*cells)
+        return self.fire.distance[list(ys), list(xs)]
+
     def is_adjacent_to_fire(self, x, y):
         # Checks the four neighboring cells to see if the entity is near fire
-
-        directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-
-        for dx, dy in directions:
-            nx = x + dx
-            ny = y + dy
-
-            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                if self.is_fire(nx, ny):
-                    return True
-
+        distance = self.fire_distance(x, y)
+        if distance != 0:
+            return distance == 1
+
+        # A burning cell is only next to fire if a neighbour burns too
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if self.is_fire(x + dx, y + dy):
+                return True
         return False
 
     def move_entity(self, entity, new_x, new_y, ignore_blocking=False):
-        if not (0 <= new_x < GRID_WIDTH and 0 <= new_y < GRID_HEIGHT):
+        if not (0 <= new_x < self.width and 0 <= new_y < self.height):
             return False
 
         # Allowing for moving into own cell and enforcing blocking if not ignored
@@ -71,20 +222,20 @@ class Grid:
             return False
 
         old_key = (entity.x_pos, entity.y_pos)
-        if old_key in self.entities:
-            del self.entities[old_key]
+        if self.objects.get(old_key) is entity:
+            del self.objects[old_key]
 
         entity.x_pos = new_x
         entity.y_pos = new_y
-        self.entities[(new_x, new_y)] = entity
+        self.objects[(new_x, new_y)] = entity
         return True
 
     def rand_gen_walls(self, count):
         placed = 0
 
         while placed < count:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
+            x = random.randint(0, self.width - 1)
+            y = random.randint(0, self.height - 1)
 
             if (x,y) not in self.entities:
                 self.add_entity(Wall(x,y))
@@ -105,8 +256,8 @@ class Grid:
             # Pick a seed cell that is not already occupied
             attempts = 0
             while attempts < 100:
-                sx = random.randint(2, GRID_WIDTH - 3)
-                sy = random.randint(2, GRID_HEIGHT - 3)
+                sx = random.randint(2, self.width - 3)
+                sy = random.randint(2, self.height - 3)
                 if (sx, sy) not in self.entities:
                     break
                 attempts += 1
@@ -123,7 +274,7 @@ class Grid:
 
                 if (cx, cy) in placed or (cx, cy) in self.entities:
                     continue
-                if not (0 <= cx < GRID_WIDTH and 0 <= cy < GRID_HEIGHT):
+                if not (0 <= cx < self.width and 0 <= cy < self.height):
                     continue
 
                 self.add_entity(Water(cx, cy))
@@ -145,8 +296,8 @@ class Grid:
         for _ in range(clusters):
             attempts = 0
             while attempts < 100:
-                cx = random.randint(1, GRID_WIDTH - 2)
-                cy = random.randint(1, GRID_HEIGHT - 2)
+                cx = random.randint(1, self.width - 2)
+                cy = random.randint(1, self.height - 2)
                 if (cx, cy) not in self.entities:
                     break
                 attempts += 1
@@ -160,7 +311,7 @@ class Grid:
                 dx = random.randint(-1, 1)
                 dy = random.randint(-1, 1)
                 bx, by = cx + dx, cy + dy
-                if (0 <= bx < GRID_WIDTH and 0 <= by < GRID_HEIGHT
+                if (0 <= bx < self.width and 0 <= by < self.height
                         and (bx, by) not in self.entities):
                     self.add_entity(Barrier(bx, by))
 
@@ -173,8 +324,8 @@ class Grid:
         for _ in range(patch_count):
             attempts = 0
             while attempts < 100:
-                sx = random.randint(2, GRID_WIDTH - 3)
-                sy = random.randint(2, GRID_HEIGHT - 3)
+                sx = random.randint(2, self.width - 3)
+                sy = random.randint(2, self.height - 3)
                 if (sx, sy) not in self.entities:
                     break
                 attempts += 1
@@ -191,7 +342,7 @@ class Grid:
 
                 if (cx, cy) in placed or (cx, cy) in self.entities:
                     continue
-                if not (0 <= cx < GRID_WIDTH and 0 <= cy < GRID_HEIGHT):
+                if not (0 <= cx < self.width and 0 <= cy < self.height):
                     continue
 
                 self.add_entity(Forest(cx, cy))
@@ -208,8 +359,8 @@ class Grid:
 
         for _ in range(cluster_count):
             while True:
-                cx = random.randint(0, GRID_WIDTH - 1)
-                cy = random.randint(0, GRID_HEIGHT - 1)
+                cx = random.randint(0, self.width - 1)
+                cy = random.randint(0, self.height - 1)
                 valid = True
 
                 # Check distance from other fire clusters
@@ -240,7 +391,7 @@ class Grid:
                 x = cx + dx
                 y = cy + dy
 
-                if not (0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT):
+                if not (0 <= x < self.width and 0 <= y < self.height):
                     continue
                 if (x, y) not in self.entities and (x, y) not in self.objective_cells:
                     self.add_fire(x, y)
@@ -248,50 +399,69 @@ class Grid:
     def spread_fire(self):
         """
         Fire spreads from existing fire tiles into neighboring cells.
-        Forest tiles increase spread chance (fire catches on trees).
-        Water and barrier tiles block fire spread.
+        Forest tiles lower the chance that a spreading fire catches.
+        Walls, barriers, movables and objective cells never catch.
+        Returns the newly ignited (x, y) tiles; see fire.py for the default
+        rules and fire_models.py for the others.
         """
-        new_fire_tiles = set(self.fire_tiles)
-        directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        for fx, fy in list(self.fire_tiles):
-             if random.random() > 0.35:
-                 continue
-             dx, dy = random.choice(directions)
-             nx, ny = fx + dx, fy + dy
-             # Prevent fire from spreading outside the map
-             if not (0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT):
-                continue
-             # Fire should not spread into blocked terrain (walls, water, barriers)
-             if self.is_blocked(nx, ny) or (nx, ny) in self.objective_cells:
-                continue
-             # Forest tiles have higher ignition chance
-             if self.is_forest(nx, ny):
-                 if random.random() < 0.8:  # 80% chance to catch forest on fire
-                     new_fire_tiles.add((nx, ny))
-             else:
-                 new_fire_tiles.add((nx, ny))
-                
-        self.fire_tiles = new_fire_tiles
-        
-
-    def draw(self, window):
+        ignited = self.fire.step(
+            terrain_ignition(self), blocking_object_cells(self), self.fire_model, self.layers.codes
+        )
+        if not ignited.size:
+            return []
+        width = self.width
+        new_tiles = list(zip((ignited % width).tolist(), (ignited // width).tolist()))
+        self.fire_tiles.update(new_tiles)
+        self.fire_version += 1
+        return new_tiles
+
+    def draw(self, window, view=None):
+        import pygame
+
+        view = view or DEFAULT_VIEW
+        region = view.visible_cells()
+        size = view.cell_size
+        pixel_w = view.cols * size
+        pixel_h = view.rows * size
 
         # Draw the grid
-        for x in range(0, WINDOW_WIDTH, CELL_SIZE):
-            pygame.draw.line(window, GRID_COLOR, (x, 0), (x, WINDOW_HEIGHT))
-        for y in range(0, WINDOW_HEIGHT, CELL_SIZE):
-            pygame.draw.line(window, GRID_COLOR, (0, y), (WINDOW_WIDTH, y))
+        if view.detailed:
+            for x in range(0, pixel_w, size):
+                pygame.draw.line(window, GRID_COLOR, (x, 0), (x, pixel_h))
+            for y in range(0, pixel_h, size):
+                pygame.draw.line(window, GRID_COLOR, (0, y), (pixel_w, y))
 
         # Draw fire tiles
         for fx, fy in self.fire_tiles:
-            rect = pygame.Rect(
-                fx * CELL_SIZE,
-                fy * CELL_SIZE,
-                CELL_SIZE,
-                CELL_SIZE
-            )
-            pygame.draw.rect(window, (255, 100, 0), rect)
-
-        # Draw entities
-        for entity in self.entities.values():
-            entity.draw(window)
+            if view.is_visible(fx, fy):
+                pygame.draw.rect(window, (255, 100, 0), view.rect(fx, fy))
+
+        # Draw terrain, rebuilt only when the terrain or the view changes:
+        # one entity per tile up close, one scaled colour image zoomed out
+        key = (self.version, region, size)
+        if self._terrain_sprites is None or self._terrain_sprites[0] != key:
+            if view.detailed:
+                sprites = [entity for _, entity in self.layers.entities(region)]
+            else:
+                sprites = self._terrain_image(region, size)
+            self._terrain_sprites = (key, sprites)
+        sprites = self._terrain_sprites[1]
+        if view.detailed:
+            for entity in sprites:
+                entity.draw(window, view)
+        else:
+            window.blit(sprites, (0, 0))
+
+        # Movables on top
+        for (x, y), entity in self.objects.items():
+            if view.is_visible(x, y) or getattr(entity, "planned_cells", None):
+                entity.draw(window, view)
+
+    def _terrain_image(self, region, size):
+        import pygame
+
+        x0, y0, x1, y1 = region
+        rgb = TERRAIN_COLORS[self.layers.codes[y0:y1, x0:x1]]
+        image = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        image.set_colorkey(tuple(TERRAIN_COLORS[EMPTY]))
+        return pygame.transform.scale(image, ((x1 - x0) * size, (y1 - y0) * size))
@@ -0,0 +1,478 @@
+"""
+grid_sim/hpa.py
+
+Hierarchical pathfinding (HPA*, Botea, Müller & Schaeffer, 2004) for large
+maps.
+
+The grid is cut into square clusters. Wherever two neighbouring clusters
+share a run of passable border cells there is an entrance, and each
+entrance contributes one or two transitions: a pair of cells, one on each
+side, that become nodes of an abstract graph. Inside every cluster the
+nodes are linked by the exact cheapest cost between them, found by a
+Dijkstra confined to the cluster.
+
+A query links start and goal into the abstract graph, runs A* over the few
+hundred abstract nodes instead of the million cells, and returns a
+HierarchicalPath. Its cells are refined lazily, one abstract edge at a time,
+by a small A* inside a single cluster, so an entity can start walking
+before the whole route has been expanded. Routes are near-optimal: they
+may only cross cluster borders at transitions.
+
+When cells change cost (walls, barriers, fire) only the clusters that
+contain them are rebuilt, plus the neighbour across any border they sit on.
+
+Costs follow the planner convention: cost[index] is the price of stepping
+INTO a cell, BLOCKED for impassable cells.
+"""
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED, NEIGHBORS_4, Point
+from .cost_model import (
+    cost_map_for,
+    fire_affected_cells,
+    fire_aware_cost,
+    fire_aware_costs_from_field,
+    object_costs,
+)
+
+DEFAULT_CLUSTER_SIZE = 16
+
+# Entrances shorter than this get one transition in the middle, longer ones
+# get one at each end
+MAX_SINGLE_TRANSITION = 6
+
+BorderKey = Tuple[str, int, int]
+
+
+class HierarchicalMap:
+    """Cluster abstraction of a width x height cost grid."""
+
+    def __init__(self, width: int, height: int, costs: Sequence[float], cluster_size: int = DEFAULT_CLUSTER_SIZE):
+        if len(costs) != width * height:
+            raise ValueError("HierarchicalMap needs exactly width * height costs.")
+        self.width = width
+        self.height = height
+        self.cluster_size = cluster_size
+        self.costs = list(costs)
+        self.clusters_x = (width + cluster_size - 1) // cluster_size
+        self.clusters_y = (height + cluster_size - 1) // cluster_size
+        self.min_cost = min((c for c in self.costs if c != BLOCKED), default=1.0)
+
+        # Abstract nodes are cell indices. A node can serve several borders
+        # (corner cells), so each one remembers which borders use it
+        self.nodes: Dict[int, Set[int]] = {c: set() for c in range(self.clusters_x * self.clusters_y)}
+        self.inter: Dict[int, Dict[int, float]] = {}
+        self.intra: Dict[int, Dict[int, float]] = {}
+        self._node_borders: Dict[int, Set[BorderKey]] = {}
+        self._borders: Dict[BorderKey, List[Tuple[int, int]]] = {}
+        self.rebuilt_clusters = 0
+
+        # The grid state hierarchy_for last brought the costs up to date
+        # with: grid.version, the terrain cost array, the object_costs
+        # overlay and the fire tiles. Diffing against them finds the cells
+        # that changed
+        self.synced_version = -1
+        self.synced_terrain: Optional[np.ndarray] = None
+        self.synced_objects: Dict[Point, float] = {}
+        self.synced_fire: Set[Point] = set()
+
+        for key in self._all_borders():
+            self._build_border(key)
+        for cluster in self.nodes:
+            self._build_cluster(cluster)
+
+    # ---- clusters ----
+
+    def cluster_of(self, index: int) -> int:
+        y, x = divmod(index, self.width)
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+
+    def cluster_rect(self, cluster: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) with x1/y1 exclusive."""
+        cy, cx = divmod(cluster, self.clusters_x)
+        size = self.cluster_size
+        return (
+            cx * size,
+            cy * size,
+            min((cx + 1) * size, self.width),
+            min((cy + 1) * size, self.height),
+        )
+
+    def _all_borders(self):
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                if cx + 1 < self.clusters_x:
+                    yield ("h", cx, cy)
+                if cy + 1 < self.clusters_y:
+                    yield ("v", cx, cy)
+
+    def _border_clusters(self, key: BorderKey) -> Tuple[int, int]:
+        kind, cx, cy = key
+        first = cy * self.clusters_x + cx
+        second = first + 1 if kind == "h" else first + self.clusters_x
+        return first, second
+
+    # ---- building ----
+
+    def _build_border(self, key: BorderKey):
+        kind, cx, cy = key
+        size = self.cluster_size
+        width = self.width
+        costs = self.costs
+        first, second = self._border_clusters(key)
+
+        # Cell pairs straddling the border, in order along it
+        if kind == "h":
+            x = (cx + 1) * size - 1
+            pairs = [(y * width + x, y * width + x + 1) for y in range(cy * size, min((cy + 1) * size, self.height))]
+        else:
+            y = (cy + 1) * size - 1
+            pairs = [(y * width + x, (y + 1) * width + x) for x in range(cx * size, min((cx + 1) * size, width))]
+
+        transitions = []
+        run: List[Tuple[int, int]] = []
+        for a, b in pairs + [(-1, -1)]:
+            if a != -1 and costs[a] != BLOCKED and costs[b] != BLOCKED:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) < MAX_SINGLE_TRANSITION:
+                    transitions.append(run[len(run) // 2])
+                else:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+                run = []
+
+        for a, b in transitions:
+            self._add_node(a, first, key)
+            self._add_node(b, second, key)
+            self.inter.setdefault(a, {})[b] = costs[b]
+            self.inter.setdefault(b, {})[a] = costs[a]
+        self._borders[key] = transitions
+
+    def _clear_border(self, key: BorderKey):
+        first, second = self._border_clusters(key)
+        for a, b in self._borders.pop(key, []):
+            self.inter.get(a, {}).pop(b, None)
+            self.inter.get(b, {}).pop(a, None)
+            self._drop_node(a, first, key)
+            self._drop_node(b, second, key)
+
+    def _add_node(self, index: int, cluster: int, key: BorderKey):
+        self.nodes[cluster].add(index)
+        self._node_borders.setdefault(index, set()).add(key)
+
+    def _drop_node(self, index: int, cluster: int, key: BorderKey):
+        borders = self._node_borders.get(index)
+        if borders is None:
+            return
+        borders.discard(key)
+        if not borders:
+            del self._node_borders[index]
+            self.nodes[cluster].discard(index)
+            self.intra.pop(index, None)
+            if not self.inter.get(index):
+                self.inter.pop(index, None)
+
+    def _build_cluster(self, cluster: int):
+        """Recomputes the exact costs between every pair of nodes in a cluster."""
+        rect = self.cluster_rect(cluster)
+        nodes = self.nodes[cluster]
+        for node in nodes:
+            dist = self._local_dijkstra(rect, node, nodes)
+            self.intra[node] = {other: d for other, d in dist.items() if other != node and other in nodes}
+        self.rebuilt_clusters += 1
+
+    # ---- updates ----
+
+    def update_cells(self, changes: Dict[Point, float]) -> int:
+        """
+        Applies new costs for some cells (BLOCKED for impassable) and
+        rebuilds only the affected clusters. Returns how many were rebuilt.
+        """
+        size = self.cluster_size
+        dirty_clusters = set()
+        dirty_borders = set()
+        for (x, y), new_cost in changes.items():
+            index = y * self.width + x
+            if self.costs[index] == new_cost:
+                continue
+            self.costs[index] = new_cost
+            if new_cost < self.min_cost:
+                self.min_cost = new_cost
+            dirty_clusters.add(self.cluster_of(index))
+
+            cx, cy = x // size, y // size
+            if x % size == size - 1 and cx + 1 < self.clusters_x:
+                dirty_borders.add(("h", cx, cy))
+            if x % size == 0 and cx > 0:
+                dirty_borders.add(("h", cx - 1, cy))
+            if y % size == size - 1 and cy + 1 < self.clusters_y:
+                dirty_borders.add(("v", cx, cy))
+            if y % size == 0 and cy > 0:
+                dirty_borders.add(("v", cx, cy - 1))
+
+        for key in dirty_borders:
+            self._clear_border(key)
+            self._build_border(key)
+            dirty_clusters.update(self._border_clusters(key))
+        for cluster in dirty_clusters:
+            self._build_cluster(cluster)
+        return len(dirty_clusters)
+
+    # ---- local searches ----
+
+    def _local_dijkstra(self, rect, source: int, targets, reverse: bool = False) -> Dict[int, float]:
+        """
+        Dijkstra from source confined to rect. Forward distances are the cost
+        of walking from source to each cell; reverse distances the cost of
+        walking from each cell to source. Stops once every target is settled.
+        """
+        x0, y0, x1, y1 = rect
+        width = self.width
+        costs = self.costs
+        dist = {source: 0.0}
+        settled = {}
+        remaining = len(targets)
+        heap = [(0.0, source)]
+
+        while heap:
+            d, current = heapq.heappop(heap)
+            if current in settled:
+                continue
+            settled[current] = d
+            if current in targets:
+                remaining -= 1
+                if remaining <= 0:
+                    break
+            cy, cx = divmod(current, width)
+            # Reverse search: every neighbour pays for stepping into current
+            reverse_d = d + costs[current]
+            for dx, dy in NEIGHBORS_4:
+                nx = cx + dx
+                ny = cy + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * width + nx
+                if neighbor in settled or costs[neighbor] == BLOCKED:
+                    continue
+                candidate = reverse_d if reverse else d + costs[neighbor]
+                if candidate < dist.get(neighbor, BLOCKED):
+                    dist[neighbor] = candidate
+                    heapq.heappush(heap, (candidate, neighbor))
+        return settled
+
+    def _local_astar(self, rect, start: int, goal: int) -> Optional[List[Point]]:
+        """Cheapest path from start to goal that stays inside rect."""
+        x0, y0, x1, y1 = rect
+        width = self.width
+        costs = self.costs
+        gy, gx = divmod(goal, width)
+        scale = self.min_cost
+
+        g_score = {start: 0.0}
+        came_from = {start: -1}
+        closed = set()
+        sy, sx = divmod(start, width)
+        heap = [((abs(sx - gx) + abs(sy - gy)) * scale, 0.0, start)]
+
+        while heap:
+            _, neg_g, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            if current == goal:
+                path = []
+                while current != -1:
+                    y, x = divmod(current, width)
+                    path.append((x, y))
+                    current = came_from[current]
+                path.reverse()
+                return path
+            closed.add(current)
+            cy, cx = divmod(current, width)
+            for dx, dy in NEIGHBORS_4:
+                nx = cx + dx
+                ny = cy + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * width + nx
+                step = costs[neighbor]
+                if step == BLOCKED or neighbor in closed:
+                    continue
+                tentative = -neg_g + step
+                if tentative < g_score.get(neighbor, BLOCKED):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    h = (abs(nx - gx) + abs(ny - gy)) * scale
+                    heapq.heappush(heap, (tentative + h, -tentative, neighbor))
+        return None
+
+    # ---- queries ----
+
+    def find_path(self, start: Point, goal: Point) -> Optional["HierarchicalPath"]:
+        """
+        Abstract route from start to goal, or None if there is none.
+
+        Unlike astar.search the start has to be passable: a blocked start
+        has no transitions on its borders. Movables are left out of the
+        CostMap, so that is only the case for a start inside a wall.
+        """
+        sx, sy = start
+        gx, gy = goal
+        width = self.width
+        if not (0 <= sx < width and 0 <= sy < self.height and 0 <= gx < width and 0 <= gy < self.height):
+            return None
+        s = sy * width + sx
+        g = gy * width + gx
+        if s == g:
+            return HierarchicalPath(self, [start], 0.0, 0)
+        if self.costs[g] == BLOCKED or self.costs[s] == BLOCKED:
+            return None
+
+        start_cluster = self.cluster_of(s)
+        goal_cluster = self.cluster_of(g)
+        same = start_cluster == goal_cluster
+
+        # Link start and goal to the nodes of their own clusters
+        start_targets = set(self.nodes[start_cluster])
+        goal_targets = set(self.nodes[goal_cluster])
+        if same:
+            start_targets.add(g)
+            goal_targets.add(s)
+        from_start = self._local_dijkstra(self.cluster_rect(start_cluster), s, start_targets)
+        to_goal = self._local_dijkstra(self.cluster_rect(goal_cluster), g, goal_targets, reverse=True)
+        from_start = {n: d for n, d in from_start.items() if n in start_targets and n != s}
+        to_goal = {n: d for n, d in to_goal.items() if n in goal_targets and n != g}
+
+        scale = self.min_cost
+
+        def heuristic(index):
+            y, x = divmod(index, width)
+            return (abs(x - gx) + abs(y - gy)) * scale
+
+        g_score = {s: 0.0}
+        came_from = {s: -1}
+        closed = set()
+        heap = [(heuristic(s), 0.0, s)]
+        expanded = 0
+
+        while heap:
+            _, neg_g, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            if current == g:
+                waypoints = []
+                while current != -1:
+                    y, x = divmod(current, width)
+                    waypoints.append((x, y))
+                    current = came_from[current]
+                waypoints.reverse()
+                return HierarchicalPath(self, waypoints, -neg_g, expanded)
+
+            closed.add(current)
+            expanded += 1
+            current_g = -neg_g
+            edges = [self.intra.get(current, {}).items(), self.inter.get(current, {}).items()]
+            if current == s:
+                edges.append(from_start.items())
+            if current in to_goal:
+                edges.append(((g, to_goal[current]),))
+            for edge_set in edges:
+                for neighbor, step in edge_set:
+                    if neighbor in closed:
+                        continue
+                    tentative = current_g + step
+                    if tentative < g_score.get(neighbor, BLOCKED):
+                        g_score[neighbor] = tentative
+                        came_from[neighbor] = current
+                        heapq.heappush(heap, (tentative + heuristic(neighbor), -tentative, neighbor))
+        return None
+
+
+class HierarchicalPath:
+    """
+    An abstract route through transition cells, refined to single cells on
+    demand. Refinement reads the hierarchy's current costs, so a route should
+    be refined before the cells it crosses change.
+    """
+
+    def __init__(self, hierarchy: HierarchicalMap, waypoints: List[Point], cost: float, expanded: int):
+        self.hierarchy = hierarchy
+        self.waypoints = waypoints
+        self.cost = cost
+        self.expanded = expanded
+        self._cells: Optional[List[Point]] = None
+
+    def iter_cells(self) -> Iterator[Point]:
+        """Yields the route cell by cell, start first, refining as it goes."""
+        h = self.hierarchy
+        width = h.width
+        yield self.waypoints[0]
+        for (ax, ay), (bx, by) in zip(self.waypoints, self.waypoints[1:]):
+            a = ay * width + ax
+            b = by * width + bx
+            cluster = h.cluster_of(a)
+            if cluster != h.cluster_of(b):
+                # Inter-cluster edges always join two adjacent cells
+                yield (bx, by)
+                continue
+            segment = h._local_astar(h.cluster_rect(cluster), a, b)
+            if segment is None:
+                return
+            yield from segment[1:]
+
+    def cells(self) -> Optional[List[Point]]:
+        """The fully refined route, inclusive of both ends (cached)."""
+        if self._cells is None:
+            cells = list(self.iter_cells())
+            if cells[-1] != self.waypoints[-1]:
+                return None
+            self._cells = cells
+        return self._cells
+
+
+def hierarchy_for(grid, cluster_size: int = DEFAULT_CLUSTER_SIZE) -> HierarchicalMap:
+    """
+    Returns the grid's HierarchicalMap with fire risk folded into the costs,
+    built once and then kept current: cells whose terrain or objects changed
+    since the last call (grid.version) or whose fire risk changed are passed
+    to update_cells, so only their clusters are rebuilt. Terrain changes are
+    found by comparing the layers' cost arrays in NumPy.
+    """
+    cost_map = cost_map_for(grid)
+    cached = getattr(grid, "_hierarchy", None)
+    if cached is None or cached.cluster_size != cluster_size:
+        cached = HierarchicalMap(
+            cost_map.width, cost_map.height, fire_aware_costs_from_field(cost_map, grid.fire.distance), cluster_size
+        )
+        cached.synced_objects = object_costs(grid)
+    else:
+        changed = set()
+        if cached.synced_version != cost_map.version:
+            width = cost_map.width
+            for index in np.flatnonzero(cached.synced_terrain != grid.layers.cost).tolist():
+                y, x = divmod(index, width)
+                changed.add((x, y))
+            objects = object_costs(grid)
+            old_objects = cached.synced_objects
+            changed.update(old_objects.keys() ^ objects.keys())
+            changed.update(cell for cell, cost in objects.items() if old_objects.get(cell, cost) != cost)
+            cached.synced_objects = objects
+        fire_changed = cached.synced_fire ^ grid.fire_tiles
+        changed.update(fire_affected_cells(fire_changed, cost_map.width, cost_map.height))
+        if changed:
+            cached.update_cells({
+                (x, y): fire_aware_cost(cost_map, grid.fire_tiles, x, y) for x, y in changed
+            })
+
+    # The layers hand out a fresh array after every terrain edit, so keeping
+    # a reference is as good as a copy
+    cached.synced_version = cost_map.version
+    cached.synced_terrain = grid.layers.cost
+    cached.synced_fire = set(grid.fire_tiles)
+    grid._hierarchy = cached
+    return cached
@@ -3,6 +3,9 @@ import pygame
 
 from .phases import PHASE_FINISHED, PHASE_PLANNING
 
+# Cells scrolled per mouse wheel notch on maps larger than the play area
+WHEEL_PAN_CELLS = 5
+
 
 class InputHandler:
     def __init__(self, simulation):
@@ -18,6 +21,12 @@ class InputHandler:
                 self._handle_keydown(event.key)
                 continue
 
+            if event.type == pygame.MOUSEWHEEL:
+                if hasattr(self.simulation, "pan_view"):
+                    # Wheel up scrolls the map up; shift or a trackpad scrolls sideways
+                    self.simulation.pan_view(event.x * WHEEL_PAN_CELLS, -event.y * WHEEL_PAN_CELLS)
+                continue
+
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 self._handle_left_click(event.pos)
 
@@ -55,6 +64,14 @@ class InputHandler:
             self.simulation.clear_selected_plan()
             return
 
+        if key == pygame.K_a:
+            self.simulation.auto_plan()
+            return
+
+        if key == pygame.K_f:
+            self.simulation.forecast_fire_risk()
+            return
+
         movement = {
             pygame.K_UP: (0, -1),
             pygame.K_DOWN: (0, 1),
@@ -0,0 +1,359 @@
+"""
+grid_sim/jps.py
+
+Jump Point Search (Harabor & Grastien, 2011) for 4-connected grids with
+terrain costs.
+
+Most of a generated map is open ground where every step costs the same.
+There plain A* expands every cell of a large family of equally cheap
+routes. JPS instead scans in straight lines and only stops ("jumps") at
+cells where the route could need to turn: the goal, cells with a forced
+neighbour next to an obstacle, and, for vertical scans, rows where a
+horizontal scan finds such a cell. This is the 4-connected variant
+described for PathFinding.js (never move diagonally).
+
+Terrain: a cell whose cost is not the uniform unit cost (Forest, Water)
+is treated as an obstacle for the forced-neighbour test and ends every
+scan that enters it. Such a cell becomes a jump point and is expanded in
+all four directions like a plain A* node. Uniform regions get the
+speed-up, weighted regions fall back to normal expansion, and the
+returned path is still optimal.
+
+JPS+ (Harabor & Grastien, 2012) moves the scanning into preprocessing: a
+JumpTable stores, for every cell and direction, the distance to the next
+jump point or to the wall. A query then only looks up the table, plus two
+goal checks, because the goal is the one jump point that is not known in
+advance. In pure Python the scans cost more than the expansions they
+save, so jps_plus_search is the fast path and jps_search is the
+reference version.
+"""
+
+import heapq
+from typing import Callable, List
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, SearchResult
+
+
+def jps_search(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    unit: float = 1.0,
+) -> SearchResult:
+    """
+    Cheapest 4-connected path from start to goal, inclusive of both ends.
+
+    cost(index) is the price of entering a cell (BLOCKED = impassable), as
+    for astar.search. Every passable cell must cost at least unit; cells
+    that cost exactly unit are jumped over. result.expanded counts jump
+    points expanded, not cells scanned.
+    """
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+        return SearchResult(None)
+
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    if start_index == goal_index:
+        return SearchResult([start], 0.0, 0)
+    if cost(goal_index) == BLOCKED:
+        return SearchResult(None)
+
+    def passable(x, y):
+        return 0 <= x < width and 0 <= y < height and cost(y * width + x) != BLOCKED
+
+    def uniform(x, y):
+        return 0 <= x < width and 0 <= y < height and cost(y * width + x) == unit
+
+    def jump_horizontal(x, y, dx):
+        """Scans along a row; returns the jump point index or -1."""
+        while True:
+            x += dx
+            if not passable(x, y):
+                return -1
+            index = y * width + x
+            if index == goal_index or cost(index) != unit:
+                return index
+            if (passable(x, y - 1) and not uniform(x - dx, y - 1)) or (
+                passable(x, y + 1) and not uniform(x - dx, y + 1)
+            ):
+                return index
+
+    def jump_vertical(x, y, dy):
+        """Scans along a column; returns the jump point index or -1."""
+        while True:
+            y += dy
+            if not passable(x, y):
+                return -1
+            index = y * width + x
+            if index == goal_index or cost(index) != unit:
+                return index
+            if (passable(x - 1, y) and not uniform(x - 1, y - dy)) or (
+                passable(x + 1, y) and not uniform(x + 1, y - dy)
+            ):
+                return index
+            # A turn along this row may be needed, so this cell is a jump point
+            if jump_horizontal(x, y, 1) != -1 or jump_horizontal(x, y, -1) != -1:
+                return index
+
+    def heuristic(index):
+        y, x = divmod(index, width)
+        return (abs(x - gx) + abs(y - gy)) * unit
+
+    g_score = {start_index: 0.0}
+    came_from = {start_index: -1}
+    closed = set()
+    open_heap = [(heuristic(start_index), 0.0, start_index)]
+    expanded = 0
+
+    while open_heap:
+        _, neg_g, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue  # stale entry left behind by lazy deletion
+        if current == goal_index:
+            return SearchResult(_expand_jumps(came_from, width, goal_index), -neg_g, expanded)
+
+        closed.add(current)
+        expanded += 1
+        current_g = -neg_g
+        cy, cx = divmod(current, width)
+
+        for dx, dy in _directions(came_from[current], current, width, cost(current) != unit):
+            if dx:
+                jump = jump_horizontal(cx, cy, dx)
+            else:
+                jump = jump_vertical(cx, cy, dy)
+            if jump == -1 or jump in closed:
+                continue
+            jy, jx = divmod(jump, width)
+            # Every cell skipped over cost unit; only the landing cell may differ
+            distance = abs(jx - cx) + abs(jy - cy)
+            tentative = current_g + (distance - 1) * unit + cost(jump)
+            if tentative < g_score.get(jump, BLOCKED):
+                g_score[jump] = tentative
+                came_from[jump] = current
+                heapq.heappush(open_heap, (tentative + heuristic(jump), -tentative, jump))
+
+    return SearchResult(None, BLOCKED, expanded)
+
+
+def _directions(parent: int, current: int, width: int, weighted: bool):
+    """Pruned scan directions for a jump point reached from parent."""
+    if parent == -1 or weighted:
+        return NEIGHBORS_4
+    py, px = divmod(parent, width)
+    cy, cx = divmod(current, width)
+    if cy == py:
+        dx = 1 if cx > px else -1
+        return ((dx, 0), (0, 1), (0, -1))
+    dy = 1 if cy > py else -1
+    return ((0, dy), (1, 0), (-1, 0))
+
+
+def _expand_jumps(came_from, width: int, goal_index: int) -> List[Point]:
+    """Rebuilds the full cell-by-cell path from the chain of jump points."""
+    jumps = []
+    index = goal_index
+    while index != -1:
+        jumps.append(index)
+        index = came_from[index]
+    jumps.reverse()
+
+    y, x = divmod(jumps[0], width)
+    path = [(x, y)]
+    for index in jumps[1:]:
+        ty, tx = divmod(index, width)
+        dx = (tx > x) - (tx < x)
+        dy = (ty > y) - (ty < y)
+        while (x, y) != (tx, ty):
+            x += dx
+            y += dy
+            path.append((x, y))
+    return path
+
+
+# ──────────────────────────────────────────────
+# JPS+
+# ──────────────────────────────────────────────
+
+class JumpTable:
+    """
+    Precomputed jump distances for one cost snapshot.
+
+    For each direction, value[index] > 0 is the distance to the next jump
+    point, and value[index] <= 0 means there is none: -value cells can be
+    walked before hitting a wall or the map edge.
+    """
+
+    def __init__(self, width: int, height: int, cost: Callable[[int], float], unit: float = 1.0):
+        self.width = width
+        self.height = height
+        self.unit = unit
+        size = width * height
+        passable = [cost(i) != BLOCKED for i in range(size)]
+        uniform = [cost(i) == unit for i in range(size)]
+        self.right = [0] * size
+        self.left = [0] * size
+        self.down = [0] * size
+        self.up = [0] * size
+
+        def is_passable(x, y):
+            return 0 <= x < width and 0 <= y < height and passable[y * width + x]
+
+        def is_uniform(x, y):
+            return 0 <= x < width and 0 <= y < height and uniform[y * width + x]
+
+        def sweep(table, cells, step, is_jump_point):
+            # Walks cells in reverse scan order so each value builds on the
+            # value of the next cell along the scan
+            for index in cells:
+                nxt = index + step
+                if not passable[nxt]:
+                    table[index] = 0
+                elif is_jump_point(nxt):
+                    table[index] = 1
+                else:
+                    ahead = table[nxt]
+                    table[index] = ahead + 1 if ahead > 0 else ahead - 1
+
+        for dx, table in ((1, self.right), (-1, self.left)):
+            def horizontal_jump_point(index, dx=dx):
+                if not uniform[index]:
+                    return True
+                y, x = divmod(index, width)
+                return (is_passable(x, y - 1) and not is_uniform(x - dx, y - 1)) or (
+                    is_passable(x, y + 1) and not is_uniform(x - dx, y + 1)
+                )
+
+            for y in range(height):
+                row = range(y * width, (y + 1) * width)
+                # The last cell along the scan faces the map edge
+                edge = row[-1] if dx == 1 else row[0]
+                table[edge] = 0
+                cells = reversed(row[:-1]) if dx == 1 else row[1:]
+                sweep(table, cells, dx, horizontal_jump_point)
+
+        for dy, table in ((1, self.down), (-1, self.up)):
+            def vertical_jump_point(index, dy=dy):
+                if not uniform[index]:
+                    return True
+                y, x = divmod(index, width)
+                if (is_passable(x - 1, y) and not is_uniform(x - 1, y - dy)) or (
+                    is_passable(x + 1, y) and not is_uniform(x + 1, y - dy)
+                ):
+                    return True
+                # A horizontal scan from here would find a jump point
+                return self.right[index] > 0 or self.left[index] > 0
+
+            step = dy * width
+            for x in range(width):
+                column = range(x, size, width)
+                edge = column[-1] if dy == 1 else column[0]
+                table[edge] = 0
+                cells = reversed(column[:-1]) if dy == 1 else column[1:]
+                sweep(table, cells, step, vertical_jump_point)
+
+
+def jump_table_for(cost_map, fuel_per_step: float = 1.0, unit_steps: bool = False) -> JumpTable:
+    """
+    Returns the JumpTable for a CostMap, built once per map and cost mode:
+    fuel for the given speed tier, or one step per cell if unit_steps.
+    """
+    tables = getattr(cost_map, "_jump_tables", None)
+    if tables is None:
+        tables = {}
+        cost_map._jump_tables = tables
+    key = "steps" if unit_steps else fuel_per_step
+    table = tables.get(key)
+    if table is None:
+        if unit_steps:
+            table = JumpTable(cost_map.width, cost_map.height, cost_map.unit_costs().__getitem__, 1.0)
+        else:
+            table = JumpTable(cost_map.width, cost_map.height, cost_map.cost_function(fuel_per_step), fuel_per_step)
+        tables[key] = table
+    return table
+
+
+def jps_plus_search(
+    table: JumpTable,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+) -> SearchResult:
+    """
+    Same result as jps_search, reading jump distances from table instead of
+    scanning. cost must be the function the table was built from.
+    """
+    width, height = table.width, table.height
+    unit = table.unit
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+        return SearchResult(None)
+
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+    if start_index == goal_index:
+        return SearchResult([start], 0.0, 0)
+    if cost(goal_index) == BLOCKED:
+        return SearchResult(None)
+
+    tables = {(1, 0): table.right, (-1, 0): table.left, (0, 1): table.down, (0, -1): table.up}
+
+    g_score = {start_index: 0.0}
+    came_from = {start_index: -1}
+    closed = set()
+    open_heap = [((abs(sx - gx) + abs(sy - gy)) * unit, 0.0, start_index)]
+    expanded = 0
+
+    while open_heap:
+        _, neg_g, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue
+        if current == goal_index:
+            return SearchResult(_expand_jumps(came_from, width, goal_index), -neg_g, expanded)
+
+        closed.add(current)
+        expanded += 1
+        current_g = -neg_g
+        cy, cx = divmod(current, width)
+
+        for dx, dy in _directions(came_from[current], current, width, cost(current) != unit):
+            value = tables[(dx, dy)][current]
+            reach = value if value > 0 else -value
+            distance = value if value > 0 else 0
+            if dx:
+                # Horizontal scans stop on the goal itself
+                if cy == gy and (gx - cx) * dx > 0 and abs(gx - cx) <= reach:
+                    distance = abs(gx - cx)
+            elif (gy - cy) * dy > 0 and abs(gy - cy) <= reach:
+                # Vertical scans stop on the goal's row, where a horizontal
+                # scan may find the goal; an extra jump point is always safe
+                if distance == 0 or abs(gy - cy) < distance:
+                    distance = abs(gy - cy)
+            if distance == 0:
+                continue
+
+            jump = current + (dx + dy * width) * distance
+            if jump in closed:
+                continue
+            tentative = current_g + (distance - 1) * unit + cost(jump)
+            if tentative < g_score.get(jump, BLOCKED):
+                g_score[jump] = tentative
+                came_from[jump] = current
+                jy, jx = divmod(jump, width)
+                heapq.heappush(open_heap, (tentative + (abs(jx - gx) + abs(jy - gy)) * unit, -tentative, jump))
+
+    return SearchResult(None, BLOCKED, expanded)
+
+
+def jps_path(cost_map, start: Point, goal: Point, fuel_per_step: float = 1.0, unit_steps: bool = False) -> SearchResult:
+    """JPS+ over a CostMap, in fuel for the given speed tier or in steps."""
+    if unit_steps:
+        cost = cost_map.unit_costs().__getitem__
+    else:
+        cost = cost_map.cost_function(fuel_per_step)
+    return jps_plus_search(jump_table_for(cost_map, fuel_per_step, unit_steps), cost, start, goal)
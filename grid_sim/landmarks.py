@@ -0,0 +1,171 @@
+"""
+grid_sim/landmarks.py
+
+ALT heuristics (A*, Landmarks, Triangle inequality; Goldberg & Harrelson,
+2005) precomputed per map.
+
+Manhattan distance knows nothing about walls, water or forest, so on a
+maze-like Perlin map A* still floods most of the reachable area. ALT picks
+K landmark cells once per map and stores two exact cost arrays for each:
+from the landmark to every cell, and from every cell to the landmark. For
+any cell v and goal t the triangle inequality then gives two lower bounds
+on the true cost v -> t:
+
+    d(L, t) - d(L, v)        and        d(v, L) - d(t, L)
+
+The heuristic is the largest of these bounds (and Manhattan distance times
+the cheapest step, so it is never weaker than plain A*). It is consistent, so A* stays optimal, and it is usually far tighter than
+Manhattan. Costs are directed (entering a cell is what costs), which is
+why both directions are stored.
+
+Arrays are built on terrain multipliers (fuel_per_step = 1). A speed tier
+scales them linearly, and fire risk only ever adds cost, so the bounds stay
+admissible for fuel- and fire-aware searches too.
+"""
+
+import random
+from typing import Callable, List, Optional, Sequence
+
+from .astar import BLOCKED, Point, cost_from, cost_to_go
+from .config import LANDMARK_COUNT, LANDMARK_MAX_CELLS
+from .cost_model import cost_map_for
+
+
+class LandmarkSet:
+    """K landmarks and their forward / reverse cost arrays for one map."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        costs: Sequence[float],
+        landmarks: Sequence[Point],
+        from_landmark: Optional[List[List[float]]] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.landmarks = list(landmarks)
+        self.min_cost = min((c for c in costs if c != BLOCKED), default=1.0)
+        cost = costs.__getitem__
+        # select() already has the forward arrays; only compute what is missing
+        if from_landmark is None:
+            from_landmark = [cost_from(width, height, cost, [landmark]) for landmark in self.landmarks]
+        self.from_landmark: List[List[float]] = from_landmark
+        self.to_landmark: List[List[float]] = [cost_to_go(width, height, cost, [landmark]) for landmark in self.landmarks]
+
+    @classmethod
+    def select(
+        cls,
+        width: int,
+        height: int,
+        costs: Sequence[float],
+        count: int,
+        seed: Optional[int] = None,
+    ) -> "LandmarkSet":
+        """
+        Farthest-point selection: start from the cell farthest from a random
+        open cell, then repeatedly add the open cell farthest (in cost) from
+        every landmark chosen so far. Landmarks end up on the periphery,
+        which is where they give the tightest bounds.
+        """
+        open_cells = [i for i, c in enumerate(costs) if c != BLOCKED]
+        if not open_cells or count <= 0:
+            return cls(width, height, costs, [])
+
+        cost = costs.__getitem__
+        rng = random.Random(seed)
+        seed_index = rng.choice(open_cells)
+        nearest = cost_from(width, height, cost, [_point(seed_index, width)])
+
+        chosen: List[Point] = []
+        forward: List[List[float]] = []
+        for _ in range(count):
+            # Unreachable cells (other components) come first: they get no
+            # bound at all from the landmarks chosen so far
+            best = max(open_cells, key=nearest.__getitem__)
+            if nearest[best] == 0.0:
+                break
+            point = _point(best, width)
+            chosen.append(point)
+            dist = cost_from(width, height, cost, [point])
+            forward.append(dist)
+            nearest = [d if d < n else n for d, n in zip(dist, nearest)] if len(chosen) > 1 else dist
+
+        return cls(width, height, costs, chosen, forward)
+
+    def heuristic(
+        self,
+        goal: Point,
+        scale: float = 1.0,
+        start: Optional[Point] = None,
+        active: int = 4,
+    ) -> Callable[[int, int], float]:
+        """
+        Returns heuristic(x, y) -> lower bound on the cost from (x, y) to
+        goal, times scale (the searcher's fuel_per_step).
+
+        With a start, only the `active` landmark bounds that are tightest
+        at the start are evaluated per node; they are almost always the
+        ones that matter along the whole route, and each one skipped saves
+        a lookup on every node. Manhattan distance times the cheapest step
+        is always included, so the result is never weaker than plain A*.
+        """
+        width = self.width
+        gx, gy = goal
+        goal_index = gy * width + gx
+        # Only landmarks with a finite distance to/from the goal give a
+        # bound; sign tells forward (+1) from reverse (-1) arrays
+        terms = [(d, d[goal_index], 1.0) for d in self.from_landmark if d[goal_index] != BLOCKED]
+        terms += [(d, d[goal_index], -1.0) for d in self.to_landmark if d[goal_index] != BLOCKED]
+        if start is not None and len(terms) > active:
+            start_index = start[1] * width + start[0]
+            terms.sort(key=lambda term: _bound(term, start_index), reverse=True)
+            terms = terms[:active]
+        forward = [(d, at_goal) for d, at_goal, sign in terms if sign > 0]
+        reverse = [(d, at_goal) for d, at_goal, sign in terms if sign < 0]
+        min_cost = self.min_cost
+
+        def alt(x: int, y: int) -> float:
+            index = y * width + x
+            best = (abs(x - gx) + abs(y - gy)) * min_cost
+            for dist, at_goal in forward:
+                bound = at_goal - dist[index]
+                if bound > best:
+                    best = bound
+            for dist, at_goal in reverse:
+                # BLOCKED here means the cell cannot reach a landmark the
+                # goal can reach, so it cannot reach the goal either
+                bound = dist[index] - at_goal
+                if bound > best:
+                    best = bound
+            return best * scale
+
+        return alt
+
+
+def _bound(term, index: int) -> float:
+    dist, at_goal, sign = term
+    return (at_goal - dist[index]) if sign > 0 else (dist[index] - at_goal)
+
+
+def _point(index: int, width: int) -> Point:
+    y, x = divmod(index, width)
+    return (x, y)
+
+
+def landmarks_for(grid, count: int = LANDMARK_COUNT) -> Optional[LandmarkSet]:
+    """
+    Returns the grid's LandmarkSet, building it on first use and again
+    whenever grid.version changes. None if count is 0 (ALT disabled) or
+    the map has more than LANDMARK_MAX_CELLS cells.
+    """
+    if count <= 0 or grid.width * grid.height > LANDMARK_MAX_CELLS:
+        return None
+    cost_map = cost_map_for(grid)
+    cached = getattr(grid, "_landmarks", None)
+    if cached is None or cached.version != cost_map.version or cached.requested != count:
+        cached = LandmarkSet.select(cost_map.width, cost_map.height, cost_map.step_costs(), count, seed=0)
+        cached.version = cost_map.version
+        cached.requested = count
+        grid._landmarks = cached
+    return cached
@@ -0,0 +1,141 @@
+"""
+grid_sim/layers.py
+
+Array storage for the static world: walls, water, forest and barriers.
+
+Every cell holds one uint8 terrain code instead of a Python Entity object,
+so a 1000 x 1000 map is 1 MB of codes rather than a million objects.
+Everything else is a lookup on the code:
+
+    blocking - bool (height, width) mask of impassable cells
+    cost     - float (height, width) terrain multipliers, BLOCKED where
+               blocking, exactly what CostMap.from_grid needs
+
+Both are derived from the codes in one vectorized lookup and cached until
+the next change, so whole-map queries never touch Python objects. Single
+cells are read from a bytearray that shares memory with the NumPy array,
+which is faster than indexing NumPy one element at a time.
+
+Entity objects are only built on demand (entity_at), for code that still
+wants one, such as drawing. Their colours are derived from the cell, so the
+same tile looks the same every time it is built.
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED, Point
+from .entities import Entity, Wall
+from .terrain import (
+    BARRIER_COST_MULTIPLIER,
+    FOREST_COST_MULTIPLIER,
+    WATER_COST_MULTIPLIER,
+    Barrier,
+    Forest,
+    Water,
+)
+
+EMPTY = 0
+WALL = 1
+WATER = 2
+FOREST = 3
+BARRIER = 4
+
+TERRAIN_CLASSES = {WALL: Wall, WATER: Water, FOREST: Forest, BARRIER: Barrier}
+_CODE_OF_CLASS = {cls: code for code, cls in TERRAIN_CLASSES.items()}
+
+# Indexed by code; CODE_BLOCKS and CODE_MODIFIER are plain tuples for
+# single-cell reads
+CODE_BLOCKING = np.array([False, True, False, False, True])
+CODE_COST = np.array([1.0, BLOCKED, WATER_COST_MULTIPLIER, FOREST_COST_MULTIPLIER, BARRIER_COST_MULTIPLIER])
+# Grid.get_terrain_modifier reports COST_MULTIPLIER, which walls do not have
+CODE_MODIFIER = (1.0, 1.0, WATER_COST_MULTIPLIER, FOREST_COST_MULTIPLIER, BARRIER_COST_MULTIPLIER)
+CODE_BLOCKS = tuple(bool(b) for b in CODE_BLOCKING)
+
+
+def terrain_code(entity) -> int:
+    """The layer code for a terrain entity, EMPTY for anything else."""
+    return _CODE_OF_CLASS.get(type(entity), EMPTY)
+
+
+class TerrainLayers:
+    """The terrain code of every cell of a width x height map."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        # Row-major codes for fast single-cell reads; codes is a NumPy view
+        # of the same memory, so writes through either one show in both
+        self.flat = bytearray(width * height)
+        self.codes = np.frombuffer(self.flat, dtype=np.uint8).reshape(height, width)
+        self._derived: Dict[str, np.ndarray] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.flat)
+
+    def code_at(self, x: int, y: int) -> int:
+        """Terrain code at an in-bounds cell."""
+        return self.flat[y * self.width + x]
+
+    def set(self, x: int, y: int, code: int) -> bool:
+        """Sets an in-bounds cell; returns True if it changed."""
+        index = y * self.width + x
+        if self.flat[index] == code:
+            return False
+        self.flat[index] = code
+        self._derived.clear()
+        return True
+
+    def fill(self, mask: np.ndarray, code: int) -> int:
+        """Sets every empty cell under a (height, width) bool mask; returns how many."""
+        target = mask & (self.codes == EMPTY)
+        count = int(target.sum())
+        if count:
+            self.codes[target] = code
+            self._derived.clear()
+        return count
+
+    @property
+    def blocking(self) -> np.ndarray:
+        """(height, width) bool mask of impassable terrain (read-only)."""
+        return self._lookup("blocking", CODE_BLOCKING)
+
+    @property
+    def cost(self) -> np.ndarray:
+        """(height, width) terrain multipliers, BLOCKED where blocking (read-only)."""
+        return self._lookup("cost", CODE_COST)
+
+    def _lookup(self, name: str, table: np.ndarray) -> np.ndarray:
+        layer = self._derived.get(name)
+        if layer is None:
+            layer = table[self.codes]
+            layer.flags.writeable = False
+            self._derived[name] = layer
+        return layer
+
+    def cells(self, code: Optional[int] = None, region: Optional[Tuple[int, int, int, int]] = None) -> List[Point]:
+        """
+        (x, y) of every cell with code, or with any terrain if code is None,
+        optionally only within region = (x0, y0, x1, y1), end exclusive.
+        """
+        x0, y0, x1, y1 = region or (0, 0, self.width, self.height)
+        window = self.codes[y0:y1, x0:x1]
+        mask = window != EMPTY if code is None else window == code
+        ys, xs = np.nonzero(mask)
+        return list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+
+    def entity_at(self, x: int, y: int) -> Optional[Entity]:
+        """A fresh Entity for the terrain at an in-bounds cell, or None."""
+        code = self.flat[y * self.width + x]
+        if code == EMPTY:
+            return None
+        cls = TERRAIN_CLASSES[code]
+        if cls is Wall:
+            return Wall(x, y)
+        return cls(x, y, color=cls.random_color(random.Random(y * self.width + x)))
+
+    def entities(self, region: Optional[Tuple[int, int, int, int]] = None) -> List[Tuple[Point, Entity]]:
+        return [((x, y), self.entity_at(x, y)) for x, y in self.cells(region=region)]
@@ -17,8 +17,6 @@ from .config import (
     BUTTON_TEXT_COLOR,
     CELL_SIZE,
     FPS,
-    GRID_HEIGHT,
-    GRID_WIDTH,
     HUD_PANEL_WIDTH,
     PANEL_ACCENT_COLOR,
     PANEL_BG_COLOR,
@@ -34,6 +32,7 @@ from .map_runtime import build_runtime_world
 from .map_storage import load_or_create_default_map, save_custom_mission
 from .metrics import Zone
 from .terrain import Barrier, Forest, Water
+from .viewport import Viewport
 
 TOOL_WALL = "wall"
 TOOL_WATER = "water"
@@ -72,6 +71,15 @@ TOOL_BUTTON_GAP_X = 8
 TOOL_BUTTON_GAP_Y = 16
 TOOL_GRID_COLS = 5
 
+# Scrolling maps larger than the play area: arrow keys and mouse wheel
+PAN_KEYS = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
+PAN_CELLS = 5
+
 ACTION_BUTTON_H = 32
 ACTION_BUTTON_GAP = 8
 STATUS_BOX_H = 118
@@ -108,6 +116,7 @@ class MapEditor:
         self.action_buttons: dict[str, pygame.Rect] = {}
         self._tool_palette_bottom = 0
         self._action_buttons_bottom = 0
+        self._view = Viewport(self.map_data.width, self.map_data.height)
 
         self.save_dialog_open = False
         self.save_title = self.map_data.metadata.get(
@@ -122,6 +131,13 @@ class MapEditor:
         self.title_rect = pygame.Rect(0, 0, 0, 0)
         self.desc_rect = pygame.Rect(0, 0, 0, 0)
 
+    @property
+    def view(self) -> Viewport:
+        """The play-area viewport, rebuilt when the map changes size."""
+        if (self._view.grid_width, self._view.grid_height) != (self.map_data.width, self.map_data.height):
+            self._view = Viewport(self.map_data.width, self.map_data.height)
+        return self._view
+
     def run(self) -> MapEditorResult:
         pygame.init()
         window = pygame.display.set_mode((APP_WINDOW_WIDTH, APP_WINDOW_HEIGHT))
@@ -149,6 +165,9 @@ class MapEditor:
                     if result is not None:
                         pygame.quit()
                         return result
+                if event.type == pygame.MOUSEWHEEL:
+                    self.view.pan(event.x * PAN_CELLS, -event.y * PAN_CELLS)
+                    continue
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:
                         action_result = self._handle_panel_click(event.pos)
@@ -178,6 +197,11 @@ class MapEditor:
             self.status = f"Selected tool: {TOOL_LABELS[self.current_tool]}"
             return None
 
+        if key in PAN_KEYS:
+            dx, dy = PAN_KEYS[key]
+            self.view.pan(dx * PAN_CELLS, dy * PAN_CELLS)
+            return None
+
         if key == pygame.K_s:
             self._open_save_dialog()
             return None
@@ -309,11 +333,7 @@ class MapEditor:
     def _mouse_to_grid(self, mouse_pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
         if mouse_pos[0] >= WINDOW_WIDTH:
             return None
-        x = mouse_pos[0] // CELL_SIZE
-        y = mouse_pos[1] // CELL_SIZE
-        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
-            return (x, y)
-        return None
+        return self.view.to_cell(*mouse_pos)
 
     def _apply_tool(self, cell: Tuple[int, int]):
         if self.current_tool == TOOL_ERASE:
@@ -401,23 +421,26 @@ class MapEditor:
         play_surface = window.subsurface(pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
         play_surface.fill(BG_COLOR)
         runtime = self._build_preview_world()
-        self._draw_zones(play_surface, runtime.start_zone, runtime.dest_zone)
-        self._draw_objective_cells(play_surface, runtime.objective_cells)
-        runtime.grid.draw(play_surface)
+        view = self.view
+        self._draw_zones(play_surface, runtime.start_zone, runtime.dest_zone, view)
+        self._draw_objective_cells(play_surface, runtime.objective_cells, view)
+        runtime.grid.draw(play_surface, view)
         self._draw_sidebar(window)
         if self.save_dialog_open:
             self._draw_save_dialog(window)
 
-    def _draw_zones(self, surface, start_zone: Zone, dest_zone: Zone):
-        start_zone.draw(surface)
-        dest_zone.draw(surface)
+    def _draw_zones(self, surface, start_zone: Zone, dest_zone: Zone, view: Viewport):
+        start_zone.draw(surface, view)
+        dest_zone.draw(surface, view)
 
-    def _draw_objective_cells(self, surface, objective_cells):
+    def _draw_objective_cells(self, surface, objective_cells, view: Viewport):
+        inset = view.scale(6)
         for ox, oy in objective_cells:
-            block_rect = pygame.Rect(ox * CELL_SIZE, oy * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            inset_rect = block_rect.inflate(-6, -6)
+            if not view.is_visible(ox, oy):
+                continue
+            inset_rect = view.rect(ox, oy).inflate(-inset, -inset)
             pygame.draw.rect(surface, (210, 210, 80), inset_rect, border_radius=3)
-            pygame.draw.rect(surface, (240, 240, 240), inset_rect, 2, border_radius=3)
+            pygame.draw.rect(surface, (240, 240, 240), inset_rect, max(1, view.scale(2)), border_radius=3)
 
     def _draw_sidebar(self, window):
         panel_x = WINDOW_WIDTH
@@ -513,6 +536,8 @@ class MapEditor:
             "Start/Dest zone: click two corners.",
             self.status,
         ]
+        if self.view.scrolls:
+            lines.insert(2, "Arrows / mouse wheel: scroll map.")
         yy = rect.y + 34
         for line in lines:
             wrapped_lines = self._wrap_text(line, rect.width - 20)
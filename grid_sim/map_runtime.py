@@ -4,7 +4,9 @@ from dataclasses import dataclass
 from typing import List, Tuple
 
 from .entities import Movable, Wall
+from .fire_models import fire_model_from_metadata
 from .grid import Grid
+from .landmarks import landmarks_for
 from .map_data import MapData
 from .metrics import Zone
 from .terrain import Barrier, Forest, Water
@@ -29,7 +31,8 @@ TERRAIN_FIELDS = (
 
 
 def build_runtime_world(map_data: MapData) -> RuntimeWorld:
-    grid = Grid()
+    grid = Grid(map_data.width, map_data.height)
+    grid.fire_model = fire_model_from_metadata(map_data.metadata)
 
     start_zone_data = map_data.start_zone
     dest_zone_data = map_data.dest_zone
@@ -60,14 +63,14 @@ def build_runtime_world(map_data: MapData) -> RuntimeWorld:
 
     movables: List[Movable] = []
     for movable_data in map_data.movables:
-        grid.entities.pop((movable_data.x, movable_data.y), None)
+        grid.remove_entity(movable_data.x, movable_data.y)
         movable = Movable(movable_data.color, movable_data.x, movable_data.y)
         movables.append(movable)
         grid.add_entity(movable)
 
     objective_cells = list(map_data.objective_cells)
     for cell in objective_cells:
-        grid.entities.pop(cell, None)
+        grid.remove_entity(*cell)
 
     grid.objective_cells = set(dest_zone.all_cells())
 
@@ -78,6 +81,9 @@ def build_runtime_world(map_data: MapData) -> RuntimeWorld:
         fire_positions.append((x, y))
         grid.add_fire(x, y)
 
+    # ALT landmarks for the planners; config.LANDMARK_COUNT = 0 skips this
+    landmarks_for(grid)
+
     return RuntimeWorld(
         grid=grid,
         movables=movables,
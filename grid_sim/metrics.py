@@ -15,8 +15,7 @@ import math
 import random
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
-import pygame
-from .config import CELL_SIZE
+from .viewport import DEFAULT_VIEW
 
 
 # ──────────────────────────────────────────────
@@ -70,13 +69,10 @@ class Zone:
                 cells.append((cx, cy))
         return cells
 
-    def draw(self, window):
-        rect = pygame.Rect(
-            self.x * CELL_SIZE,
-            self.y * CELL_SIZE,
-            self.width * CELL_SIZE,
-            self.height * CELL_SIZE
-        )
+    def draw(self, window, view=None):
+        import pygame
+
+        rect = (view or DEFAULT_VIEW).rect(self.x, self.y, self.width, self.height)
 
         zone_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
         zone_surface.fill((*self.color, 70))
@@ -121,21 +117,21 @@ class EntityMetrics:
     def is_out_of_fuel(self) -> bool:
         return self.fuel <= 0 or self.ran_out_of_fuel
 
-    def has_fuel_for_step(self) -> bool:
+    def has_fuel_for_step(self, terrain_modifier: float = 1.0) -> bool:
         """Returns True if the entity has enough fuel to pay for one more step."""
-        tier = self.get_speed_tier()
-        return self.fuel >= tier.fuel_per_step
+        return self.fuel >= cell_movement_cost(self, terrain_modifier)
 
     def get_speed_tier(self) -> SpeedTier:
         return SPEED_TIERS.get(self.speed_tier, SPEED_TIERS["medium"])
 
-    def burn_fuel_for_step(self) -> bool:
+    def burn_fuel_for_step(self, terrain_modifier: float = 1.0) -> bool:
         """
-        Burns fuel for one step at the current speed tier.
+        Burns fuel for one step at the current speed tier into a cell with
+        the given terrain modifier.
         Returns False if not enough fuel remaining.
         """
         tier = self.get_speed_tier()
-        cost = tier.fuel_per_step
+        cost = cell_movement_cost(self, terrain_modifier)
 
         if self.fuel < cost:
             return False
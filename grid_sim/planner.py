@@ -0,0 +1,530 @@
+"""
+grid_sim/planner.py
+
+One planning API over several search strategies, with a time budget.
+
+The planning phase runs inside the 60 FPS loop in game.game(), so a search
+that takes longer than a frame stalls the UI. Every strategy here is a
+generator that does a bounded chunk of expansions per next() and yields
+the best PlanResult found so far. Callers either
+
+    - run one against a millisecond budget in a single call (plan_path,
+      plan_route), or
+    - hand many of them to a PlanningQueue, which steps them a little on
+      every frame.
+
+Strategies:
+    MODE_ASTAR          - plain A*; nothing to show until it finishes
+    MODE_ANYTIME        - ARA* (Likhachev, Gordon & Thrun, 2003): a quick
+                          solution with an inflated heuristic first, then
+                          improved with decreasing inflation, reusing the
+                          earlier search effort, down to optimal
+    MODE_BIDIRECTIONAL  - bidirectional A* from both ends, meeting in the
+                          middle; two small searches instead of one large
+                          one when the heuristic is weak
+
+PlanResult.bound is the suboptimality bound: the path costs at most bound
+times the optimum (1.0 = optimal, BLOCKED = nothing found yet).
+"""
+
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Hashable, Iterator, List, Optional, Sequence
+
+from .astar import BLOCKED, NEIGHBORS_4, Point, reconstruct_path
+from .cost_model import MINIMISE_FUEL, MINIMISE_STEPS, CostMap
+from .metrics import EntityMetrics
+
+MODE_ASTAR = "astar"
+MODE_ANYTIME = "anytime"
+MODE_BIDIRECTIONAL = "bidirectional"
+
+# Heuristic inflation for ARA*, from a fast first answer down to optimal
+DEFAULT_EPSILONS = (2.5, 2.0, 1.5, 1.2, 1.0)
+
+# Expansions between yields; small enough that one chunk is well under a
+# millisecond, large enough that the generator overhead does not show
+DEFAULT_CHUNK = 200
+
+
+@dataclass
+class PlanResult:
+    """Best route found so far by a budgeted search."""
+    path: Optional[List[Point]]
+    cost: float = BLOCKED
+    bound: float = BLOCKED
+    expanded: int = 0
+    elapsed_ms: float = 0.0
+    # True once the search is over: the path is optimal, or there is none
+    complete: bool = False
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+
+PlanSteps = Iterator[PlanResult]
+
+
+# ──────────────────────────────────────────────
+# STRATEGIES
+# ──────────────────────────────────────────────
+
+def _trivial_result(width: int, height: int, cost, start: Point, goal: Point) -> Optional[PlanResult]:
+    """The finished result for start == goal or an impossible query, else None."""
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+        return PlanResult(None, complete=True)
+    if start == goal:
+        return PlanResult([start], 0.0, 1.0, complete=True)
+    if cost(gy * width + gx) == BLOCKED:
+        return PlanResult(None, complete=True)
+    return None
+
+
+def _walked_cost(cost, width: int, path: List[Point]) -> float:
+    return sum(cost(y * width + x) for x, y in path[1:])
+
+
+def ara_star_steps(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    heuristic: Optional[Callable[[int, int], float]] = None,
+    epsilons: Sequence[float] = DEFAULT_EPSILONS,
+    chunk: int = DEFAULT_CHUNK,
+) -> PlanSteps:
+    """
+    ARA* as a generator of PlanResults.
+
+    Each pass is A* with the heuristic multiplied by the next epsilon.
+    Cells whose cost improves after they were expanded in the current pass
+    go to an INCONS list instead of back on the open list; the next pass
+    starts from open + INCONS rather than from scratch. After every pass
+    the bound is tightened to g(goal) / min(g + h) over the unexpanded
+    cells, which is often already far below epsilon.
+
+    heuristic(x, y) must be admissible and consistent (Manhattan distance
+    by default). epsilons must end at 1.0 for the final answer to be
+    optimal.
+    """
+    trivial = _trivial_result(width, height, cost, start, goal)
+    if trivial is not None:
+        yield trivial
+        return
+
+    gx, gy = goal
+    if heuristic is None:
+        def heuristic(x, y):
+            return abs(x - gx) + abs(y - gy)
+
+    size = width * height
+    start_index = start[1] * width + start[0]
+    goal_index = gy * width + gx
+    g_score = [BLOCKED] * size
+    came_from = [-1] * size
+    # Heuristic values are computed once per cell and reused by every pass
+    h_values = [-1.0] * size
+
+    def h(index: int) -> float:
+        value = h_values[index]
+        if value < 0.0:
+            y, x = divmod(index, width)
+            value = h_values[index] = heuristic(x, y)
+        return value
+
+    g_score[start_index] = 0.0
+    open_heap = [(epsilons[0] * h(start_index), 0.0, start_index)]
+    incons = set()
+    closed = bytearray(size)
+    expanded = 0
+    work = 0
+    best = PlanResult(None)
+
+    for pass_number, epsilon in enumerate(epsilons):
+        if pass_number:
+            # Re-key everything still open, plus INCONS, for the new epsilon
+            pending = {i for _, neg_g, i in open_heap if not closed[i] and -neg_g == g_score[i]}
+            pending |= incons
+            open_heap = [(g_score[i] + epsilon * h(i), -g_score[i], i) for i in pending]
+            heapq.heapify(open_heap)
+            incons = set()
+            closed = bytearray(size)
+
+        while open_heap:
+            key, neg_g, current = open_heap[0]
+            if closed[current] or -neg_g > g_score[current]:
+                heapq.heappop(open_heap)
+                continue  # stale entry left behind by lazy deletion
+            if g_score[goal_index] <= key:
+                break
+            heapq.heappop(open_heap)
+            closed[current] = 1
+            expanded += 1
+            current_g = -neg_g
+            cy, cx = divmod(current, width)
+
+            for dx, dy in NEIGHBORS_4:
+                nx = cx + dx
+                ny = cy + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbor = ny * width + nx
+                step = cost(neighbor)
+                if step == BLOCKED:
+                    continue
+                tentative = current_g + step
+                if tentative < g_score[neighbor]:
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    if closed[neighbor]:
+                        incons.add(neighbor)
+                    else:
+                        heapq.heappush(open_heap, (tentative + epsilon * h(neighbor), -tentative, neighbor))
+
+            work += 1
+            if work >= chunk:
+                work = 0
+                yield PlanResult(best.path, best.cost, best.bound, expanded)
+
+        goal_g = g_score[goal_index]
+        if goal_g == BLOCKED:
+            # Even the inflated search ran out of cells: there is no route
+            yield PlanResult(None, expanded=expanded, complete=True)
+            return
+
+        lower = min(
+            (-neg_g + h(i) for _, neg_g, i in open_heap if not closed[i] and -neg_g == g_score[i]),
+            default=goal_g,
+        )
+        lower = min([lower] + [g_score[i] + h(i) for i in incons])
+        bound = max(1.0, min(epsilon, goal_g / lower if lower > 0.0 else 1.0))
+        path = reconstruct_path(came_from, width, goal_index)
+        best = PlanResult(path, _walked_cost(cost, width, path), bound, expanded)
+        if bound <= 1.0:
+            best.complete = True
+            yield best
+            return
+        yield PlanResult(best.path, best.cost, best.bound, expanded)
+
+    # epsilons did not reach 1.0: the last answer is as good as it gets
+    best.complete = True
+    yield best
+
+
+def astar_steps(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    heuristic: Optional[Callable[[int, int], float]] = None,
+    chunk: int = DEFAULT_CHUNK,
+) -> PlanSteps:
+    """Plain A* in budgetable chunks (ARA* with a single epsilon of 1.0)."""
+    return ara_star_steps(width, height, cost, start, goal, heuristic, (1.0,), chunk)
+
+
+def bidirectional_steps(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    min_step: float = 1.0,
+    chunk: int = DEFAULT_CHUNK,
+) -> PlanSteps:
+    """
+    Bidirectional A* as a generator of PlanResults.
+
+    The forward search runs from start with Manhattan distance to goal,
+    the backward search from goal with Manhattan distance to start (both
+    times min_step, the cheapest possible step). Each round expands the
+    side with the smaller open list. mu is the cheapest route seen through
+    a cell reached from both sides; the search stops once either side's
+    smallest f is no better than mu (the symmetric stopping rule).
+
+    Costs are directed (entering a cell is what costs), so the backward
+    search charges the cell it steps out of: back[v] is the cost of the
+    route v -> goal, not counting v itself.
+    """
+    trivial = _trivial_result(width, height, cost, start, goal)
+    if trivial is not None:
+        yield trivial
+        return
+
+    sx, sy = start
+    gx, gy = goal
+    size = width * height
+    start_index = sy * width + sx
+    goal_index = gy * width + gx
+
+    fore = [BLOCKED] * size
+    back = [BLOCKED] * size
+    fore_parent = [-1] * size
+    back_parent = [-1] * size
+    fore_closed = bytearray(size)
+    back_closed = bytearray(size)
+    fore[start_index] = 0.0
+    back[goal_index] = 0.0
+    fore_heap = [((abs(sx - gx) + abs(sy - gy)) * min_step, 0.0, start_index)]
+    back_heap = [((abs(sx - gx) + abs(sy - gy)) * min_step, 0.0, goal_index)]
+
+    mu = BLOCKED
+    meet = -1
+    expanded = 0
+    work = 0
+
+    def top(heap, dist, closed) -> float:
+        while heap:
+            key, neg_g, index = heap[0]
+            if closed[index] or -neg_g > dist[index]:
+                heapq.heappop(heap)
+                continue
+            return key
+        return BLOCKED
+
+    def result(complete: bool) -> PlanResult:
+        if meet == -1:
+            return PlanResult(None, expanded=expanded, complete=complete)
+        path = reconstruct_path(fore_parent, width, meet)
+        index = back_parent[meet]
+        while index != -1:
+            y, x = divmod(index, width)
+            path.append((x, y))
+            index = back_parent[index]
+        lower = min(mu, max(top(fore_heap, fore, fore_closed), top(back_heap, back, back_closed)))
+        bound = 1.0 if complete else (mu / lower if lower > 0.0 else BLOCKED)
+        return PlanResult(path, mu, max(bound, 1.0), expanded, complete=complete)
+
+    while True:
+        fore_top = top(fore_heap, fore, fore_closed)
+        back_top = top(back_heap, back, back_closed)
+        if fore_top >= mu or back_top >= mu:
+            # Also covers both heaps running dry (BLOCKED >= anything)
+            yield result(True)
+            return
+
+        forward = len(fore_heap) <= len(back_heap)
+        if forward:
+            _, neg_g, current = heapq.heappop(fore_heap)
+            fore_closed[current] = 1
+        else:
+            _, neg_g, current = heapq.heappop(back_heap)
+            back_closed[current] = 1
+        expanded += 1
+        current_g = -neg_g
+        cy, cx = divmod(current, width)
+        # Walking backwards into a neighbour means stepping out of it into
+        # current, which costs current's entry price
+        back_step = cost(current) if not forward else 0.0
+
+        for dx, dy in NEIGHBORS_4:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbor = ny * width + nx
+            step = cost(neighbor)
+            if forward:
+                if step == BLOCKED or fore_closed[neighbor]:
+                    continue
+                tentative = current_g + step
+                if tentative >= fore[neighbor]:
+                    continue
+                fore[neighbor] = tentative
+                fore_parent[neighbor] = current
+                total = tentative + back[neighbor]
+                h = (abs(nx - gx) + abs(ny - gy)) * min_step
+                if tentative + h < mu:
+                    heapq.heappush(fore_heap, (tentative + h, -tentative, neighbor))
+            else:
+                # The start cell is occupied by the planner itself and is
+                # never checked for blocking
+                if (step == BLOCKED and neighbor != start_index) or back_closed[neighbor]:
+                    continue
+                tentative = current_g + back_step
+                if tentative >= back[neighbor]:
+                    continue
+                back[neighbor] = tentative
+                back_parent[neighbor] = current
+                total = tentative + fore[neighbor]
+                h = (abs(nx - sx) + abs(ny - sy)) * min_step
+                if tentative + h < mu:
+                    heapq.heappush(back_heap, (tentative + h, -tentative, neighbor))
+            if total < mu:
+                mu = total
+                meet = neighbor
+
+        work += 1
+        if work >= chunk:
+            work = 0
+            yield result(False)
+
+
+def search_steps(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    mode: str = MODE_ANYTIME,
+    heuristic: Optional[Callable[[int, int], float]] = None,
+    min_step: float = 1.0,
+) -> PlanSteps:
+    """
+    The search generator for mode. heuristic overrides the Manhattan
+    default for A* and ARA*; bidirectional search always uses Manhattan
+    distance times min_step from both ends.
+    """
+    if heuristic is None:
+        gx, gy = goal
+
+        def heuristic(x, y):
+            return (abs(x - gx) + abs(y - gy)) * min_step
+
+    if mode == MODE_ANYTIME:
+        return ara_star_steps(width, height, cost, start, goal, heuristic)
+    if mode == MODE_ASTAR:
+        return astar_steps(width, height, cost, start, goal, heuristic)
+    if mode == MODE_BIDIRECTIONAL:
+        return bidirectional_steps(width, height, cost, start, goal, min_step)
+    raise ValueError(f"Unknown planner mode: {mode}")
+
+
+def run_with_budget(steps: PlanSteps, budget_ms: Optional[float] = None) -> PlanResult:
+    """
+    Drives a search generator until it completes or budget_ms runs out
+    (None = no limit) and returns the last PlanResult it produced.
+    """
+    started = time.perf_counter()
+    result = PlanResult(None)
+    for result in steps:
+        if result.complete:
+            break
+        if budget_ms is not None and (time.perf_counter() - started) * 1000.0 >= budget_ms:
+            break
+    result.elapsed_ms = (time.perf_counter() - started) * 1000.0
+    return result
+
+
+def plan_path(
+    width: int,
+    height: int,
+    cost: Callable[[int], float],
+    start: Point,
+    goal: Point,
+    mode: str = MODE_ANYTIME,
+    budget_ms: Optional[float] = None,
+    heuristic: Optional[Callable[[int, int], float]] = None,
+    min_step: float = 1.0,
+) -> PlanResult:
+    """Runs the mode's search for at most budget_ms and returns the best result."""
+    return run_with_budget(search_steps(width, height, cost, start, goal, mode, heuristic, min_step), budget_ms)
+
+
+def route_steps(
+    cost_map: CostMap,
+    start: Point,
+    goal: Point,
+    metrics: Optional[EntityMetrics] = None,
+    mode: str = MODE_ANYTIME,
+    minimise: str = MINIMISE_FUEL,
+    landmarks=None,
+) -> PlanSteps:
+    """
+    The search generator for a route on a CostMap, with the same cost
+    rules as cost_model.shortest_path. landmarks (a LandmarkSet) gives
+    A* and ARA* the ALT heuristic when minimising fuel.
+    """
+    if minimise == MINIMISE_STEPS:
+        cost = cost_map.unit_costs().__getitem__
+        scale = 1.0
+    elif minimise == MINIMISE_FUEL:
+        scale = metrics.get_speed_tier().fuel_per_step if metrics is not None else 1.0
+        cost = cost_map.cost_function(scale)
+    else:
+        raise ValueError(f"Unknown minimise mode: {minimise}")
+
+    heuristic = None
+    if landmarks is not None and minimise == MINIMISE_FUEL:
+        heuristic = landmarks.heuristic(goal, scale, start)
+    # Every multiplier is >= 1.0, so one step costs at least scale
+    return search_steps(cost_map.width, cost_map.height, cost, start, goal, mode, heuristic, scale)
+
+
+def plan_route(
+    cost_map: CostMap,
+    start: Point,
+    goal: Point,
+    metrics: Optional[EntityMetrics] = None,
+    mode: str = MODE_ANYTIME,
+    budget_ms: Optional[float] = None,
+    minimise: str = MINIMISE_FUEL,
+    landmarks=None,
+) -> PlanResult:
+    """
+    Plans start -> goal on cost_map within budget_ms and returns the best
+    path found so far with its suboptimality bound.
+    """
+    return run_with_budget(route_steps(cost_map, start, goal, metrics, mode, minimise, landmarks), budget_ms)
+
+
+# ──────────────────────────────────────────────
+# PER-FRAME QUEUE
+# ──────────────────────────────────────────────
+
+class PlanningQueue:
+    """
+    Search generators stepped round-robin for a few milliseconds per frame.
+
+    Each job has a key (one job per key; resubmitting replaces it) and an
+    on_result callback that gets every improved PlanResult: the first path
+    found, each tighter bound, and the final result. With ARA* a usable
+    route appears within a frame or two and keeps improving while the UI
+    stays responsive.
+    """
+
+    def __init__(self):
+        # [key, steps, on_result, last bound reported]
+        self._jobs: Deque[list] = deque()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def submit(self, key: Hashable, steps: PlanSteps, on_result: Callable[[PlanResult], None]):
+        self.cancel(key)
+        self._jobs.append([key, steps, on_result, BLOCKED])
+
+    def cancel(self, key: Hashable):
+        self._jobs = deque(job for job in self._jobs if job[0] != key)
+
+    def clear(self):
+        self._jobs.clear()
+
+    def step(self, budget_ms: float) -> int:
+        """Advances the queued searches for about budget_ms. Returns how many finished."""
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        finished = 0
+        while self._jobs and time.perf_counter() < deadline:
+            job = self._jobs[0]
+            _, steps, on_result, last_bound = job
+            result = next(steps, None)
+            if result is None:
+                self._jobs.popleft()
+                finished += 1
+                continue
+            if result.complete or (result.found and result.bound < last_bound):
+                job[3] = result.bound
+                on_result(result)
+            if result.complete:
+                self._jobs.popleft()
+                finished += 1
+            else:
+                self._jobs.rotate(-1)
+        return finished
@@ -1,4 +1,5 @@
 # renderer.py
+import numpy as np
 import pygame
 
 from .config import (
@@ -8,7 +9,6 @@ from .config import (
     BUTTON_BG_COLOR,
     BUTTON_HOVER_COLOR,
     BUTTON_TEXT_COLOR,
-    CELL_SIZE,
     HUD_PANEL_WIDTH,
     PANEL_ACCENT_COLOR,
     PANEL_BG_COLOR,
@@ -18,7 +18,13 @@ from .config import (
     WINDOW_HEIGHT,
     WINDOW_WIDTH,
 )
+from .cost_model import cost_map_for, path_fuel_cost
 from .phases import PHASE_FINISHED, PHASE_MOVING, PHASE_PLANNING
+from .viewport import DEFAULT_VIEW
+
+# Fire risk overlay: colour, and its opacity where every rollout burns
+FIRE_RISK_COLOR = (255, 150, 0)
+FIRE_RISK_MAX_ALPHA = 170
 
 
 class SimulationRenderer:
@@ -32,12 +38,14 @@ class SimulationRenderer:
         play_surface = self.window.subsurface(pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
         play_surface.fill(BG_COLOR)
 
-        self._draw_zones(simulation, play_surface)
-        self._draw_objective_cells(simulation, play_surface)
-        simulation.grid.draw(play_surface)
+        view = getattr(simulation, "view", DEFAULT_VIEW)
+        self._draw_zones(simulation, play_surface, view)
+        self._draw_objective_cells(simulation, play_surface, view)
+        simulation.grid.draw(play_surface, view)
+        self._draw_fire_risk(simulation, play_surface, view)
 
         if simulation.phase == PHASE_MOVING:
-            self._draw_proximity_overlays(simulation, play_surface)
+            self._draw_proximity_overlays(simulation, play_surface, view)
 
         if simulation.phase == PHASE_FINISHED:
             simulation.stats.draw(play_surface, self.font, getattr(simulation, "_last_export_path", None))
@@ -67,32 +75,47 @@ class SimulationRenderer:
         text = self.small_font.render(label, True, BUTTON_TEXT_COLOR)
         self.window.blit(text, text.get_rect(center=rect.center))
 
-    def _draw_zones(self, simulation, surface):
+    def _draw_zones(self, simulation, surface, view):
         for zone in (simulation.start_zone, simulation.dest_zone):
-            zone.draw(surface)
+            zone.draw(surface, view)
 
         start_label = self.font.render(simulation.start_zone.name, True, (200, 200, 220))
-        surface.blit(
-            start_label,
-            (simulation.start_zone.x * CELL_SIZE + 2, simulation.start_zone.y * CELL_SIZE - 18),
-        )
+        zone_rect = view.rect(simulation.start_zone.x, simulation.start_zone.y)
+        surface.blit(start_label, (zone_rect.x + 2, zone_rect.y - 18))
 
-    def _draw_objective_cells(self, simulation, surface):
+    def _draw_objective_cells(self, simulation, surface, view):
+        inset = view.scale(6)
         for ox, oy in simulation.objective_cells:
-            block_rect = pygame.Rect(ox * CELL_SIZE, oy * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            inset_rect = block_rect.inflate(-6, -6)
+            if not view.is_visible(ox, oy):
+                continue
+            inset_rect = view.rect(ox, oy).inflate(-inset, -inset)
             pygame.draw.rect(surface, (210, 210, 80), inset_rect, border_radius=3)
-            pygame.draw.rect(surface, (240, 240, 240), inset_rect, 2, border_radius=3)
-
-    def _draw_proximity_overlays(self, simulation, surface):
+            pygame.draw.rect(surface, (240, 240, 240), inset_rect, max(1, view.scale(2)), border_radius=3)
+
+    def _draw_fire_risk(self, simulation, surface, view):
+        # Chance of burning by the end of the forecast, as orange shading
+        forecast = getattr(simulation, "current_fire_risk", None)
+        ensemble = forecast() if forecast is not None else None
+        if ensemble is None:
+            return
+        x0, y0, x1, y1 = view.visible_cells()
+        chance = ensemble.probability(ensemble.ticks)[y0:y1, x0:x1]
+        image = pygame.Surface((x1 - x0, y1 - y0), pygame.SRCALPHA)
+        image.fill(FIRE_RISK_COLOR)
+        alpha = pygame.surfarray.pixels_alpha(image)
+        alpha[:] = (chance.T * FIRE_RISK_MAX_ALPHA).astype(np.uint8)
+        del alpha
+        size = view.cell_size
+        surface.blit(pygame.transform.scale(image, ((x1 - x0) * size, (y1 - y0) * size)), (0, 0))
+
+    def _draw_proximity_overlays(self, simulation, surface, view):
         for movable in simulation.movables:
             metrics = getattr(movable, "metrics", None)
             if metrics is None:
                 continue
 
-            px = movable.x_pos * CELL_SIZE + CELL_SIZE // 2
-            py = movable.y_pos * CELL_SIZE + CELL_SIZE // 2
-            radius_px = metrics.proximity_radius * CELL_SIZE
+            px, py = view.center(movable.x_pos, movable.y_pos)
+            radius_px = metrics.proximity_radius * view.cell_size
             prox_surface = pygame.Surface((radius_px * 2, radius_px * 2), pygame.SRCALPHA)
             pygame.draw.circle(prox_surface, (100, 180, 255, 30), (radius_px, radius_px), radius_px)
             pygame.draw.circle(prox_surface, (100, 180, 255, 80), (radius_px, radius_px), radius_px, 1)
@@ -112,10 +135,21 @@ class SimulationRenderer:
             "Click a blue square to select it.",
             "Arrow keys: plan path",
             "Backspace: undo   C: clear",
+            "A: auto-plan selected (all if none)",
             "Enter: start   Space: pause",
             "R: reset   G: regenerate map",
+            "F: forecast fire risk",
             "Use the Back button below to return.",
         ]
+        lines.extend(self._map_lines(simulation))
+
+        forecast = getattr(simulation, "current_fire_risk", None)
+        ensemble = forecast() if forecast is not None else None
+        if ensemble is not None:
+            lines.append("")
+            lines.append(f"Fire risk: {ensemble.runs} runs, {ensemble.ticks} fire ticks ahead")
+
+        lines.extend(self._pending_route_lines(simulation))
 
         for movable in simulation.movables:
             metrics = getattr(movable, "metrics", None)
@@ -125,10 +159,11 @@ class SimulationRenderer:
                 lines.append(f"Fuel: {metrics.fuel:.0f}/{metrics.max_fuel:.0f}")
                 lines.append(f"Proximity: {metrics.proximity_radius} cells")
                 planned_len = len(movable.planned_cells)
-                tier = metrics.get_speed_tier()
-                est_cost = tier.fuel_per_step * planned_len
+                est_cost = path_fuel_cost(metrics, cost_map_for(simulation.grid), movable.planned_cells)
                 lines.append(f"Planned steps: {planned_len}")
                 lines.append(f"Est. fuel cost: {est_cost:.1f}")
+                if est_cost > metrics.fuel:
+                    lines.append("Plan needs more fuel than the tank holds!")
                 if metrics.objective_cell is not None:
                     ox, oy = metrics.objective_cell
                     lines.append(f"Assigned objective: ({ox}, {oy})")
@@ -143,6 +178,9 @@ class SimulationRenderer:
             "Space: pause   R: reset",
             "Use the Back button below to return.",
         ]
+        lines.extend(self._map_lines(simulation))
+
+        lines.extend(self._pending_route_lines(simulation))
 
         for index, movable in enumerate(simulation.movables, start=1):
             metrics = getattr(movable, "metrics", None)
@@ -170,6 +208,24 @@ class SimulationRenderer:
         ]
         self._render_lines(lines, x=WINDOW_WIDTH + 12, y=54)
 
+    def _map_lines(self, simulation):
+        """Map size, and how to scroll when the map does not fit the play area."""
+        view = getattr(simulation, "view", None)
+        if view is None or not view.scrolls:
+            return []
+        return [
+            "",
+            f"Map: {simulation.grid.width} x {simulation.grid.height} cells",
+            "Mouse wheel: scroll map",
+        ]
+
+    def _pending_route_lines(self, simulation):
+        """How many queued routes are still being computed, if any."""
+        pending = len(getattr(simulation, "planning_queue", ()))
+        if not pending:
+            return []
+        return ["", f"Auto-planning: {pending} route(s) pending"]
+
     def _render_lines(self, lines, x=10, y=10, color=PANEL_TEXT_COLOR, line_gap=4):
         yy = y
         max_width = APP_WINDOW_WIDTH - x - 14
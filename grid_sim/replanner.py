@@ -0,0 +1,250 @@
+"""
+grid_sim/replanner.py
+
+Incremental replanning with D* Lite (Koenig & Likhachev, 2002).
+
+A DStarLite instance searches backwards from the goal once, then keeps its
+search tree alive. When cell costs change (fire spreads, a barrier is
+placed) only the vertices whose best route actually changed are
+re-expanded, and when the entity moves the start is shifted with the
+key-modifier trick instead of re-rooting the search. On a large map with a
+handful of new fire tiles per tick this costs a small fraction of a fresh
+A*.
+
+Costs follow the planner convention: cost[index] is the price of stepping
+INTO a cell, BLOCKED for impassable cells. Changing a cell's cost therefore
+changes the edges that lead into it, i.e. the edges from its neighbours.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .astar import BLOCKED, NEIGHBORS_4, Point
+from .cost_model import fire_affected_cells, fire_aware_cost, fire_aware_costs
+
+
+class DStarLite:
+    """
+    One persistent incremental search from a moving start to a fixed goal.
+
+    Typical use per movable:
+        planner = DStarLite(width, height, costs, start, goal)
+        path = planner.path()
+        ...
+        planner.move_start(current_position)
+        planner.update_costs({cell: new_cost, ...})
+        path = planner.path()
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        costs: Sequence[float],
+        start: Point,
+        goal: Point,
+        heuristic_scale: Optional[float] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.costs = list(costs)
+        self.goal = goal
+        self.start = start
+
+        # Manhattan distance times the cheapest step keeps h admissible
+        if heuristic_scale is None:
+            passable = [c for c in self.costs if c != BLOCKED]
+            heuristic_scale = min(passable) if passable else 1.0
+        self.heuristic_scale = heuristic_scale
+
+        size = width * height
+        self.g = [BLOCKED] * size
+        self.rhs = [BLOCKED] * size
+        self.km = 0.0
+        self.expanded = 0
+
+        # Heap of (key1, key2, index) with lazy deletion: _queued holds the
+        # live key for each queued vertex, anything else on the heap is stale
+        self._heap: List[Tuple[float, float, int]] = []
+        self._queued: Dict[int, Tuple[float, float]] = {}
+
+        goal_index = self._index(goal)
+        self.rhs[goal_index] = 0.0
+        self._push(goal_index)
+        self.compute_shortest_path()
+
+    # ---- helpers ----
+
+    def _index(self, point: Point) -> int:
+        return point[1] * self.width + point[0]
+
+    def _point(self, index: int) -> Point:
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def _neighbors(self, index: int):
+        y, x = divmod(index, self.width)
+        for dx, dy in NEIGHBORS_4:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield ny * self.width + nx
+
+    def _heuristic(self, index: int) -> float:
+        y, x = divmod(index, self.width)
+        sx, sy = self.start
+        return (abs(x - sx) + abs(y - sy)) * self.heuristic_scale
+
+    def _key(self, index: int) -> Tuple[float, float]:
+        best = min(self.g[index], self.rhs[index])
+        return (best + self._heuristic(index) + self.km, best)
+
+    def _push(self, index: int):
+        key = self._key(index)
+        self._queued[index] = key
+        heapq.heappush(self._heap, (key[0], key[1], index))
+
+    def _top(self):
+        while self._heap:
+            k1, k2, index = self._heap[0]
+            if self._queued.get(index) == (k1, k2):
+                return (k1, k2), index
+            heapq.heappop(self._heap)
+        return (BLOCKED, BLOCKED), -1
+
+    def _update_vertex(self, index: int):
+        if index != self._index(self.goal):
+            best = BLOCKED
+            for succ in self._neighbors(index):
+                step = self.costs[succ]
+                if step == BLOCKED:
+                    continue
+                candidate = step + self.g[succ]
+                if candidate < best:
+                    best = candidate
+            self.rhs[index] = best
+
+        self._queued.pop(index, None)
+        if self.g[index] != self.rhs[index]:
+            self._push(index)
+
+    # ---- search ----
+
+    def compute_shortest_path(self, max_expansions: Optional[int] = None) -> bool:
+        """
+        Expands vertices until the start is locally consistent.
+        Returns False if max_expansions ran out first.
+        """
+        start_index = self._index(self.start)
+        budget = max_expansions
+
+        while True:
+            top_key, index = self._top()
+            start_key = self._key(start_index)
+            if index == -1:
+                return True
+            if top_key >= start_key and self.rhs[start_index] == self.g[start_index]:
+                return True
+            if budget is not None:
+                if budget <= 0:
+                    return False
+                budget -= 1
+
+            heapq.heappop(self._heap)
+            del self._queued[index]
+            self.expanded += 1
+
+            new_key = self._key(index)
+            if top_key < new_key:
+                # km grew since this vertex was queued; requeue with the new key
+                self._push(index)
+            elif self.g[index] > self.rhs[index]:
+                self.g[index] = self.rhs[index]
+                for pred in self._neighbors(index):
+                    self._update_vertex(pred)
+            else:
+                self.g[index] = BLOCKED
+                self._update_vertex(index)
+                for pred in self._neighbors(index):
+                    self._update_vertex(pred)
+
+    def move_start(self, new_start: Point):
+        """Shifts the start after the entity moved along its route."""
+        if new_start == self.start:
+            return
+        # Every queued key was computed against the old start; km keeps them
+        # valid lower bounds without touching the queue
+        self.km += self._heuristic(self._index(new_start))
+        self.start = new_start
+
+    def update_costs(self, changes: Dict[Point, float]):
+        """
+        Applies new step costs for some cells and repairs the search tree.
+        changes maps (x, y) -> new cost (BLOCKED for impassable).
+        """
+        touched = set()
+        for point, new_cost in changes.items():
+            index = self._index(point)
+            if self.costs[index] == new_cost:
+                continue
+            self.costs[index] = new_cost
+            # Entering this cell got cheaper or dearer, so every neighbour
+            # that could step into it has a different rhs
+            touched.update(self._neighbors(index))
+
+        for index in touched:
+            self._update_vertex(index)
+        if touched:
+            self.compute_shortest_path()
+
+    # ---- results ----
+
+    def cost_to_goal(self) -> float:
+        return self.g[self._index(self.start)]
+
+    def path(self) -> Optional[List[Point]]:
+        """
+        Current best route from start to goal, inclusive of both ends,
+        or None if the goal is unreachable.
+        """
+        self.compute_shortest_path()
+        start_index = self._index(self.start)
+        goal_index = self._index(self.goal)
+        if self.g[start_index] == BLOCKED and start_index != goal_index:
+            return None
+
+        path = [self.start]
+        index = start_index
+        limit = self.width * self.height
+        while index != goal_index:
+            best_next = -1
+            best_cost = BLOCKED
+            for succ in self._neighbors(index):
+                step = self.costs[succ]
+                if step == BLOCKED:
+                    continue
+                candidate = step + self.g[succ]
+                if candidate < best_cost:
+                    best_cost = candidate
+                    best_next = succ
+            if best_next == -1 or len(path) > limit:
+                return None
+            index = best_next
+            path.append(self._point(index))
+        return path
+
+
+def replanner_for(cost_map, fire_tiles, start: Point, goal: Point, fuel_per_step: float = 1.0) -> DStarLite:
+    """Builds a fire-aware DStarLite over a CostMap for one entity."""
+    costs = fire_aware_costs(cost_map, fire_tiles, fuel_per_step)
+    return DStarLite(cost_map.width, cost_map.height, costs, start, goal, heuristic_scale=fuel_per_step)
+
+
+def fire_cost_changes(cost_map, fire_tiles, new_fire_tiles: Iterable[Point], fuel_per_step: float = 1.0) -> Dict[Point, float]:
+    """
+    New step costs for every cell affected by newly ignited tiles
+    (the tiles themselves and their neighbours).
+    """
+    changes = {}
+    for x, y in fire_affected_cells(new_fire_tiles, cost_map.width, cost_map.height):
+        changes[(x, y)] = fire_aware_cost(cost_map, fire_tiles, x, y, fuel_per_step)
+    return changes
@@ -3,6 +3,7 @@ grid_sim/sim_export.py
 
 Exports simulation summary data to a timestamped JSON file in sim_results/.
 Called automatically when the simulation reaches PHASE_FINISHED.
+build_sim_summary gives the same payload without writing it, for batch runs.
 """
 
 import json
@@ -10,15 +11,19 @@ import os
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from .phases import PHASE_FINISHED
+
 if TYPE_CHECKING:
     from .simulation import SimulationManager
 
 _RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sim_results")
 
 
-def _stop_reason(entity, stats_data: dict) -> dict:
+def _stop_reason(entity, stats_data: dict, cut_short: bool = False) -> dict:
     """
     Determine why an entity stopped and whether it succeeded.
+    cut_short is True when the run ended at its tick limit before the
+    mission finished.
 
     Returns a dict with:
         code   — machine-readable key
@@ -65,6 +70,18 @@ def _stop_reason(entity, stats_data: dict) -> dict:
             ),
         }
 
+    if cut_short and not entity.is_done():
+        steps_remaining = stats_data["steps_planned"] - stats_data["steps_taken"]
+        return {
+            "code": "max_ticks_reached",
+            "label": "Still En Route",
+            "detail": (
+                f"The run stopped at its tick limit while the entity was still "
+                f"following its path, after {stats_data['steps_taken']} step(s) "
+                f"with approximately {steps_remaining} planned step(s) remaining."
+            ),
+        }
+
     # Path completed but objective cell / zone was not reached
     return {
         "code": "completed_path_missed_destination",
@@ -78,9 +95,9 @@ def _stop_reason(entity, stats_data: dict) -> dict:
     }
 
 
-def _entity_summary(index: int, entity, stats_data: dict) -> dict:
+def _entity_summary(index: int, entity, stats_data: dict, cut_short: bool = False) -> dict:
     m = getattr(entity, "metrics", None)
-    reason = _stop_reason(entity, stats_data)
+    reason = _stop_reason(entity, stats_data, cut_short)
 
     nav = {}
     fuel_block = {}
@@ -109,6 +126,7 @@ def _entity_summary(index: int, entity, stats_data: dict) -> dict:
             "steps_planned": stats_data["steps_planned"],
             "steps_taken": stats_data["steps_taken"],
             "blocked_moves": stats_data["collisions"],
+            "waits": stats_data.get("waits", 0),
             "efficiency": round(stats_data.get("efficiency", 0.0), 4),
             "start_position": list(stats_data["start"]),
             "end_position": list(stats_data.get("end", [entity.x_pos, entity.y_pos])),
@@ -148,6 +166,8 @@ def _overall_outcome(entity_summaries: list) -> dict:
             parts.append("fuel exhaustion")
         if "completed_path_missed_destination" in reasons:
             parts.append("incomplete path planning")
+        if "max_ticks_reached" in reasons:
+            parts.append("run stopped at its tick limit")
         detail = f"No entities reached the destination. Causes: {', '.join(parts)}."
 
     return {"outcome": outcome, "detail": detail}
@@ -158,9 +178,16 @@ def export_sim_results(sim: "SimulationManager") -> str:
     Build a simulation summary dict and write it to sim_results/<timestamp>.json.
     Returns the path to the written file.
     """
+    return write_sim_results(build_sim_summary(sim))
+
+
+def build_sim_summary(sim: "SimulationManager") -> dict:
+    """The summary dict export_sim_results writes."""
     stats_values = list(sim.stats._data.values())
+    # run_to_completion can stop at max_ticks with the mission still going
+    cut_short = sim.phase != PHASE_FINISHED
     entity_summaries = [
-        _entity_summary(i, d["entity"], d)
+        _entity_summary(i, d["entity"], d, cut_short)
         for i, d in enumerate(stats_values)
     ]
 
@@ -176,7 +203,11 @@ def export_sim_results(sim: "SimulationManager") -> str:
         "entity_count": len(entity_summaries),
         "entities": entity_summaries,
     }
+    return payload
+
 
+def write_sim_results(payload: dict) -> str:
+    """Writes a summary dict to sim_results/<timestamp>.json and returns the path."""
     os.makedirs(_RESULTS_DIR, exist_ok=True)
     filename = datetime.now().strftime("sim_%Y%m%d_%H%M%S.json")
     filepath = os.path.join(_RESULTS_DIR, filename)
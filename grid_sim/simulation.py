@@ -1,21 +1,47 @@
 # simulation.py
 import random
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
-
-import pygame
-
-from .config import BACK_BUTTON_RECT
-from .entities import Movable
-from .generation import generate_walls
+from typing import Callable, List, Optional, Tuple
+
+from .config import (
+    AUTO_PLAN_BATCH_CELLS,
+    BACK_BUTTON_RECT,
+    FIRE_RISK_CONFIDENCE,
+    FIRE_RISK_RUNS,
+    FIRE_RISK_TICKS,
+    PLANNING_FRAME_BUDGET_MS,
+    RUN_MAX_TICKS,
+)
+from .entities import Movable, apply_fire_damage_all
+from .generation import generate_walls, scaled_feature_count
 from .grid import Grid
+from .landmarks import landmarks_for
+from .layers import BARRIER, FOREST, WALL, WATER
 from .map_data import MapData, MovableSpawnData, ZoneData
 from .map_runtime import build_runtime_world
+from .assignment import assign_objectives
+from .astar import BLOCKED
+from .cbs import solve_cbs
+from .cooperative import plan_cooperative
+from .cost_model import MINIMISE_STEPS, cost_map_for, path_fuel_cost
+from .fire_ensemble import FireEnsemble, forecast_fire
+from .fire_forecast import arrival_steps, fire_arrival_ticks, plan_fire_safe
+from .flow_field import flow_field_for, flow_fields_to_cells_steps
+from .fuel_routing import MINIMISE_RISK, route_within_fuel, route_within_fuel_steps
 from .metrics import Zone, random_entity_metrics
 from .phases import PHASE_FINISHED, PHASE_MOVING, PHASE_PLANNING
-from .sim_export import export_sim_results
+from .planner import MODE_ANYTIME, PlanResult, PlanningQueue, route_steps
+from .replanner import fire_cost_changes, replanner_for
+from .sim_export import build_sim_summary, export_sim_results, write_sim_results
 from .stats import SimStats
 from .config import GRID_WIDTH, GRID_HEIGHT
+from .viewport import Viewport
+
+
+def monotonic_ms() -> int:
+    """Milliseconds on the system's monotonic clock, the default simulation clock."""
+    return int(time.monotonic() * 1000)
 
 
 @dataclass(frozen=True)
@@ -28,9 +54,48 @@ class SimulationTiming:
         return 1000.0 / self.simulation_tick_fps
 
 
+class _SharedSteps:
+    """
+    A pausing generator (flow_fields_to_cells_steps, ...) that several
+    planning jobs wait on; whichever of them the queue steps advances it.
+    """
+
+    def __init__(self, steps):
+        self._steps = steps
+        self.done = False
+        self.value = None
+
+    def advance(self):
+        try:
+            next(self._steps)
+        except StopIteration as done:
+            self.done = True
+            self.value = done.value
+
+
+def _pending(steps):
+    """Passes a pausing generator's pauses on as empty PlanResults and returns its value."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+        yield PlanResult(None)
+
+
 class SimulationManager:
-    def __init__(self, map_data: Optional[MapData] = None):
-        self.grid = Grid()
+    def __init__(
+        self,
+        map_data: Optional[MapData] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+        clock: Callable[[], int] = monotonic_ms,
+    ):
+        # Size of randomized worlds; a loaded map brings its own
+        self.width = width
+        self.height = height
+        self.grid = Grid(width, height)
+        self.view = Viewport(width, height)
         self.stats = SimStats()
         self.timing = SimulationTiming()
 
@@ -46,8 +111,23 @@ class SimulationManager:
         self.source_map_data: Optional[MapData] = None
 
         self._simulation_accumulator_ms = 0.0
-        self._last_frame_time_ms = pygame.time.get_ticks()
+        # Milliseconds for start() and update(); the caller's frame loop reads
+        # the same clock, so no window or SDL timer is needed to run
+        self.clock = clock
+        self._last_frame_time_ms = clock()
         self._last_fire_spread_time_ms = 0
+        # Set while run_to_completion plays a mission, which returns the
+        # summary instead of writing it when the mission ends; its virtual
+        # clock as (simulation ticks, fire ticks) since start()
+        self._fast_forward = False
+        self._virtual_clock = (0, 0)
+        # id(movable) -> (movable, DStarLite) for routes repaired as fire spreads
+        self._replanners = {}
+        # Route searches spread over frames during the planning phase
+        self.planning_queue = PlanningQueue()
+        # Last Monte Carlo fire forecast and the (grid, version, fire_version) it was made at
+        self.fire_ensemble: Optional[FireEnsemble] = None
+        self._fire_ensemble_stamp = None
 
         self.requested_action: Optional[str] = None
         self.back_target = "launcher"
@@ -60,22 +140,26 @@ class SimulationManager:
             self.load_map(map_data)
 
     def _build_random_world(self):
+        self.planning_queue.clear()
         self.movables = []
-        self.grid = Grid()
+        self.grid = Grid(self.width, self.height)
+        self.view = Viewport(self.width, self.height)
         self.start_zone = Zone("Start", x=1, y=1, width=4, height=4, color=(40, 80, 120))
-        self.dest_zone = Zone("Objective", x=24, y=24, width=4, height=4, color=(80, 120, 40))
+        self.dest_zone = Zone(
+            "Objective", x=self.width - 6, y=self.height - 6, width=4, height=4, color=(80, 120, 40)
+        )
 
         self._spawn_movables()
 
         entity_positions = [(m.x_pos, m.y_pos) for m in self.movables]
         generate_walls(self.grid, self.start_zone, self.dest_zone, entity_positions)
-        self.grid.rand_gen_water()
-        self.grid.rand_gen_barriers()
-        self.grid.rand_gen_forest()
+        self.grid.rand_gen_water(body_count=scaled_feature_count(3, self.width, self.height))
+        self.grid.rand_gen_barriers(count=scaled_feature_count(15, self.width, self.height))
+        self.grid.rand_gen_forest(patch_count=scaled_feature_count(4, self.width, self.height))
 
         self.objective_cells = self._build_objective_cells()
         for cell in self.dest_zone.all_cells():
-            self.grid.entities.pop(cell, None)
+            self.grid.remove_entity(*cell)
 
         self._assign_objectives_and_metrics(randomize_metrics=False)
         self.grid.objective_cells = set(self.dest_zone.all_cells())
@@ -87,10 +171,14 @@ class SimulationManager:
         )
         self.initial_fire_positions = list(self.grid.fire_tiles)
         self.source_map_data = self.export_map_data(name="randomized")
+        # ALT landmarks for the planners; config.LANDMARK_COUNT = 0 skips this
+        landmarks_for(self.grid)
 
     def load_map(self, map_data: MapData):
         world = build_runtime_world(map_data)
+        self.planning_queue.clear()
         self.grid = world.grid
+        self.view = Viewport(self.grid.width, self.grid.height)
         self.movables = world.movables
         self.start_zone = world.start_zone
         self.dest_zone = world.dest_zone
@@ -100,20 +188,11 @@ class SimulationManager:
         self._assign_objectives_and_metrics(randomize_metrics=False)
 
     def export_map_data(self, name: Optional[str] = None) -> MapData:
-        walls = []
-        water = []
-        forest = []
-        barriers = []
-        for (x, y), entity in self.grid.entities.items():
-            cls_name = entity.__class__.__name__
-            if cls_name == "Wall":
-                walls.append((x, y))
-            elif cls_name == "Water":
-                water.append((x, y))
-            elif cls_name == "Forest":
-                forest.append((x, y))
-            elif cls_name == "Barrier":
-                barriers.append((x, y))
+        layers = self.grid.layers
+        walls = layers.cells(WALL)
+        water = layers.cells(WATER)
+        forest = layers.cells(FOREST)
+        barriers = layers.cells(BARRIER)
 
         movables = [MovableSpawnData(m.start_x, m.start_y, m.color) for m in self.movables]
         start_zone = ZoneData(
@@ -134,6 +213,8 @@ class SimulationManager:
         )
         return MapData(
             name=name or (self.source_map_data.name if self.source_map_data else "map"),
+            width=self.grid.width,
+            height=self.grid.height,
             walls=walls,
             water=water,
             forest=forest,
@@ -143,6 +224,7 @@ class SimulationManager:
             start_zone=start_zone,
             dest_zone=dest_zone,
             objective_cells=list(self.objective_cells),
+            metadata=self.grid.fire_model.to_metadata(),
         )
 
     def _spawn_movables(self, count: int = 2):
@@ -157,9 +239,8 @@ class SimulationManager:
                     continue
                 if self.grid.is_blocked(sx, sy):
                     continue
-                if self.grid.is_fire(sx, sy):
-                    continue
-                if self.grid.is_adjacent_to_fire(sx, sy):
+                if self.grid.fire_distance(sx, sy) <= 1:
+                    # On fire or next to it
                     continue
 
                 break
@@ -195,21 +276,28 @@ class SimulationManager:
         return open_cells[: len(self.movables)]
 
     def _assign_objectives_and_metrics(self, randomize_metrics: bool):
-        available = list(self.objective_cells)
-        random.shuffle(available)
-
         for movable in self.movables:
             if randomize_metrics or not hasattr(movable, "metrics") or movable.metrics is None:
                 movable.metrics = random_entity_metrics()
 
+        # Objective cells go to whoever reaches them cheapest, as a team:
+        # minimum total fuel over every movable's route
+        objectives = assign_objectives(
+            cost_map_for(self.grid),
+            [(m.x_pos, m.y_pos) for m in self.movables],
+            list(self.objective_cells),
+            [m.metrics.get_speed_tier().fuel_per_step for m in self.movables],
+        )
+
+        for movable, objective in zip(self.movables, objectives):
             movable.metrics.destination_zone = self.dest_zone
-            movable.metrics.objective_cell = available.pop() if available else None
+            movable.metrics.objective_cell = objective
             movable.metrics.reached_destination = False
             movable.metrics.detected_entities.clear()
             movable.metrics.ran_out_of_fuel = False
 
     def restore_initial_fire(self):
-        self.grid.fire_tiles.clear()
+        self.grid.clear_fire()
         for x, y in self.initial_fire_positions:
             self.grid.add_fire(x, y)
 
@@ -221,7 +309,7 @@ class SimulationManager:
         self._last_fire_spread_time_ms = 0
 
         # Clear everything
-        self.grid = Grid()
+        self.grid = Grid(self.width, self.height)
         self.movables.clear()
         self.objective_cells.clear()
         self.initial_fire_positions.clear()
@@ -255,13 +343,18 @@ class SimulationManager:
         self.paused = False
         self.stats.reset()
         self._simulation_accumulator_ms = 0.0
-        now = pygame.time.get_ticks()
+        now = self.clock()
         self._last_frame_time_ms = now
         self._last_fire_spread_time_ms = now
+        self._virtual_clock = (0, 0)
 
+        # Unfinished searches stop here; movables keep the best route so far
+        self.planning_queue.clear()
         self.restore_initial_fire()
         for movable in self.movables:
             movable.start_movement()
+            self.stats.track(movable)
+        self._build_replanners()
 
     def stop(self):
         self.running = False
@@ -280,6 +373,9 @@ class SimulationManager:
         delta_ms = now_ms - self._last_frame_time_ms
         self._last_frame_time_ms = now_ms
 
+        if self.phase == PHASE_PLANNING and self.planning_queue:
+            self.planning_queue.step(PLANNING_FRAME_BUDGET_MS)
+
         if self.phase != PHASE_MOVING or self.paused:
             return
 
@@ -290,34 +386,161 @@ class SimulationManager:
             self._simulation_accumulator_ms -= self.timing.simulation_step_ms
 
         if now_ms - self._last_fire_spread_time_ms >= self.timing.fire_tick_ms:
-            self.grid.spread_fire()
+            self._spread_fire()
             self._last_fire_spread_time_ms = now_ms
 
+    def run_to_completion(self, max_ticks: int = RUN_MAX_TICKS, write_results: bool = False) -> dict:
+        """
+        Plays the mission as fast as the CPU allows and returns its summary
+        (sim_export.build_sim_summary). From the planning phase, routes
+        still being planned are finished first and the mission starts. It
+        then runs until it ends or for max_ticks more simulation ticks;
+        calling it again carries on. Movables still on their way when
+        max_ticks runs out get the stop reason "max_ticks_reached".
+
+        Time is virtual: simulation ticks fall every timing.simulation_step_ms
+        and fire ticks every timing.fire_tick_ms, so the fire spreads as often
+        per simulation tick as it would on screen. A fire tick due at the
+        same moment as a simulation tick runs after it, as in update().
+
+        The summary gains a "fast_forward" entry: the ticks played, the
+        simulated and wall-clock time, and the throughput in ticks per
+        second. write_results also writes it to sim_results/ like a
+        finished on-screen mission.
+        """
+        if self.phase == PHASE_PLANNING:
+            while self.planning_queue:
+                self.planning_queue.step(PLANNING_FRAME_BUDGET_MS)
+            self.start()
+        started = time.perf_counter()
+
+        # Tick k falls at k * 1000 / fps ms and fire tick j at j * fire_tick_ms;
+        # comparing j * fire_tick_ms * fps with k * 1000 keeps it exact
+        fps = self.timing.simulation_tick_fps
+        fire_ms = self.timing.fire_tick_ms
+        first_tick, first_fire_tick = self._virtual_clock
+        tick, fire_tick = self._virtual_clock
+        self._fast_forward = True
+        try:
+            while self.phase == PHASE_MOVING and tick - first_tick < max_ticks:
+                tick += 1
+                self._step_simulation()
+                if self.phase != PHASE_MOVING:
+                    break
+                while (fire_tick + 1) * fire_ms * fps < (tick + 1) * 1000:
+                    fire_tick += 1
+                    self._spread_fire()
+        finally:
+            self._fast_forward = False
+            self._virtual_clock = (tick, fire_tick)
+        ticks = tick - first_tick
+        fire_ticks = fire_tick - first_fire_tick
+
+        completed = self.phase == PHASE_FINISHED
+        if not completed:
+            self.stats.finalize()
+        seconds = time.perf_counter() - started
+        payload = build_sim_summary(self)
+        payload["fast_forward"] = {
+            "completed": completed,
+            "ticks": ticks,
+            "fire_ticks": fire_ticks,
+            "simulated_seconds": round(ticks / fps, 3),
+            "wall_seconds": round(seconds, 6),
+            "ticks_per_second": round(ticks / seconds, 1) if seconds > 0 else None,
+        }
+        if write_results:
+            self._last_export_path = write_sim_results(payload)
+        return payload
+
+    def _spread_fire(self):
+        new_fire_tiles = self.grid.spread_fire()
+        if self._replanners:
+            self._repair_routes(new_fire_tiles)
+
+    def _build_replanners(self):
+        self._replanners = {}
+        cost_map = cost_map_for(self.grid)
+        for movable in self.movables:
+            metrics = getattr(movable, "metrics", None)
+            if not movable.replan_on_fire or metrics is None or metrics.objective_cell is None:
+                continue
+            if not movable.planned_cells:
+                # Nothing to repair; the movable stays where it is
+                continue
+            planner = replanner_for(
+                cost_map,
+                self.grid.fire_tiles,
+                (movable.x_pos, movable.y_pos),
+                metrics.objective_cell,
+                metrics.get_speed_tier().fuel_per_step,
+            )
+            self._replanners[id(movable)] = (movable, planner)
+
+    def _repair_routes(self, new_fire_tiles):
+        # Only the cells around newly ignited tiles changed cost, so each
+        # D* Lite search repairs its tree instead of starting from scratch.
+        # A route is only swapped out when the fire reaches one of the
+        # cells it still has to walk through.
+        if not new_fire_tiles:
+            return
+        cost_map = cost_map_for(self.grid)
+        for movable, planner in self._replanners.values():
+            if movable.destroyed or movable.is_done():
+                continue
+            fuel_per_step = movable.metrics.get_speed_tier().fuel_per_step
+            changes = fire_cost_changes(cost_map, self.grid.fire_tiles, new_fire_tiles, fuel_per_step)
+            planner.move_start((movable.x_pos, movable.y_pos))
+            planner.update_costs(changes)
+            if changes.keys().isdisjoint(movable.remaining_cells()):
+                continue
+            path = planner.path()
+            if path is not None:
+                movable.replace_remaining_path(path[1:])
+
     def _step_simulation(self):
         for movable in self.movables:
             has_metrics = hasattr(movable, "metrics") and movable.metrics is not None
 
-            if has_metrics and not movable.metrics.has_fuel_for_step():
+            if movable.is_done():
+                # Finished or destroyed entities stay put; standing still
+                # after the route ends is not a blocked move
+                continue
+
+            if movable.next_step_is_wait():
+                # Holding position for another entity costs a tick, not fuel
+                movable.advance_one_step(self.grid)
+                self.stats.record_wait(movable)
+                continue
+
+            # Fuel is charged for the terrain being stepped into
+            next_cell = movable.next_planned_cell()
+            terrain_modifier = self.grid.get_terrain_modifier(*next_cell) if next_cell else 1.0
+
+            if has_metrics and not movable.metrics.has_fuel_for_step(terrain_modifier):
                 if not movable.metrics.ran_out_of_fuel:
                     movable.metrics.ran_out_of_fuel = True
                 self.stats.record_step(movable, False)
-                movable.apply_fire_damage(self.grid)
                 continue
 
             moved = movable.advance_one_step(self.grid)
-            movable.apply_fire_damage(self.grid)
             self.stats.record_step(movable, moved)
 
             if moved and has_metrics:
-                movable.metrics.burn_fuel_for_step()
+                movable.metrics.burn_fuel_for_step(terrain_modifier)
                 movable.metrics.check_in_zone(movable.x_pos, movable.y_pos)
                 self._update_proximity(movable)
 
+        # Fire damage depends only on where each movable ends the tick, so
+        # every movable takes it in one pass once all have moved
+        apply_fire_damage_all(self.movables, self.grid)
+
         if all(self._entity_finished(m) for m in self.movables):
             self.stats.finalize()
             self.phase = PHASE_FINISHED
             self.paused = True
-            self._last_export_path = export_sim_results(self)
+            if not self._fast_forward:
+                self._last_export_path = export_sim_results(self)
 
     def _update_proximity(self, movable: Movable):
         for other in self.movables:
@@ -336,35 +559,276 @@ class SimulationManager:
 
     def handle_click(self, mouse_pos):
         for movable in self.movables:
-            movable.handle_click(mouse_pos)
+            movable.handle_click(mouse_pos, self.view)
+
+    def pan_view(self, dx: int, dy: int):
+        """Scrolls the play area by (dx, dy) cells on maps too large to show whole."""
+        self.view.pan(dx, dy)
 
     def handle_panel_click(self, mouse_pos) -> bool:
-        if pygame.Rect(BACK_BUTTON_RECT).collidepoint(mouse_pos):
+        x, y, width, height = BACK_BUTTON_RECT
+        if x <= mouse_pos[0] < x + width and y <= mouse_pos[1] < y + height:
             self.request_back_to(getattr(self, "back_target", "launcher"))
             return True
         return False
 
     def undo_selected_plan_step(self):
         for movable in self.selected_movables():
+            # A manual edit wins over a route still being computed
+            self.planning_queue.cancel(id(movable))
             movable.undo_last_step()
 
     def clear_selected_plan(self):
         for movable in self.selected_movables():
+            self.planning_queue.cancel(id(movable))
             movable.clear_plan()
 
     def plan_selected_step(self, dx: int, dy: int):
         for movable in self.selected_movables():
+            self.planning_queue.cancel(id(movable))
             movable.plan_step(dx, dy, self.grid)
 
+    def auto_plan(self, movables: Optional[List[Movable]] = None) -> int:
+        """
+        Fills planned_cells for the given movables (default: the selected
+        ones, or all of them if none is selected) with a fire-aware route
+        to each one's objective cell. Like request_routes, applying a route
+        opts the movable in to replan_on_fire, so once the mission starts
+        the route is repaired whenever the fire reaches a cell still ahead
+        on it; plan_all_cooperative, plan_team_optimal, plan_fire_safe and
+        plan_within_fuel opt it back out.
+
+        Routes come from per-objective flow fields built in batches of
+        AUTO_PLAN_BATCH_CELLS map cells. Each batch's wavefront is built a
+        chunk per planning-queue step, so a large team or a large map
+        streams in over several frames instead of stalling one. A route
+        that needs more fuel than the movable has is swapped for the
+        safest one that fits (fuel_routing), searched a chunk at a time
+        too. Arrow keys keep editing on top of the result. Returns how
+        many movables were queued.
+        """
+        if movables is None:
+            movables = self.selected_movables() or self.movables
+        team = [m for m in movables if getattr(m, "metrics", None) and m.metrics.objective_cell]
+        per_batch = max(1, AUTO_PLAN_BATCH_CELLS // (self.grid.width * self.grid.height))
+        for first in range(0, len(team), per_batch):
+            batch = team[first:first + per_batch]
+            objectives = [m.metrics.objective_cell for m in batch]
+            # Every movable of the batch waits on one shared field build
+            fields = _SharedSteps(flow_fields_to_cells_steps(self.grid, objectives))
+            for movable in batch:
+                steps = self._field_route_steps(movable, fields, objectives.index(movable.metrics.objective_cell))
+                self.planning_queue.submit(id(movable), steps, self._route_applier(movable))
+        return len(team)
+
+    def _field_route_steps(self, movable: Movable, fields: _SharedSteps, index: int):
+        while not fields.done:
+            fields.advance()
+            yield PlanResult(None)
+        field = fields.value[index]
+        start = (movable.x_pos, movable.y_pos)
+        path = field.path_from(start)
+        cost = field.distance_at(*start) if path is not None else BLOCKED
+        if path is not None and path_fuel_cost(movable.metrics, cost_map_for(self.grid), path[1:]) > movable.metrics.fuel:
+            # Too thirsty: take the safest route the tank can cover instead.
+            # If there is none, the field route still gets it closest.
+            route = yield from _pending(route_within_fuel_steps(
+                cost_map_for(self.grid),
+                movable.metrics,
+                start,
+                movable.metrics.objective_cell,
+                MINIMISE_RISK,
+                self.grid.fire_tiles,
+            ))
+            if route.found:
+                path, cost = route.path, route.cost
+        yield PlanResult(path, cost, 1.0 if path is not None else BLOCKED, complete=True)
+
+    def forecast_fire_risk(
+        self, runs: int = FIRE_RISK_RUNS, ticks: int = FIRE_RISK_TICKS, seed: Optional[int] = None
+    ) -> FireEnsemble:
+        """
+        Runs a Monte Carlo fire forecast from the current fire. The renderer
+        shows it and plan_fire_safe routes with it until the map or the fire
+        changes.
+        """
+        self.fire_ensemble = forecast_fire(self.grid, runs, ticks, seed)
+        self._fire_ensemble_stamp = (self.grid, self.grid.version, self.grid.fire_version)
+        return self.fire_ensemble
+
+    def current_fire_risk(self) -> Optional[FireEnsemble]:
+        """The last fire forecast, or None if there is none for the current map and fire."""
+        if self._fire_ensemble_stamp != (self.grid, self.grid.version, self.grid.fire_version):
+            return None
+        return self.fire_ensemble
+
+    def plan_fire_safe(self, movables: Optional[List[Movable]] = None) -> int:
+        """
+        Plans each movable (all by default) around the fire as it is
+        forecast to be when the movable gets to each cell, so one route
+        holds up as the fire spreads. Uses the Monte Carlo forecast when
+        there is a current one: a cell counts as burning from the tick at
+        which FIRE_RISK_CONFIDENCE of the rollouts have it burning.
+        Movables with no safe route keep their plan. Returns how many were
+        routed.
+        """
+        cost_map = cost_map_for(self.grid)
+        steps_per_fire_tick = self.timing.fire_tick_ms / self.timing.simulation_step_ms
+        ensemble = self.current_fire_risk()
+        if ensemble is not None:
+            ignite_step = arrival_steps(ensemble.arrival_ticks(FIRE_RISK_CONFIDENCE), steps_per_fire_tick, safety=1.0)
+        else:
+            ignite_step = arrival_steps(fire_arrival_ticks(self.grid), steps_per_fire_tick)
+        routed = 0
+        for movable in self.movables if movables is None else movables:
+            metrics = getattr(movable, "metrics", None)
+            if metrics is None or metrics.objective_cell is None:
+                continue
+            self.planning_queue.cancel(id(movable))
+            result = plan_fire_safe(
+                cost_map,
+                ignite_step,
+                (movable.x_pos, movable.y_pos),
+                metrics.objective_cell,
+                metrics.get_speed_tier().fuel_per_step,
+            )
+            if result.found:
+                movable.set_planned_path(result.path[1:])
+                # The route already plans around the fire to come
+                movable.replan_on_fire = False
+                routed += 1
+        return routed
+
+    def plan_within_fuel(self, movables: Optional[List[Movable]] = None, minimise: str = MINIMISE_STEPS) -> int:
+        """
+        Plans each movable (all by default) on the fastest (MINIMISE_STEPS)
+        or safest (MINIMISE_RISK) route its current fuel can cover. Movables
+        with no such route keep their plan. Returns how many were routed.
+        """
+        cost_map = cost_map_for(self.grid)
+        routed = 0
+        for movable in self.movables if movables is None else movables:
+            metrics = getattr(movable, "metrics", None)
+            if metrics is None or metrics.objective_cell is None:
+                continue
+            self.planning_queue.cancel(id(movable))
+            route = route_within_fuel(
+                cost_map,
+                metrics,
+                (movable.x_pos, movable.y_pos),
+                metrics.objective_cell,
+                minimise,
+                self.grid.fire_tiles,
+            )
+            if route.found:
+                movable.set_planned_path(route.path[1:])
+                # A repair could need more fuel than the movable has
+                movable.replan_on_fire = False
+                routed += 1
+        return routed
+
+    def plan_all_cooperative(self, window: int = 16):
+        """
+        Plans every movable with an objective together so the routes never
+        collide at execution time. The routes are not repaired as fire
+        spreads. Returns the CooperativePlan.
+        """
+        team = [m for m in self.movables if getattr(m, "metrics", None) and m.metrics.objective_cell]
+        agents = [((m.x_pos, m.y_pos), m.metrics.objective_cell) for m in team]
+        scales = [m.metrics.get_speed_tier().fuel_per_step for m in team]
+        plan = plan_cooperative(cost_map_for(self.grid), agents, scales, window=window)
+        for index, movable in enumerate(team):
+            movable.set_planned_path(plan.planned_cells(index))
+            # Repairing one route on its own would break the timing the
+            # others rely on
+            movable.replan_on_fire = False
+        return plan
+
+    def plan_all_flow_field(self) -> int:
+        """
+        Routes every movable with an objective along one shared flow field
+        to the objective cells, finishing with a short hop to its own cell.
+        Returns how many movables got a route.
+        """
+        field = flow_field_for(self.grid, self.objective_cells)
+        routed = 0
+        for movable in self.movables:
+            metrics = getattr(movable, "metrics", None)
+            if metrics is None or metrics.objective_cell is None:
+                continue
+            path = field.path_to((movable.x_pos, movable.y_pos), metrics.objective_cell)
+            if path is None:
+                continue
+            movable.set_planned_path(path[1:])
+            routed += 1
+        return routed
+
+    def request_routes(self, movables: Optional[List[Movable]] = None, mode: str = MODE_ANYTIME) -> int:
+        """
+        Queues a route search to its objective for each movable (all of
+        them by default). The searches run a few milliseconds per frame in
+        update(); every improved route replaces the movable's plan as soon
+        as it is found and opts the movable in to replan_on_fire. Returns
+        how many searches were queued.
+        """
+        cost_map = cost_map_for(self.grid)
+        landmarks = landmarks_for(self.grid)
+        queued = 0
+        for movable in self.movables if movables is None else movables:
+            metrics = getattr(movable, "metrics", None)
+            if metrics is None or metrics.objective_cell is None:
+                continue
+            steps = route_steps(
+                cost_map,
+                (movable.x_pos, movable.y_pos),
+                metrics.objective_cell,
+                metrics,
+                mode,
+                landmarks=landmarks,
+            )
+            self.planning_queue.submit(id(movable), steps, self._route_applier(movable))
+            queued += 1
+        return queued
+
+    @staticmethod
+    def _route_applier(movable: Movable):
+        def apply(result):
+            if result.path is not None:
+                movable.set_planned_path(result.path[1:])
+                # A single-agent route can be repaired on its own as fire spreads
+                movable.replan_on_fire = True
+        return apply
+
+    def plan_team_optimal(self, time_budget_ms: float = 50.0, max_team: int = 10):
+        """
+        Plans a small team with CBS for minimum total fuel. Larger teams
+        fall back to plan_all_cooperative. The routes are not repaired as
+        fire spreads. Returns the CBSResult (or the CooperativePlan when
+        falling back).
+        """
+        team = [m for m in self.movables if getattr(m, "metrics", None) and m.metrics.objective_cell]
+        if len(team) > max_team:
+            return self.plan_all_cooperative()
+        agents = [((m.x_pos, m.y_pos), m.metrics.objective_cell) for m in team]
+        scales = [m.metrics.get_speed_tier().fuel_per_step for m in team]
+        result = solve_cbs(cost_map_for(self.grid), agents, scales, time_budget_ms=time_budget_ms)
+        if result.paths is not None:
+            for index, movable in enumerate(team):
+                movable.set_planned_path(result.planned_cells(index))
+                # Like cooperative plans, the routes only work together
+                movable.replan_on_fire = False
+        return result
+
     def _randomize_zones(self, zone_size=4, max_attempts=200):
-        min_distance = (GRID_WIDTH + GRID_HEIGHT) // 2
+        width, height = self.width, self.height
+        min_distance = (width + height) // 2
 
         for _ in range(max_attempts):
-            sx = random.randint(0, GRID_WIDTH - zone_size)
-            sy = random.randint(0, GRID_HEIGHT - zone_size)
+            sx = random.randint(0, width - zone_size)
+            sy = random.randint(0, height - zone_size)
 
-            dx = random.randint(0, GRID_WIDTH - zone_size)
-            dy = random.randint(0, GRID_HEIGHT - zone_size)
+            dx = random.randint(0, width - zone_size)
+            dy = random.randint(0, height - zone_size)
 
             start_center = (sx + zone_size // 2, sy + zone_size // 2)
             dest_center = (dx + zone_size // 2, dy + zone_size // 2)
@@ -0,0 +1,107 @@
+"""
+grid_sim/smoothing.py
+
+Any-angle smoothing of grid paths for continuous-space movement.
+
+A 4-connected grid path has one waypoint per cell, and a follower that
+walks it in pixel space zig-zags along the staircase. smooth_path keeps
+only the corners that matter: from each anchor it walks along the path
+while the straight segment from the anchor still has line of sight, and
+drops a new waypoint just before it loses it (the post-processing form
+of Theta*). An open stretch of any length collapses to one segment.
+
+Line of sight uses the supercover of the segment between cell centres:
+every cell the segment touches, including both cells on either side of
+an exact corner crossing, so a smoothed route never clips a wall corner.
+The cells are computed for the whole segment at once in NumPy, from the
+points where it crosses the vertical and the horizontal grid lines, in
+exact integer arithmetic.
+
+Only blocking matters here (Grid.is_blocked); terrain multipliers are
+ignored, so a segment may shave a corner off a water or forest patch the
+grid path skirted.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .astar import Point
+from .wavefront import passability_from_grid
+
+
+def blocked_mask(grid) -> np.ndarray:
+    """(height, width) bool array of cells that block movement on grid."""
+    return ~passability_from_grid(grid)
+
+
+def supercover(a: Point, b: Point) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (xs, ys) of every cell touched by the segment from the centre of cell
+    a to the centre of cell b. May contain duplicates and, at corners on
+    the map edge, cells just outside it.
+    """
+    x0, y0 = a
+    x1, y1 = b
+    dx = x1 - x0
+    dy = y1 - y0
+    xs = [np.array([x0, x1])]
+    ys = [np.array([y0, y1])]
+
+    if dx:
+        # Vertical grid lines x = X crossed on the way, and the row the
+        # segment is in there: y = num / den exactly
+        lines = np.arange(min(x0, x1) + 1, max(x0, x1) + 1)
+        num = (2 * y0 + 1) * dx + (2 * (lines - x0) - 1) * dy
+        den = 2 * dx
+        if den < 0:
+            num, den = -num, -den
+        rows = num // den
+        corner = num % den == 0
+        xs += [lines - 1, lines, (lines - 1)[corner], lines[corner]]
+        ys += [rows, rows, rows[corner] - 1, rows[corner] - 1]
+
+    if dy:
+        lines = np.arange(min(y0, y1) + 1, max(y0, y1) + 1)
+        num = (2 * x0 + 1) * dy + (2 * (lines - y0) - 1) * dx
+        den = 2 * dy
+        if den < 0:
+            num, den = -num, -den
+        cols = num // den
+        corner = num % den == 0
+        xs += [cols, cols, cols[corner] - 1, cols[corner] - 1]
+        ys += [lines - 1, lines, (lines - 1)[corner], lines[corner]]
+
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+def line_of_sight(blocked: np.ndarray, a: Point, b: Point) -> bool:
+    """True if the segment between the centres of a and b touches no blocked cell."""
+    height, width = blocked.shape
+    xs, ys = supercover(a, b)
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return not blocked[ys[inside], xs[inside]].any()
+
+
+def smooth_path(blocked: np.ndarray, path: Sequence[Point]) -> List[Point]:
+    """
+    The waypoints (cells, start and end included) of an any-angle route
+    that follows path with as few straight segments as line of sight
+    allows. Every segment runs through unblocked cells only.
+    """
+    if len(path) <= 2:
+        return list(path)
+    waypoints = [path[0]]
+    anchor = path[0]
+    for index in range(2, len(path)):
+        if not line_of_sight(blocked, anchor, path[index]):
+            anchor = path[index - 1]
+            waypoints.append(anchor)
+    waypoints.append(path[-1])
+    return waypoints
+
+
+def waypoints_to_pixels(waypoints: Sequence[Point], cell_size: int) -> List[Tuple[float, float]]:
+    """Cell waypoints as the pixel centres of those cells."""
+    half = cell_size / 2.0
+    return [(x * cell_size + half, y * cell_size + half) for x, y in waypoints]
@@ -1,4 +1,3 @@
-import pygame
 import math
 from .config import WINDOW_WIDTH, WINDOW_HEIGHT, CELL_SIZE
 
@@ -32,10 +31,15 @@ class SimStats:
                 "start": (entity.start_x, entity.start_y),
                 "positions": [(entity.x_pos, entity.y_pos)],
                 "collisions": 0,
+                "waits": 0,
                 "finished": False,
             }
         return self._data[eid]
 
+    def track(self, entity):
+        """Call at the start of a run so entities that never move still get a summary."""
+        self._ensure(entity)
+
     def record_step(self, entity, moved: bool):
         """Call every time advance_one_step is called for an entity."""
         d = self._ensure(entity)
@@ -45,6 +49,11 @@ class SimStats:
         else:
             d["collisions"] += 1
 
+    def record_wait(self, entity):
+        """Call when an entity deliberately holds position for a tick."""
+        d = self._ensure(entity)
+        d["waits"] += 1
+
     def finalize(self):
         """Call once when all entities finish. Computes final metrics."""
         for d in self._data.values():
@@ -63,6 +72,8 @@ class SimStats:
 
     def draw(self, window, font, export_path: str = None):
         """Renders the summary screen overlay."""
+        import pygame
+
         if not self._data:
             return
 
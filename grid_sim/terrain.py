@@ -23,9 +23,8 @@ Future-facing notes:
 """
 
 import random
-import pygame
-from .config import CELL_SIZE, GRID_WIDTH, GRID_HEIGHT
 from .entities import Entity
+from .viewport import DEFAULT_VIEW
 
 
 # ──────────────────────────────────────────────
@@ -50,23 +49,24 @@ class Water(Entity):
     """
     COST_MULTIPLIER = WATER_COST_MULTIPLIER
 
-    def __init__(self, x_pos, y_pos):
-        blue = random.randint(140, 180)
-        green = random.randint(80, 120)
-        water_color = (30, green, blue)
-        super().__init__(water_color, x_pos, y_pos, blocking=False)
+    def __init__(self, x_pos, y_pos, color=None):
+        super().__init__(color or self.random_color(random), x_pos, y_pos, blocking=False)
         self.terrain_type = "water"
 
-    def draw(self, window):
-        rect = pygame.Rect(
-            self.x_pos * CELL_SIZE,
-            self.y_pos * CELL_SIZE,
-            CELL_SIZE,
-            CELL_SIZE,
-        )
+    @staticmethod
+    def random_color(rng):
+        blue = rng.randint(140, 180)
+        green = rng.randint(80, 120)
+        return (30, green, blue)
+
+    def draw(self, window, view=None):
+        import pygame
+
+        view = view or DEFAULT_VIEW
+        rect = view.rect(self.x_pos, self.y_pos)
         pygame.draw.rect(window, self.color, rect)
 
-        wave_y = rect.y + CELL_SIZE // 2
+        wave_y = rect.centery
         wave_color = (
             min(self.color[0] + 40, 255),
             min(self.color[1] + 30, 255),
@@ -74,8 +74,8 @@ class Water(Entity):
         )
         pygame.draw.line(
             window, wave_color,
-            (rect.x + 3, wave_y),
-            (rect.x + CELL_SIZE - 3, wave_y),
+            (rect.x + view.scale(3), wave_y),
+            (rect.right - view.scale(3), wave_y),
             1,
         )
 
@@ -93,18 +93,19 @@ class Barrier(Entity):
     """
     COST_MULTIPLIER = BARRIER_COST_MULTIPLIER
 
-    def __init__(self, x_pos, y_pos):
-        barrier_color = (140, 50, 50)
-        super().__init__(barrier_color, x_pos, y_pos, blocking=True)
+    def __init__(self, x_pos, y_pos, color=None):
+        super().__init__(color or self.random_color(random), x_pos, y_pos, blocking=True)
         self.terrain_type = "barrier"
 
-    def draw(self, window):
-        rect = pygame.Rect(
-            self.x_pos * CELL_SIZE,
-            self.y_pos * CELL_SIZE,
-            CELL_SIZE,
-            CELL_SIZE,
-        )
+    @staticmethod
+    def random_color(rng):
+        return (140, 50, 50)
+
+    def draw(self, window, view=None):
+        import pygame
+
+        view = view or DEFAULT_VIEW
+        rect = view.rect(self.x_pos, self.y_pos)
         pygame.draw.rect(window, self.color, rect)
 
         accent = (180, 70, 70)
@@ -127,20 +128,21 @@ class Forest(Entity):
     COST_MULTIPLIER = FOREST_COST_MULTIPLIER
     CONCEALMENT_FACTOR = 0.5
 
-    def __init__(self, x_pos, y_pos):
-        green = random.randint(60, 100)
-        red = random.randint(20, 45)
-        forest_color = (red, green, 20)
-        super().__init__(forest_color, x_pos, y_pos, blocking=False)
+    def __init__(self, x_pos, y_pos, color=None):
+        super().__init__(color or self.random_color(random), x_pos, y_pos, blocking=False)
         self.terrain_type = "forest"
 
-    def draw(self, window):
-        rect = pygame.Rect(
-            self.x_pos * CELL_SIZE,
-            self.y_pos * CELL_SIZE,
-            CELL_SIZE,
-            CELL_SIZE,
-        )
+    @staticmethod
+    def random_color(rng):
+        green = rng.randint(60, 100)
+        red = rng.randint(20, 45)
+        return (red, green, 20)
+
+    def draw(self, window, view=None):
+        import pygame
+
+        view = view or DEFAULT_VIEW
+        rect = view.rect(self.x_pos, self.y_pos)
         pygame.draw.rect(window, self.color, rect)
 
         cx = rect.centerx
@@ -150,7 +152,7 @@ class Forest(Entity):
             min(self.color[1] + 50, 255),
             min(self.color[2] + 10, 255),
         )
-        size = CELL_SIZE // 3
+        size = rect.width // 3
         points = [
             (cx, cy - size),
             (cx - size, cy + size),
@@ -174,7 +176,7 @@ def generate_water_body(grid, center_x, center_y, size=6, movables=None, min_ent
     while len(placed) < size and candidates:
         cx, cy = candidates.pop(random.randint(0, len(candidates) - 1))
 
-        if not (0 <= cx < GRID_WIDTH and 0 <= cy < GRID_HEIGHT):
+        if not (0 <= cx < grid.width and 0 <= cy < grid.height):
             continue
         if (cx, cy) in placed:
             continue
@@ -216,7 +218,7 @@ def generate_forest_cluster(grid, center_x, center_y, size=8, movables=None, min
         ox = center_x + random.randint(-2, 2)
         oy = center_y + random.randint(-2, 2)
 
-        if not (0 <= ox < GRID_WIDTH and 0 <= oy < GRID_HEIGHT):
+        if not (0 <= ox < grid.width and 0 <= oy < grid.height):
             continue
         if (ox, oy) in placed:
             continue
@@ -253,7 +255,7 @@ def generate_barrier_line(grid, start_x, start_y, direction, length):
         bx = start_x + dx * i
         by = start_y + dy * i
 
-        if not (0 <= bx < GRID_WIDTH and 0 <= by < GRID_HEIGHT):
+        if not (0 <= bx < grid.width and 0 <= by < grid.height):
             break
         if grid.is_blocked(bx, by):
             continue
@@ -0,0 +1,99 @@
+"""
+grid_sim/viewport.py
+
+Maps grid cells to pixels on the play area for maps of any size.
+
+The play area is a fixed WINDOW_WIDTH x WINDOW_HEIGHT pixels. A map that
+fits at CELL_SIZE pixels per cell (the 30 x 30 default) is drawn exactly
+as before. Larger maps are scaled down to fit, but never below
+MIN_CELL_SIZE pixels per cell; past that the viewport shows a window of
+the map that can be panned (mouse wheel, or arrow keys in the editor).
+
+Everything that draws in grid coordinates takes a Viewport and asks it
+for rects, so scaling and scrolling live in one place.
+"""
+
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .config import CELL_SIZE, GRID_HEIGHT, GRID_WIDTH, MIN_CELL_SIZE, WINDOW_HEIGHT, WINDOW_WIDTH
+
+if TYPE_CHECKING:
+    import pygame
+
+# Below this many pixels per cell, tiles are drawn as flat colours and the
+# grid lines are left out
+DETAIL_CELL_SIZE = 8
+
+
+class Viewport:
+    """The visible part of a grid_width x grid_height map and its scale."""
+
+    def __init__(
+        self,
+        grid_width: int,
+        grid_height: int,
+        pixel_width: int = WINDOW_WIDTH,
+        pixel_height: int = WINDOW_HEIGHT,
+    ):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.pixel_width = pixel_width
+        self.pixel_height = pixel_height
+        fit = min(pixel_width // max(grid_width, 1), pixel_height // max(grid_height, 1))
+        self.cell_size = max(MIN_CELL_SIZE, min(CELL_SIZE, fit))
+        # Cells that fit on screen, and the top-left visible cell
+        self.cols = min(grid_width, pixel_width // self.cell_size)
+        self.rows = min(grid_height, pixel_height // self.cell_size)
+        self.x = 0
+        self.y = 0
+
+    @property
+    def detailed(self) -> bool:
+        return self.cell_size >= DETAIL_CELL_SIZE
+
+    @property
+    def scrolls(self) -> bool:
+        return self.cols < self.grid_width or self.rows < self.grid_height
+
+    def visible_cells(self) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1): the visible cells are x0 <= x < x1, y0 <= y < y1."""
+        return self.x, self.y, self.x + self.cols, self.y + self.rows
+
+    def is_visible(self, x: int, y: int) -> bool:
+        return self.x <= x < self.x + self.cols and self.y <= y < self.y + self.rows
+
+    def rect(self, x: int, y: int, width: int = 1, height: int = 1) -> "pygame.Rect":
+        """Pixel rect of the width x height cells whose top-left cell is (x, y)."""
+        import pygame
+
+        size = self.cell_size
+        return pygame.Rect((x - self.x) * size, (y - self.y) * size, width * size, height * size)
+
+    def center(self, x: int, y: int) -> Tuple[int, int]:
+        """Pixel centre of cell (x, y)."""
+        size = self.cell_size
+        return (x - self.x) * size + size // 2, (y - self.y) * size + size // 2
+
+    def scale(self, pixels: int) -> int:
+        """A length given in pixels at CELL_SIZE, at this viewport's scale."""
+        return pixels * self.cell_size // CELL_SIZE
+
+    def to_cell(self, pixel_x: int, pixel_y: int) -> Optional[Tuple[int, int]]:
+        """The cell under a play-area pixel, or None outside the map."""
+        if not (0 <= pixel_x < self.cols * self.cell_size and 0 <= pixel_y < self.rows * self.cell_size):
+            return None
+        return self.x + pixel_x // self.cell_size, self.y + pixel_y // self.cell_size
+
+    def pan(self, dx: int, dy: int):
+        """Scrolls by (dx, dy) cells, clamped to the map."""
+        self.x = min(max(self.x + dx, 0), self.grid_width - self.cols)
+        self.y = min(max(self.y + dy, 0), self.grid_height - self.rows)
+
+    def center_on(self, x: int, y: int):
+        self.x = 0
+        self.y = 0
+        self.pan(x - self.cols // 2, y - self.rows // 2)
+
+
+# For drawing code called without a viewport: the default map at CELL_SIZE
+DEFAULT_VIEW = Viewport(GRID_WIDTH, GRID_HEIGHT)
@@ -0,0 +1,281 @@
+"""
+grid_sim/wavefront.py
+
+Vectorized unit-cost wavefronts over a boolean passability array.
+
+Everything here works on an (height, width) numpy bool array, True for
+cells that can be entered, and processes whole frontiers per numpy call
+instead of one cell at a time:
+
+    bfs_distances     - multi-source 4-connected step distances
+    reachable_mask    - cells reachable from any source
+    label_components  - connected-component label of every passable cell
+    cost_to_go_many   - weighted cost from every cell to each of many
+                        targets, all targets in one batch
+    cost_to_go_steps  - the same as a generator that pauses every
+                        WAVEFRONT_CHUNK relaxations (see drain)
+    array_steps,      - list <-> array conversions that pause every
+    list_steps          CONVERT_CHUNK cells, for callers that keep flat
+                        lists around the wavefront
+
+The BFS keeps its frontier as flat indices into a copy of the array padded
+with a one-cell blocked border, so the four neighbour shifts (+-1, +-width)
+never wrap or fall off the map and need no bounds checks. Each step costs
+O(frontier), not O(map), which is what keeps a 1000x1000 grid fast.
+
+cost_to_go_many is the weighted counterpart: a label-correcting
+(Bellman-Ford style) wavefront whose frontier is the set of cells that
+improved in the last round. It does more relaxations than Dijkstra, but
+every round covers all targets in one set of numpy calls, which beats one
+heap-based Python Dijkstra per target several times over.
+
+Component labelling uses parallel union-find (hook every edge to the
+smaller root, then pointer-jump to the roots), which converges in a
+handful of rounds regardless of component shape.
+"""
+
+from typing import Generator, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .astar import BLOCKED, Point
+from .cost_model import cost_map_for
+
+UNREACHED = -1
+
+# Neighbour relaxations between pauses of cost_to_go_steps, about a
+# millisecond of NumPy work; every round counts as at least ROUND_WORK of
+# them for its fixed per-call overhead
+WAVEFRONT_CHUNK = 50_000
+ROUND_WORK = 2_000
+
+# Cells converted between a list and an array per pause, a few milliseconds
+CONVERT_CHUNK = 250_000
+
+
+def drain(steps: Generator):
+    """Runs a pausing generator (cost_to_go_steps, ...) to the end and returns its value."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def passability_from_grid(grid) -> np.ndarray:
+    """(height, width) bool array of cells a movable can enter on grid."""
+    cost_map = cost_map_for(grid)
+    modifiers = np.asarray(cost_map.modifiers, dtype=float)
+    return (modifiers != BLOCKED).reshape(cost_map.height, cost_map.width)
+
+
+def passability_from_cells(width: int, height: int, blocked: Iterable[Point]) -> np.ndarray:
+    """(height, width) bool array that is True everywhere except blocked (x, y) cells."""
+    passable = np.ones((height, width), dtype=bool)
+    cells = np.array(list(blocked), dtype=np.int64).reshape(-1, 2)
+    if len(cells):
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < height)
+        cells = cells[inside]
+        passable[cells[:, 1], cells[:, 0]] = False
+    return passable
+
+
+def bfs_distances(
+    passable: np.ndarray,
+    sources: Iterable[Point],
+    max_distance: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Step distance from the nearest source to every cell, as an int32
+    (height, width) array with UNREACHED (-1) for cells that cannot be
+    reached (or lie beyond max_distance). Sources are always distance 0,
+    even if they are not passable themselves (a fire tile, an entity).
+    """
+    height, width = passable.shape
+    padded_width = width + 2
+    # One blocked cell of padding on every side removes all bounds checks
+    open_cells = np.zeros((height + 2, padded_width), dtype=bool)
+    open_cells[1:-1, 1:-1] = passable
+    open_cells = open_cells.ravel()
+    dist = np.full(open_cells.shape, UNREACHED, dtype=np.int32)
+
+    frontier = _padded_indices(sources, width, height)
+    if frontier.size == 0:
+        return dist.reshape(height + 2, padded_width)[1:-1, 1:-1].copy()
+    frontier = np.unique(frontier)
+    dist[frontier] = 0
+    open_cells[frontier] = False
+
+    offsets = np.array([1, -1, padded_width, -padded_width], dtype=np.int64)
+    # Scratch array for de-duplicating a frontier without sorting it
+    marker = np.zeros(open_cells.shape, dtype=np.int64)
+    step = 0
+    while frontier.size and (max_distance is None or step < max_distance):
+        step += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[open_cells[candidates]]
+        if candidates.size == 0:
+            break
+        # Keep one copy of each cell: the last write to marker wins
+        order = np.arange(candidates.size)
+        marker[candidates] = order
+        frontier = candidates[marker[candidates] == order]
+        open_cells[frontier] = False
+        dist[frontier] = step
+
+    return dist.reshape(height + 2, padded_width)[1:-1, 1:-1].copy()
+
+
+def reachable_mask(passable: np.ndarray, sources: Iterable[Point]) -> np.ndarray:
+    """(height, width) bool array of cells reachable from any source."""
+    return bfs_distances(passable, sources) != UNREACHED
+
+
+def label_components(passable: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Labels the 4-connected components of passable.
+
+    Returns (labels, count): labels is an int32 (height, width) array with
+    0 .. count - 1 on passable cells and UNREACHED on blocked ones.
+    """
+    height, width = passable.shape
+    size = height * width
+    index = np.arange(size, dtype=np.int64).reshape(height, width)
+
+    # Every edge between two horizontally or vertically adjacent open cells
+    across = passable[:, :-1] & passable[:, 1:]
+    down = passable[:-1, :] & passable[1:, :]
+    u = np.concatenate([index[:, :-1][across], index[:-1, :][down]])
+    v = np.concatenate([index[:, 1:][across], index[1:, :][down]])
+
+    parent = np.arange(size, dtype=np.int64)
+    while True:
+        pu = parent[u]
+        pv = parent[v]
+        differ = pu != pv
+        if not differ.any():
+            break
+        # Hook the larger root under the smaller one; parent[i] <= i holds
+        # throughout, so no cycles can form
+        high = np.maximum(pu[differ], pv[differ])
+        low = np.minimum(pu[differ], pv[differ])
+        np.minimum.at(parent, high, low)
+        # Pointer jumping until every cell points straight at its root
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    flat_open = passable.ravel()
+    roots, labels = np.unique(parent[flat_open], return_inverse=True)
+    result = np.full(size, UNREACHED, dtype=np.int32)
+    result[flat_open] = labels
+    return result.reshape(height, width), len(roots)
+
+
+def array_steps(values: Sequence[float], shape: Tuple[int, ...]) -> Generator[None, None, np.ndarray]:
+    """np.asarray(values, dtype=float).reshape(shape), pausing every CONVERT_CHUNK cells."""
+    result = np.empty(len(values))
+    for first in range(0, len(values), CONVERT_CHUNK):
+        result[first:first + CONVERT_CHUNK] = values[first:first + CONVERT_CHUNK]
+        yield
+    return result.reshape(shape)
+
+
+def list_steps(array: np.ndarray) -> Generator[None, None, List[float]]:
+    """array.ravel().tolist(), pausing every CONVERT_CHUNK cells."""
+    flat = array.ravel()
+    values: List[float] = []
+    for first in range(0, flat.size, CONVERT_CHUNK):
+        values.extend(flat[first:first + CONVERT_CHUNK].tolist())
+        yield
+    return values
+
+
+def cost_to_go_many(
+    costs: np.ndarray,
+    targets: Sequence[Point],
+    batch_cells: int = 4_000_000,
+) -> np.ndarray:
+    """
+    For each target, the cheapest cost of walking from every cell to it,
+    where costs is the (height, width) price of entering each cell
+    (inf = blocked). The same numbers as astar.cost_to_go, for all
+    targets at once: a float (len(targets), height, width) array, inf
+    where the target cannot be reached. Blocked targets reach nothing.
+
+    Targets are processed batch_cells map cells at a time to cap memory.
+    """
+    return drain(cost_to_go_steps(costs, targets, batch_cells))
+
+
+def cost_to_go_steps(
+    costs: np.ndarray,
+    targets: Sequence[Point],
+    batch_cells: int = 4_000_000,
+    chunk: int = WAVEFRONT_CHUNK,
+) -> Generator[None, None, np.ndarray]:
+    """
+    cost_to_go_many as a generator: it yields None after about chunk
+    relaxations, so a caller can spread one large wavefront over several
+    frames, and returns the fields when it finishes.
+    """
+    height, width = costs.shape
+    padded_width = width + 2
+    padded_size = (height + 2) * padded_width
+    padded = np.full((height + 2, padded_width), np.inf)
+    padded[1:-1, 1:-1] = costs
+    padded = padded.ravel()
+
+    result = np.full((len(targets), height, width), np.inf)
+    per_batch = max(1, batch_cells // padded_size)
+    offsets = np.array([1, -1, padded_width, -padded_width], dtype=np.int64)
+    work = 0
+    for first in range(0, len(targets), per_batch):
+        batch = targets[first:first + per_batch]
+        # Every target gets its own copy of the map, laid end to end, so
+        # one flat index addresses (target, cell) and the blocked border
+        # keeps the copies apart
+        batch_costs = np.tile(padded, len(batch))
+        enterable = np.isfinite(batch_costs)
+        dist = np.full(batch_costs.shape, np.inf)
+        frontier = np.array(
+            [copy * padded_size + (y + 1) * padded_width + x + 1
+             for copy, (x, y) in enumerate(batch) if 0 <= x < width and 0 <= y < height],
+            dtype=np.int64,
+        )
+        frontier = frontier[enterable[frontier]]
+        dist[frontier] = 0.0
+        # Setting up a batch is whole-map work of its own
+        work = 0
+        yield
+
+        while frontier.size:
+            work += max(4 * frontier.size, ROUND_WORK)
+            if work >= chunk:
+                work = 0
+                yield
+            # Stepping from a neighbour into a frontier cell costs that cell's price
+            reach = np.repeat(dist[frontier] + batch_costs[frontier], 4)
+            candidates = (frontier[:, None] + offsets).ravel()
+            better = enterable[candidates] & (reach < dist[candidates])
+            candidates = candidates[better]
+            reach = reach[better]
+            if candidates.size == 0:
+                break
+            np.minimum.at(dist, candidates, reach)
+            frontier = np.unique(candidates[dist[candidates] == reach])
+
+        dist = dist.reshape(len(batch), height + 2, padded_width)[:, 1:-1, 1:-1]
+        result[first:first + len(batch)] = dist
+    return result
+
+
+def _padded_indices(points: Iterable[Point], width: int, height: int) -> np.ndarray:
+    cells = np.array(list(points), dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return np.zeros(0, dtype=np.int64)
+    xs, ys = cells[:, 0], cells[:, 1]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return (ys[inside] + 1) * (width + 2) + (xs[inside] + 1)
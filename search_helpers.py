@@ -0,0 +1,25 @@
+# search_helpers.py
+
+"""
+Helpers shared by the search algorithm tests.
+"""
+
+from grid_sim.astar import BLOCKED
+
+
+def random_costs(rng, width, height, walls=0.25, terrain=0.3):
+    """
+    Flat per-cell entry costs for a random width x height map: each cell is
+    a wall (BLOCKED) with chance walls, forest or water (1.6 or 2.5) with
+    chance terrain, and open ground (1.0) otherwise.
+    """
+    costs = []
+    for _ in range(width * height):
+        roll = rng.random()
+        if roll < walls:
+            costs.append(BLOCKED)
+        elif roll < walls + terrain:
+            costs.append(rng.choice((1.6, 2.5)))
+        else:
+            costs.append(1.0)
+    return costs
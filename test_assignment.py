@@ -0,0 +1,64 @@
+# test_assignment.py
+
+"""
+Unit tests for objective assignment. The Hungarian solver must match a
+brute-force search over permutations, and the cost matrix must hold the
+same route costs as a per-objective Dijkstra.
+"""
+
+import itertools
+import random
+
+import numpy as np
+
+from grid_sim.assignment import assign_objectives, min_cost_assignment, path_cost_matrix
+from grid_sim.astar import BLOCKED, cost_to_go
+from grid_sim.cost_model import CostMap
+
+
+def test_hungarian_matches_brute_force():
+    rng = random.Random(6)
+    for _ in range(150):
+        rows, cols = rng.randint(1, 5), rng.randint(1, 5)
+        cost = np.array([[float(rng.randint(0, 30)) for _ in range(cols)] for _ in range(rows)])
+        matched = min_cost_assignment(cost)
+
+        used = [col for col in matched if col >= 0]
+        assert len(used) == min(rows, cols) == len(set(used))
+        total = sum(cost[row, col] for row, col in enumerate(matched) if col >= 0)
+        if rows <= cols:
+            best = min(sum(cost[r, c] for r, c in enumerate(p)) for p in itertools.permutations(range(cols), rows))
+        else:
+            best = min(sum(cost[r, c] for c, r in enumerate(p)) for p in itertools.permutations(range(rows), cols))
+        assert total == best
+
+
+def test_unreachable_pairs_are_avoided():
+    cost = np.array([[1.0, BLOCKED], [2.0, 50.0]])
+    assert min_cost_assignment(cost) == [0, 1]
+
+
+def test_matrix_matches_dijkstra_and_scales():
+    rng = random.Random(13)
+    width, height = 15, 11
+    modifiers = [BLOCKED if rng.random() < 0.25 else rng.choice((1.0, 1.6, 2.5)) for _ in range(width * height)]
+    cost_map = CostMap(width, height, modifiers)
+    free = [(i % width, i // width) for i, m in enumerate(modifiers) if m != BLOCKED]
+    starts = rng.sample(free, 4)
+    goals = rng.sample(free, 3)
+    scales = [1.0, 1.5, 2.0, 1.0]
+
+    matrix = path_cost_matrix(cost_map, starts, goals, scales)
+    for col, goal in enumerate(goals):
+        dist = cost_to_go(width, height, cost_map.cost_function(), [goal])
+        for row, (x, y) in enumerate(starts):
+            expected = dist[y * width + x] * scales[row]
+            assert matrix[row, col] == expected or abs(matrix[row, col] - expected) < 1e-9
+
+
+def test_agents_take_the_objective_on_their_side():
+    # Two agents at either end of a corridor, objectives next to each of them
+    cost_map = CostMap.from_occupancy([[0] * 10])
+    starts = [(0, 0), (9, 0)]
+    goals = [(8, 0), (1, 0)]
+    assert assign_objectives(cost_map, starts, goals) == [(1, 0), (8, 0)]
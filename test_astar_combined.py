@@ -11,7 +11,7 @@ import copy
 from typing import List, Tuple
 
 import pytest
-from astar import astar
+from grid_sim.astar import astar, astar_search
 
 Point = Tuple[int, int]
 
@@ -109,4 +109,21 @@ def test_astar_dynamic_change_replan_avoids_new_obstacle():
     assert (2, 2) not in path2
 
     # Detour should increase path length
-    assert len(path2) > len(path1)
\ No newline at end of file
+    assert len(path2) > len(path1)
+
+def test_astar_live_grid_prefers_cheaper_terrain():
+    # Makes sure A* on a live Grid reads terrain cost and routes around a forest
+    # strip when the detour is cheaper than pushing straight through it
+    from grid_sim.grid import Grid
+    from grid_sim.terrain import Forest
+
+    grid = Grid()
+    for x in range(1, 9):
+        grid.add_entity(Forest(x, 0))
+    start, goal = (0, 0), (9, 0)
+
+    result = astar_search(grid, start, goal)
+    assert result.found
+    assert all(not grid.is_forest(x, y) for x, y in result.path)
+    # 9 steps along row 1 plus one step down and one back up
+    assert result.cost == 11
@@ -0,0 +1,113 @@
+# test_cbs.py
+
+"""
+Unit tests for the conflict-based search solver. Solutions are replayed with the
+same conflict checker as the cooperative planner tests, and small cases are
+compared against known optimal sums of costs.
+"""
+
+import random
+import time
+
+from grid_sim.cbs import solve_cbs
+from grid_sim.cost_model import CostMap
+from test_cooperative import assert_adjacent_steps, assert_conflict_free, head_on_corridor_sim, play_through_fire_tick
+
+
+def test_head_on_corridor_is_optimal():
+    # Two agents swap ends of a corridor with one pocket; the cheapest plan
+    # sends one agent into the pocket and back out (6 + 8 = 14 moves) and
+    # needs four ticks of waiting to keep the handover conflict-free
+    rows = [
+        [1, 1, 1, 0, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+    ]
+    cost_map = CostMap.from_occupancy(rows)
+    result = solve_cbs(cost_map, [((0, 1), (6, 1)), ((6, 1), (0, 1))], time_budget_ms=2000)
+
+    assert result.optimal
+    assert result.gap == 0.0
+    assert result.cost == 18.0
+    assert_conflict_free(result)
+    for path in result.paths:
+        assert_adjacent_steps(cost_map, path)
+
+
+def test_dropped_children_void_the_optimality_proof():
+    # Too small a low-level budget drops the children that lead to the
+    # 18.0 plan; the seed is then the best known plan, but not a proven one
+    rows = [
+        [1, 1, 1, 0, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+    ]
+    cost_map = CostMap.from_occupancy(rows)
+    result = solve_cbs(cost_map, [((0, 1), (6, 1)), ((6, 1), (0, 1))], time_budget_ms=2000, low_level_budget=11)
+
+    assert not result.optimal
+    assert result.cost > 18.0 and result.lower_bound <= 18.0
+    assert_conflict_free(result)
+
+
+def test_matches_independent_paths_when_no_conflicts():
+    # Agents in separate rows never interact, so CBS cost is the sum of
+    # their individual fuel costs, with fuel_per_step applied per agent
+    rows = [[0] * 6 for _ in range(3)]
+    cost_map = CostMap.from_occupancy(rows)
+    result = solve_cbs(cost_map, [((0, 0), (5, 0)), ((0, 2), (5, 2))], fuel_scales=[1.0, 2.0])
+
+    assert result.optimal
+    assert result.cost == 5.0 + 10.0
+    assert result.planned_cells(1)[-1] == (5, 2)
+
+
+def test_budget_cut_returns_valid_plan_with_bound():
+    # A tiny node budget on a crowded map still yields a conflict-free plan
+    # (the cooperative seed) and an honest lower bound
+    rng = random.Random(5)
+    width = height = 8
+    rows = [[0] * width for _ in range(height)]
+    cells = rng.sample([(x, y) for y in range(height) for x in range(width)], 16)
+    agents = list(zip(cells[:8], cells[8:]))
+    cost_map = CostMap.from_occupancy(rows)
+
+    result = solve_cbs(cost_map, agents, max_nodes=1)
+
+    assert result.paths is not None
+    assert_conflict_free(result)
+    assert result.lower_bound <= result.cost
+    assert 0.0 <= result.gap <= 1.0
+    for index, (start, goal) in enumerate(agents):
+        assert result.paths[index][0] == start
+        assert result.paths[index][-1] == goal
+
+
+def test_time_budget_covers_the_whole_solve():
+    # Heuristic fields, seed and root searches alone take far longer than
+    # the budget on this map; the solver must still stop on time
+    rng = random.Random(1)
+    size = 150
+    rows = [[1 if rng.random() < 0.2 else 0 for _ in range(size)] for _ in range(size)]
+    cells = rng.sample([(x, y) for y in range(size) for x in range(size) if not rows[y][x]], 20)
+    agents = list(zip(cells[:10], cells[10:]))
+    cost_map = CostMap.from_occupancy(rows)
+
+    started = time.perf_counter()
+    result = solve_cbs(cost_map, agents, time_budget_ms=20)
+    assert (time.perf_counter() - started) * 1000 < 120
+    assert not result.optimal
+
+    result = solve_cbs(cost_map, agents, time_budget_ms=5000)
+    assert result.optimal
+    assert_conflict_free(result)
+
+
+def test_team_optimal_routes_survive_fire_ticks():
+    # A fire tick next to the corridor must not swap a CBS route for a
+    # single-agent repair that ignores the other movable
+    sim = head_on_corridor_sim()
+    result = sim.plan_team_optimal()
+    assert result.paths is not None
+    summary = play_through_fire_tick(sim, (8, 3))
+    assert [entity["movement"]["blocked_moves"] for entity in summary["entities"]] == [0, 0]
@@ -0,0 +1,156 @@
+# test_cooperative.py
+
+"""
+Unit tests for cooperative multi-agent planning. Every returned plan is replayed
+tick by tick and checked for vertex, swap and following conflicts, which are the
+cases that would make Movable.advance_one_step fail at execution time. In the
+simulation the plan has to hold up through fire ticks too.
+"""
+
+import random
+
+from grid_sim.cooperative import ReservationTable, plan_cooperative
+from grid_sim.cost_model import CostMap
+from grid_sim.map_data import MapData, MovableSpawnData, ZoneData
+from grid_sim.simulation import SimulationManager
+
+
+def assert_conflict_free(plan):
+    # Replays all timed paths together and fails on any conflict
+    horizon = max(len(path) for path in plan.paths)
+    paths = [path + [path[-1]] * (horizon - len(path)) for path in plan.paths]
+
+    for t in range(horizon):
+        cells = [path[t] for path in paths]
+        assert len(set(cells)) == len(cells), f"vertex conflict at tick {t}"
+        if t == 0:
+            continue
+        for i, a in enumerate(paths):
+            if a[t] == a[t - 1]:
+                continue
+            for j, b in enumerate(paths):
+                if i != j:
+                    # Covers swaps and following into a cell being vacated
+                    assert a[t] != b[t - 1], f"agent {i} entered agent {j}'s cell at tick {t}"
+
+
+def assert_adjacent_steps(cost_map, path):
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert abs(x1 - x2) + abs(y1 - y2) <= 1
+        assert not cost_map.is_blocked(x2, y2)
+
+
+def test_head_on_corridor_uses_side_pocket():
+    # Two agents meet head-on in a one-wide corridor with a single pocket;
+    # one has to step aside and wait for the other to pass
+    rows = [
+        [1, 1, 1, 0, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+    ]
+    cost_map = CostMap.from_occupancy(rows)
+    plan = plan_cooperative(cost_map, [((0, 1), (6, 1)), ((6, 1), (0, 1))])
+
+    assert plan.reached == [True, True]
+    assert_conflict_free(plan)
+    for path in plan.paths:
+        assert_adjacent_steps(cost_map, path)
+
+
+def test_many_agents_open_map_conflict_free():
+    # Makes sure a crowd of agents on a cluttered map all arrive without conflicts
+    rng = random.Random(3)
+    width = height = 24
+    rows = [[1 if rng.random() < 0.12 else 0 for _ in range(width)] for _ in range(height)]
+    free = [(x, y) for y in range(height) for x in range(width) if not rows[y][x]]
+    cells = rng.sample(free, 80)
+    agents = list(zip(cells[:40], cells[40:]))
+
+    cost_map = CostMap.from_occupancy(rows)
+    plan = plan_cooperative(cost_map, agents)
+
+    assert_conflict_free(plan)
+    for index, (start, goal) in enumerate(agents):
+        if plan.reached[index]:
+            assert plan.paths[index][0] == start
+            assert plan.paths[index][-1] == goal
+            assert plan.planned_cells(index)[-1] == goal
+
+
+def test_reservation_table_rejects_swaps_and_following():
+    table = ReservationTable()
+    table.reserve_path(0, [(0, 0), (1, 0)], start_tick=0)
+
+    # Swapping with agent 0 across the same edge
+    assert not table.can_move(1, 1, 0, 0, 0, 0)
+    # Entering (0, 0) while agent 0 is still in it
+    assert not table.can_move(1, 0, 1, 0, 0, 0)
+    # Entering (0, 0) once agent 0 has left is fine
+    assert table.can_move(1, 0, 1, 0, 0, 1)
+
+
+def test_boxed_in_agents_stay_reserved():
+    # Crowded small maps with no retries drive agents into the cautious
+    # pass, where boxed-in agents wait out the window in place
+    for seed in range(40):
+        rng = random.Random(seed)
+        size = 7
+        rows = [[1 if rng.random() < 0.25 else 0 for _ in range(size)] for _ in range(size)]
+        free = [(x, y) for y in range(size) for x in range(size) if not rows[y][x]]
+        count = min(len(free) // 2, 12)
+        cells = rng.sample(free, 2 * count)
+        plan = plan_cooperative(CostMap.from_occupancy(rows), list(zip(cells[:count], cells[count:])), max_retries=0)
+        assert_conflict_free(plan)
+
+
+def head_on_corridor_sim():
+    # Two movables at either end of a one-wide corridor with a single pocket
+    # and a gap in its lower wall for the fire to reach through. Routes
+    # planned one by one come first, so the movables start opted in to
+    # fire repair.
+    walls = [(x, 0) for x in range(11)]
+    walls += [(x, 1) for x in range(11) if x != 5]
+    walls += [(x, 3) for x in range(11) if x != 8]
+    map_data = MapData(
+        width=11,
+        height=6,
+        walls=walls,
+        start_zone=ZoneData("Start", 0, 2, 2, 1),
+        dest_zone=ZoneData("Objective", 9, 2, 2, 1),
+        movables=[MovableSpawnData(0, 2), MovableSpawnData(10, 2)],
+        objective_cells=[(10, 2), (0, 2)],
+    )
+    sim = SimulationManager(map_data)
+    left, right = sim.movables
+    left.metrics.objective_cell, right.metrics.objective_cell = (10, 2), (0, 2)
+    sim.auto_plan()
+    while sim.planning_queue:
+        sim.planning_queue.step(50)
+    return sim
+
+
+def play_through_fire_tick(sim, cell):
+    # Plays the mission; the first fire tick lights the given cell, then
+    # the fire stays put so the run is deterministic
+    fire_ticks = []
+
+    def spread_fire():
+        fire_ticks.append(len(fire_ticks))
+        if len(fire_ticks) > 1:
+            return []
+        sim.grid.add_fire(*cell)
+        return [cell]
+
+    sim.grid.spread_fire = spread_fire
+    summary = sim.run_to_completion(max_ticks=60)
+    assert summary["fast_forward"]["completed"] and fire_ticks
+    return summary
+
+
+def test_cooperative_routes_survive_fire_ticks():
+    # The cooperative plan must not be torn apart by the next fire tick;
+    # this one sidesteps into the gap, right next to the fire
+    sim = head_on_corridor_sim()
+    sim.plan_all_cooperative()
+    summary = play_through_fire_tick(sim, (8, 4))
+    assert [entity["movement"]["blocked_moves"] for entity in summary["entities"]] == [0, 0]
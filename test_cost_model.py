@@ -0,0 +1,79 @@
+# test_cost_model.py
+
+"""
+Unit tests for the planner cost model: the precomputed CostMap, exact per-cell
+fuel accounting by speed tier, and the fuel- vs step-minimising search modes.
+"""
+
+import pytest
+
+from grid_sim.astar import BLOCKED
+from grid_sim.cost_model import (
+    MINIMISE_FUEL,
+    MINIMISE_STEPS,
+    CostMap,
+    cost_map_for,
+    path_fuel_cost,
+    shortest_path,
+)
+from grid_sim.entities import Movable, Wall
+from grid_sim.grid import Grid
+from grid_sim.metrics import EntityMetrics
+from grid_sim.terrain import Forest, Water
+
+
+def test_cost_map_reads_terrain_and_ignores_movables():
+    # Makes sure terrain multipliers land in the flat array and movables do not block
+    grid = Grid()
+    grid.add_entity(Wall(1, 0))
+    grid.add_entity(Water(2, 0))
+    grid.add_entity(Forest(3, 0))
+    grid.add_entity(Movable((0, 0, 255), 4, 0))
+
+    cost_map = CostMap.from_grid(grid)
+    assert cost_map.modifier(1, 0) == BLOCKED
+    assert cost_map.modifier(2, 0) == pytest.approx(2.5)
+    assert cost_map.modifier(3, 0) == pytest.approx(1.6)
+    assert cost_map.modifier(4, 0) == 1.0
+    assert cost_map.modifier(0, 0) == 1.0
+
+
+def test_cost_map_cache_tracks_grid_version():
+    # Makes sure the cached map is reused until the grid changes
+    grid = Grid()
+    first = cost_map_for(grid)
+    assert cost_map_for(grid) is first
+
+    grid.add_entity(Wall(5, 5))
+    second = cost_map_for(grid)
+    assert second is not first
+    assert second.is_blocked(5, 5)
+
+
+def test_path_fuel_cost_uses_speed_tier_and_terrain():
+    # Makes sure fuel is fuel_per_step times the multiplier of each entered cell
+    rows = [[0] * 4]
+    cost_map = CostMap.from_occupancy(rows)
+    cost_map.modifiers[1] = 2.5
+    cost_map.modifiers[2] = 1.6
+    metrics = EntityMetrics(speed_tier="medium")
+
+    fuel = path_fuel_cost(metrics, cost_map, [(1, 0), (2, 0), (3, 0)])
+    assert fuel == pytest.approx(2.0 * (2.5 + 1.6 + 1.0))
+
+
+def test_fuel_mode_detours_around_water_but_steps_mode_does_not():
+    # Makes sure minimising fuel avoids an expensive water strip that the
+    # step-minimising route crosses directly
+    rows = [[0] * 5 for _ in range(3)]
+    cost_map = CostMap.from_occupancy(rows)
+    for x in range(1, 4):
+        cost_map.modifiers[cost_map.index(x, 0)] = 2.5
+    metrics = EntityMetrics(speed_tier="slow")
+
+    by_steps = shortest_path(cost_map, (0, 0), (4, 0), metrics, minimise=MINIMISE_STEPS)
+    by_fuel = shortest_path(cost_map, (0, 0), (4, 0), metrics, minimise=MINIMISE_FUEL)
+
+    assert by_steps.cost == 4
+    assert by_fuel.cost == pytest.approx(6.0)
+    assert all(y == 1 for x, y in by_fuel.path[1:-1])
@@ -0,0 +1,134 @@
+# test_fire.py
+
+"""
+Unit tests for the vectorized fire spread. A seeded fire must replay
+exactly, never catch cells the rules protect, and spread at the rates
+FIRE_SPREAD_CHANCE and FOREST_IGNITION_CHANCE describe. The incremental
+distance field must agree with the fire tiles it is kept beside.
+"""
+
+import copy
+
+import numpy as np
+
+from grid_sim.cost_model import cost_map_for, fire_aware_costs, fire_aware_costs_from_field
+from grid_sim.entities import Movable, Wall, apply_fire_damage_all
+from grid_sim.fire import FIRE_DISTANCE_CAP, FIRE_SPREAD_CHANCE, FOREST_IGNITION_CHANCE, FireSpread
+from grid_sim.grid import Grid
+from grid_sim.terrain import Forest
+
+
+def _burning_world(seed):
+    grid = Grid(40, 40)
+    for y in range(40):
+        grid.add_entity(Wall(20, y))
+    for x in range(5, 15):
+        grid.add_entity(Forest(x, 5))
+    grid.add_entity(Movable((0, 0, 255), 12, 12))
+    grid.objective_cells = {(10, 14), (11, 14)}
+    grid.add_fire(10, 10)
+    grid.add_fire(19, 30)
+    grid.seed_fire(seed)
+    return grid
+
+
+def test_seeded_fire_replays_and_array_matches_tiles():
+    first, second = _burning_world(4), _burning_world(4)
+    for _ in range(40):
+        version = first.fire_version
+        new_tiles = first.spread_fire()
+        assert second.spread_fire() == new_tiles
+        assert first.fire_version == version + (1 if new_tiles else 0)
+    assert first.fire_tiles == second.fire_tiles and len(first.fire_tiles) > 20
+    ys, xs = np.nonzero(first.fire.burning)
+    assert set(zip(xs.tolist(), ys.tolist())) == first.fire_tiles
+
+    first.clear_fire()
+    assert not first.fire.burning.any() and not first.fire_tiles
+
+
+def test_fire_never_catches_protected_cells():
+    for seed in range(5):
+        grid = _burning_world(seed)
+        for _ in range(60):
+            grid.spread_fire()
+        assert (12, 12) not in grid.fire_tiles
+        assert not grid.objective_cells & grid.fire_tiles
+        # The wall splits the map, so the fire never reaches it or the far side
+        assert all(x < 20 for x, _ in grid.fire_tiles)
+
+
+def test_spread_rates_match_the_rules():
+    # Isolated sources every third cell, so no two can ignite the same cell
+    size = 300
+    fire = FireSpread(size, size, seed=11)
+    fire.burning[1::3, 1::3] = True
+    sources = int(fire.burning.sum())
+
+    open_ground = np.ones((size, size))
+    ignited = fire.step(open_ground).size
+    assert abs(ignited - sources * FIRE_SPREAD_CHANCE) < 0.05 * sources * FIRE_SPREAD_CHANCE
+
+    fire.burning[:] = False
+    fire.burning[1::3, 1::3] = True
+    forest = np.full((size, size), FOREST_IGNITION_CHANCE)
+    expected = sources * FIRE_SPREAD_CHANCE * FOREST_IGNITION_CHANCE
+    assert abs(fire.step(forest).size - expected) < 0.05 * expected
+
+    # Extra blocked cells never catch
+    fire.burning[:] = False
+    fire.burning[1::3, 1::3] = True
+    blocked = np.flatnonzero(~fire.burning)
+    assert fire.step(open_ground, blocked).size == 0
+
+
+def test_distance_field_tracks_the_fire():
+    grid = _burning_world(8)
+    for tick in range(50):
+        grid.spread_fire()
+        if tick == 20:
+            grid.add_fire(30, 30)
+        if tick % 10 == 0:
+            fire = grid.fire_tiles
+            for y in range(grid.height):
+                for x in range(grid.width):
+                    nearest = min((abs(x - fx) + abs(y - fy) for fx, fy in fire), default=FIRE_DISTANCE_CAP)
+                    assert grid.fire_distance(x, y) == min(nearest, FIRE_DISTANCE_CAP)
+                    adjacent = any((x + dx, y + dy) in fire for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)))
+                    assert grid.is_adjacent_to_fire(x, y) == adjacent
+    assert grid.fire_distance(-1, 0) == FIRE_DISTANCE_CAP
+
+    grid.clear_fire()
+    assert (grid.fire.distance == FIRE_DISTANCE_CAP).all()
+
+
+def test_bulk_damage_matches_per_movable_damage():
+    grid = Grid(12, 3)
+    for x in range(3, 12):
+        grid.add_fire(x, 1)
+    # In fire, beside it, clear of it, and one that burns out
+    movables = [Movable((0, 0, 255), x, y) for x, y in ((4, 1), (5, 0), (0, 1), (8, 1))]
+    movables[3].health = 25
+    singles = copy.deepcopy(movables)
+
+    for tick in range(6):
+        if tick == 3:
+            for group in (movables, singles):
+                group[1].x_pos = 1
+        apply_fire_damage_all(movables, grid)
+        for movable in singles:
+            movable.apply_fire_damage(grid)
+        for bulk, single in zip(movables, singles):
+            state = ("health", "fire_damage_taken", "time_in_fire", "time_near_fire", "exposure_ticks", "destroyed")
+            assert [getattr(bulk, name) for name in state] == [getattr(single, name) for name in state]
+    assert movables[3].destroyed and movables[2].health == 100 and movables[0].health < movables[1].health
+
+
+def test_field_costs_match_tile_set_costs():
+    grid = _burning_world(2)
+    for _ in range(30):
+        grid.spread_fire()
+    cost_map = cost_map_for(grid)
+    for fuel_per_step in (1.0, 1.5):
+        expected = fire_aware_costs(cost_map, grid.fire_tiles, fuel_per_step)
+        assert fire_aware_costs_from_field(cost_map, grid.fire.distance, fuel_per_step) == expected
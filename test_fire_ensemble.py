@@ -0,0 +1,71 @@
+# test_fire_ensemble.py
+
+"""
+Unit tests for Monte Carlo fire forecasts. An ensemble must replay under
+a seed whatever the worker count, respect the spread rules, and agree on
+average with running Grid.spread_fire itself.
+"""
+
+import numpy as np
+
+import grid_sim.fire_ensemble as fire_ensemble
+from grid_sim.astar import BLOCKED
+from grid_sim.entities import Wall
+from grid_sim.fire_ensemble import forecast_fire
+from grid_sim.grid import Grid
+from grid_sim.terrain import Forest
+
+
+def _world():
+    grid = Grid(30, 30)
+    for y in range(30):
+        grid.add_entity(Wall(18, y))
+    for x in range(4, 12):
+        grid.add_entity(Forest(x, 20))
+    grid.objective_cells = {(8, 8)}
+    grid.add_fire(8, 14)
+    return grid
+
+
+def test_seeded_forecast_replays_across_worker_counts(monkeypatch):
+    grid = _world()
+    inline = forecast_fire(grid, runs=120, ticks=30, seed=5, workers=1)
+    assert np.array_equal(forecast_fire(grid, runs=120, ticks=30, seed=5, workers=1).burned, inline.burned)
+
+    monkeypatch.setattr(fire_ensemble, "MIN_PARALLEL_WORK", 0)
+    pooled = forecast_fire(grid, runs=120, ticks=30, seed=5, workers=2)
+    assert np.array_equal(pooled.burned, inline.burned)
+    assert not np.array_equal(forecast_fire(grid, runs=120, ticks=30, seed=6, workers=1).burned, inline.burned)
+
+
+def test_probabilities_follow_the_spread_rules():
+    grid = _world()
+    ensemble = forecast_fire(grid, runs=200, ticks=80, seed=1, workers=1)
+    chance = ensemble.probabilities()
+
+    assert chance.shape == (81, 30, 30) and chance.dtype == np.float32
+    assert chance[0, 14, 8] == 1.0 and chance[0].sum() == 1.0
+    # Fire never goes out, so the chance of burning only grows
+    assert (np.diff(chance, axis=0) >= 0).all()
+    assert chance[-1, 14, 9] > 0.9
+    # Walls, the far side of the wall and objective cells never burn
+    assert not chance[:, :, 18:].any() and not chance[:, 8, 8].any()
+
+    arrival = ensemble.arrival_ticks(0.5)
+    assert arrival[14 * 30 + 8] == 0.0 and arrival[14 * 30 + 20] == BLOCKED
+    assert 0 < arrival[14 * 30 + 9] < arrival[14 * 30 + 12] < BLOCKED
+
+
+def test_ensemble_matches_grid_spread_fire_on_average():
+    ticks = 40
+    ensemble = forecast_fire(_world(), runs=400, ticks=ticks, seed=2, workers=1)
+    forecast_mean = ensemble.burned[ticks].sum() / ensemble.runs
+
+    burned = []
+    for seed in range(200):
+        grid = _world()
+        grid.seed_fire(seed)
+        for _ in range(ticks):
+            grid.spread_fire()
+        burned.append(len(grid.fire_tiles))
+    assert abs(forecast_mean - np.mean(burned)) < 0.08 * np.mean(burned)
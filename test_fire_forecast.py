@@ -0,0 +1,60 @@
+# test_fire_forecast.py
+
+"""
+Unit tests for fire arrival forecasts and the time-dependent planner. The
+forecast must respect the spread rules of Grid.spread_fire, and routes
+must never enter a cell after its predicted ignition.
+"""
+
+from grid_sim.astar import BLOCKED
+from grid_sim.cost_model import CostMap
+from grid_sim.entities import Wall
+from grid_sim.fire_forecast import arrival_steps, fire_arrival_ticks, plan_fire_safe
+from grid_sim.grid import Grid
+from grid_sim.terrain import Forest
+
+
+def test_arrival_follows_spread_rules():
+    grid = Grid()
+    grid.add_fire(10, 10)
+    grid.add_entity(Wall(12, 10))
+    grid.add_entity(Forest(10, 12))
+    grid.objective_cells = {(5, 5)}
+    arrival = fire_arrival_ticks(grid)
+    at = lambda x, y: arrival[y * grid.width + x]
+
+    assert at(10, 10) == 0.0
+    assert at(12, 10) == BLOCKED and at(5, 5) == BLOCKED
+    # Forest catches less readily than open ground at the same distance
+    assert at(10, 12) > at(10, 8)
+    # Arrival grows with distance and is cached until the fire changes
+    assert at(11, 10) < at(11, 11) < at(15, 15)
+    assert fire_arrival_ticks(grid) is arrival
+    grid.add_fire(20, 20)
+    assert fire_arrival_ticks(grid) is not arrival
+
+
+def test_route_crosses_where_the_fire_arrives_last():
+    # A fire line in column 3 that ignites from the bottom row upwards: the
+    # straight route along the bottom is cut before the entity gets there
+    width, height = 7, 5
+    cost_map = CostMap(width, height, [1.0] * (width * height))
+    ignite = [BLOCKED] * (width * height)
+    for y in range(height):
+        ignite[y * width + 3] = 2.0 + (height - 1 - y) * 3
+
+    result = plan_fire_safe(cost_map, ignite, (0, 4), (6, 4))
+    for step, (x, y) in enumerate(result.path[1:], start=1):
+        assert ignite[y * width + x] > step
+    # Crossing at row 1 is the first place with no burning neighbour on the
+    # way: three steps up and back down on top of the six across
+    assert (3, 1) in result.path
+    assert result.cost == 12.0
+
+    no_fire = plan_fire_safe(cost_map, [BLOCKED] * (width * height), (0, 4), (6, 4))
+    assert no_fire.cost == 6.0
+
+
+def test_arrival_steps_scale_and_keep_blocked():
+    steps = arrival_steps([0.0, 10.0, BLOCKED], steps_per_fire_tick=2.0, safety=0.5)
+    assert steps == [0.0, 10.0, BLOCKED]
@@ -0,0 +1,110 @@
+# test_fire_models.py
+
+"""
+Unit tests for the pluggable fire models. The wind kernel must push fire
+downwind, respect fuel and burn-out, and reduce to the default rate with
+no wind; maps must pick their model from metadata, and forecasts must
+follow it.
+"""
+
+import numpy as np
+import pytest
+
+import grid_sim.fire_ensemble as fire_ensemble
+from grid_sim.fire import FIRE_SPREAD_CHANCE, FireSpread
+from grid_sim.fire_ensemble import forecast_fire
+from grid_sim.fire_models import DEFAULT_FIRE_MODEL, WindFireModel, fire_model_from_metadata
+from grid_sim.grid import Grid
+from grid_sim.layers import WATER
+from grid_sim.map_data import MapData, MovableSpawnData, ZoneData
+from grid_sim.map_runtime import build_runtime_world
+
+
+def test_wind_kernel_spreads_downwind_and_burns_out():
+    size = 300
+    codes = np.zeros((size, size), dtype=np.uint8)
+    open_ground = np.ones((size, size))
+    # Isolated sources every third cell, so no two can ignite the same cell
+    mask = np.zeros((size, size), dtype=bool)
+    mask[1::3, 1::3] = True
+    sources = np.flatnonzero(mask)
+
+    # With no wind each neighbour catches at a quarter of the default spread chance
+    fire = FireSpread(size, size, seed=3)
+    fire.ignite(sources)
+    ignited = fire.step(open_ground, model=WindFireModel(), codes=codes).size
+    expected = sources.size * FIRE_SPREAD_CHANCE
+    assert abs(ignited - expected) < 0.05 * expected
+
+    # An east wind ignites far more cells east of the sources than west
+    fire = FireSpread(size, size, seed=3)
+    fire.ignite(sources)
+    ignited = fire.step(open_ground, model=WindFireModel(90, 10), codes=codes)
+    east = int((ignited % size % 3 == 2).sum())
+    west = int((ignited % size % 3 == 0).sum())
+    assert east > 10 * west > 0
+
+    # Water never catches, and a cell stops spreading once it burns out
+    strip = np.zeros((1, 5), dtype=np.uint8)
+    strip[0, 0] = WATER
+    for burn_ticks, spreads in ((3, False), (4, True)):
+        model = WindFireModel(spread_chance=1.0, burn_ticks={"open": burn_ticks})
+        fire = FireSpread(5, 1, seed=3)
+        fire.ignite_cell(1, 0)
+        for _ in range(3):
+            assert fire.step(np.ones((1, 5)), [2], model, strip).size == 0
+        assert fire.step(np.ones((1, 5)), None, model, strip).tolist() == ([2] if spreads else [])
+
+
+def test_maps_choose_their_fire_model():
+    map_data = MapData(
+        width=20,
+        height=20,
+        start_zone=ZoneData("Start", 1, 1, 4, 4),
+        dest_zone=ZoneData("Objective", 14, 14, 4, 4),
+        movables=[MovableSpawnData(2, 2)],
+        fire=[(10, 10)],
+    )
+    assert build_runtime_world(map_data).grid.fire_model is DEFAULT_FIRE_MODEL
+
+    wind = WindFireModel(45, 8, burn_ticks={"forest": 0})
+    map_data.metadata.update(wind.to_metadata(), title="Windy")
+    grid = build_runtime_world(MapData.from_dict(map_data.to_dict())).grid
+    assert grid.fire_model.name == "wind" and grid.fire_model.to_metadata() == wind.to_metadata()
+    assert np.array_equal(grid.fire_model.kernel, wind.kernel)
+    grid.seed_fire(1)
+    for _ in range(30):
+        grid.spread_fire()
+    assert len(grid.fire_tiles) > 1 and not grid.objective_cells & grid.fire_tiles
+
+    with pytest.raises(ValueError):
+        fire_model_from_metadata({"fire_model": "plume"})
+    with pytest.raises(ValueError):
+        fire_model_from_metadata({"fire_model": "wind", "fire_wind_speed": "gale"})
+
+
+def test_forecasts_follow_the_grid_fire_model(monkeypatch):
+    def world():
+        grid = Grid(41, 41)
+        grid.fire_model = WindFireModel(90, 10)
+        grid.add_fire(20, 20)
+        return grid
+
+    ensemble = forecast_fire(world(), runs=100, ticks=40, seed=4, workers=1)
+    chance = ensemble.probability(40)
+    assert chance[20, 30:].sum() > 5 * chance[20, :11].sum()
+
+    monkeypatch.setattr(fire_ensemble, "MIN_PARALLEL_WORK", 0)
+    pooled = forecast_fire(world(), runs=100, ticks=40, seed=4, workers=2)
+    assert np.array_equal(pooled.burned, ensemble.burned)
+
+    # On average the forecast matches running the grid itself
+    burned = []
+    for seed in range(100):
+        grid = world()
+        grid.seed_fire(seed)
+        for _ in range(40):
+            grid.spread_fire()
+        burned.append(len(grid.fire_tiles))
+    forecast_mean = ensemble.burned[40].sum() / ensemble.runs
+    assert abs(forecast_mean - np.mean(burned)) < 0.15 * np.mean(burned)
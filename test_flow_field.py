@@ -0,0 +1,102 @@
+# test_flow_field.py
+
+"""
+Unit tests for shared flow fields. Walking downhill from any cell must cost
+exactly what A* finds to the nearest objective, and the cached field must be
+reused until the terrain or the fire changes.
+"""
+
+import random
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.entities import Wall
+from grid_sim.flow_field import FlowField, flow_field_for, flow_fields_to_cells, flow_fields_to_cells_steps
+from grid_sim.grid import Grid
+
+
+def test_field_routes_match_astar_to_nearest_target():
+    # Downhill routes are as cheap as the best A* route to any target
+    rng = random.Random(11)
+    width = height = 20
+    costs = [BLOCKED if rng.random() < 0.2 else rng.choice((1.0, 1.0, 1.6, 2.5)) for _ in range(width * height)]
+    free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+    targets = rng.sample(free, 3)
+    field = FlowField(width, height, costs, targets)
+
+    for start in rng.sample(free, 40):
+        best = min(search(width, height, costs.__getitem__, start, t).cost for t in targets)
+        path = field.path_from(start)
+        if best == BLOCKED:
+            assert path is None
+            continue
+        assert path[0] == start and path[-1] in targets
+        walked = sum(costs[y * width + x] for x, y in path[1:])
+        assert abs(walked - best) < 1e-9
+        assert abs(field.distance_at(*start) - best) < 1e-9
+
+
+def test_path_to_reaches_a_specific_target():
+    # The final hop takes the route on from the nearest target to the one asked for
+    costs = [1.0] * 100
+    field = FlowField(10, 10, costs, [(8, 8), (9, 9)])
+
+    path = field.path_to((0, 0), (9, 9))
+
+    assert path[0] == (0, 0) and path[-1] == (9, 9)
+    assert len(path) - 1 == 18
+
+
+def test_cached_field_is_rebuilt_only_on_changes():
+    # Same field object until a wall is placed or the fire spreads
+    grid = Grid()
+    targets = [(20, 20), (21, 21)]
+    field = flow_field_for(grid, targets)
+    assert flow_field_for(grid, list(reversed(targets))) is field
+
+    grid.add_entity(Wall(5, 5))
+    after_wall = flow_field_for(grid, targets)
+    assert after_wall is not field
+    assert after_wall.distance_at(5, 5) == BLOCKED
+
+    grid.add_fire(10, 10)
+    after_fire = flow_field_for(grid, targets)
+    assert after_fire is not after_wall
+    assert after_fire.distance_at(10, 10) > after_wall.distance_at(10, 10)
+
+
+def test_batched_cell_fields_match_single_fields():
+    # Fields built together equal fields built one at a time, and land in the same cache
+    grid = Grid()
+    grid.add_entity(Wall(3, 4))
+    grid.add_fire(7, 7)
+    cells = [(2, 2), (15, 9), (2, 2)]
+    batched = flow_fields_to_cells(grid, cells)
+    assert batched[0] is batched[2]
+
+    for cell, field in zip(cells, batched):
+        assert flow_field_for(grid, [cell]) is field
+        single = FlowField(field.width, field.height, field.costs, [cell])
+        for a, b in zip(single.distance, field.distance):
+            assert a == b or abs(a - b) < 1e-9
+
+
+def test_field_builds_pause_between_chunks():
+    # The stepped build hands control back many times on a large map and
+    # fills the same cache as the one-shot build
+    grid = Grid(300, 300)
+    grid.add_entity(Wall(150, 149))
+    grid.add_fire(150, 150)
+    cells = [(5, 5), (290, 280)]
+    steps = flow_fields_to_cells_steps(grid, cells)
+    pauses = 0
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            fields = done.value
+            break
+        pauses += 1
+
+    assert pauses > 10
+    assert fields == flow_fields_to_cells(grid, cells)
+    assert fields[0].path_from((290, 280))[-1] == (5, 5)
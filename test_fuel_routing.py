@@ -0,0 +1,68 @@
+# test_fuel_routing.py
+
+"""
+Unit tests for fuel-constrained routing. Routes must never burn more than
+the budget, must be the fastest that fit, and an impossible budget must be
+reported as such instead of returning a route that runs dry.
+"""
+
+import pytest
+
+from grid_sim.astar import BLOCKED
+from grid_sim.cost_model import CostMap, path_fuel_cost
+from grid_sim.fuel_routing import MINIMISE_RISK, fuel_constrained_path, fuel_constrained_steps, route_within_fuel
+from grid_sim.metrics import EntityMetrics
+
+# A direct row of water (x3) and a dry detour around it
+#   row 0: S W W W G
+#   row 1: . # # # .
+#   row 2: . . . . .
+W = 3.0
+MODIFIERS = [
+    1.0, W, W, W, 1.0,
+    1.0, BLOCKED, BLOCKED, BLOCKED, 1.0,
+    1.0, 1.0, 1.0, 1.0, 1.0,
+]
+
+
+def test_fastest_route_that_fits_the_budget():
+    cost_map = CostMap(5, 3, MODIFIERS)
+    # The 4-step water crossing burns 10; the 8-step detour burns 8
+    fast = fuel_constrained_path(cost_map, (0, 0), (4, 0), 1.0, 10.5)
+    assert fast.cost == 4 and fast.fuel == 10.0
+
+    tight = fuel_constrained_path(cost_map, (0, 0), (4, 0), 1.0, 9.0)
+    assert tight.cost == 8 and tight.fuel == 8.0
+    assert (2, 2) in tight.path
+
+
+def test_impossible_budget_is_proven():
+    cost_map = CostMap(5, 3, MODIFIERS)
+    route = fuel_constrained_path(cost_map, (0, 0), (4, 0), 2.0, 15.0)
+    assert not route.found and route.complete
+
+
+def test_safest_route_uses_entity_fuel():
+    cost_map = CostMap(5, 3, MODIFIERS)
+    metrics = EntityMetrics(max_fuel=30.0, fuel=30.0, speed_tier="medium")
+    # Fire on the detour makes the water crossing safer
+    route = route_within_fuel(cost_map, metrics, (0, 0), (4, 0), MINIMISE_RISK, {(2, 2)})
+    assert route.path == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+    assert path_fuel_cost(metrics, cost_map, route.path[1:]) == pytest.approx(route.fuel)
+    assert route.fuel <= metrics.fuel
+
+
+def test_stepped_search_pauses_and_finds_the_same_route():
+    cost_map = CostMap(5, 3, MODIFIERS)
+    steps = fuel_constrained_steps(cost_map, (0, 0), (4, 0), 1.0, 9.0, chunk=2)
+    pauses = 0
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            route = done.value
+            break
+        pauses += 1
+
+    assert pauses > 3
+    assert route == fuel_constrained_path(cost_map, (0, 0), (4, 0), 1.0, 9.0)
@@ -0,0 +1,142 @@
+# test_headless.py
+
+"""
+Unit tests for running the simulation without pygame. The core must
+import and play a mission to the end with pygame unavailable, and the
+simulation clock, not an SDL timer, must pace the ticks. run_to_completion
+must replay a seeded mission on its virtual clock and say when it stopped
+at max_ticks.
+"""
+
+import math
+import os
+import random
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+
+import grid_sim.sim_export as sim_export
+from grid_sim.phases import PHASE_FINISHED, PHASE_MOVING
+from grid_sim.simulation import SimulationManager
+
+_HEADLESS_RUN = textwrap.dedent(
+    """
+    import random
+    import sys
+
+    # Any import of pygame from here on fails
+    sys.modules["pygame"] = None
+
+    import numpy as np
+
+    import grid_sim.sim_export as sim_export
+    from grid_sim.fire_ensemble import forecast_fire
+    from grid_sim.phases import PHASE_FINISHED
+    from grid_sim.simulation import SimulationManager
+
+    sim_export._RESULTS_DIR = sys.argv[1]
+    random.seed(1)
+    np.random.seed(1)
+    now = [0]
+    sim = SimulationManager(clock=lambda: now[0])
+    forecast_fire(sim.grid, runs=10, ticks=5, seed=1)
+    sim.auto_plan()
+    while sim.planning_queue:
+        sim.update(now[0])
+    sim.start()
+    while sim.phase != PHASE_FINISHED and now[0] < 600000:
+        now[0] += 50
+        sim.update(now[0])
+    assert sim.phase == PHASE_FINISHED
+    print(sim._last_export_path)
+    """
+)
+
+
+def test_mission_runs_to_the_end_without_pygame(tmp_path):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", _HEADLESS_RUN, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    export_path = result.stdout.strip().splitlines()[-1]
+    assert os.path.dirname(export_path) == str(tmp_path) and os.path.exists(export_path)
+
+
+def test_simulation_clock_paces_the_ticks():
+    now = [5000]
+    sim = SimulationManager(clock=lambda: now[0])
+    steps, fire_ticks = [], []
+    sim._step_simulation = lambda: steps.append(now[0])
+    sim._spread_fire = lambda: fire_ticks.append(now[0])
+    sim.start()
+    assert sim.phase == PHASE_MOVING
+
+    # 7 simulation ticks a second; the fire spreads at most once per update
+    for _ in range(10):
+        now[0] += 110
+        sim.update(now[0])
+    assert len(steps) == 7 and len(fire_ticks) == 2
+
+    # Time spent paused is not made up afterwards
+    sim.toggle_pause()
+    now[0] += 10000
+    sim.update(now[0])
+    sim.toggle_pause()
+    now[0] += 30
+    sim.update(now[0])
+    assert len(steps) == 7
+
+
+def _planned_sim(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    sim = SimulationManager()
+    sim.grid.seed_fire(seed)
+    sim.auto_plan()
+    return sim
+
+
+def test_run_to_completion_replays_on_a_virtual_clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(sim_export, "_RESULTS_DIR", str(tmp_path))
+    first = _planned_sim(3).run_to_completion()
+    second = _planned_sim(3).run_to_completion()
+    run = first["fast_forward"]
+    assert run["completed"] and run["ticks"] > 10 and run["ticks_per_second"] > 0
+    assert first["entities"] == second["entities"] and first["outcome"] == second["outcome"]
+    assert second["fast_forward"]["ticks"] == run["ticks"]
+
+    # Fire ticks every 400 ms between simulation ticks every 1000 / 7 ms
+    assert run["fire_ticks"] == math.ceil(run["ticks"] * 1000 / 2800) - 1
+    assert not os.listdir(tmp_path)
+
+    sim = _planned_sim(3)
+    cut = sim.run_to_completion(max_ticks=5, write_results=True)
+    assert cut["fast_forward"]["ticks"] == 5 and not cut["fast_forward"]["completed"]
+    assert sim.phase == PHASE_MOVING and os.listdir(tmp_path) == [os.path.basename(sim._last_export_path)]
+
+    # Carrying on plays out the same mission as one uninterrupted run
+    rest = sim.run_to_completion()
+    assert sim.phase == PHASE_FINISHED and rest["entities"] == first["entities"]
+    assert 5 + rest["fast_forward"]["ticks"] == run["ticks"]
+    assert cut["fast_forward"]["fire_ticks"] + rest["fast_forward"]["fire_ticks"] == run["fire_ticks"]
+
+
+def test_run_cut_at_max_ticks_reports_movables_en_route(tmp_path, monkeypatch):
+    # Movables still walking when max_ticks runs out did not miss their
+    # destination; the run just stopped
+    monkeypatch.setattr(sim_export, "_RESULTS_DIR", str(tmp_path))
+    sim = _planned_sim(3)
+    cut = sim.run_to_completion(max_ticks=3)
+    codes = [entity["stop_reason"]["code"] for entity in cut["entities"]]
+    assert codes and set(codes) == {"max_ticks_reached"}
+    assert cut["outcome"] == "failure" and "tick limit" in cut["outcome_detail"]
+
+    finished = sim.run_to_completion()
+    assert "max_ticks_reached" not in [entity["stop_reason"]["code"] for entity in finished["entities"]]
@@ -0,0 +1,84 @@
+# test_hpa.py
+
+"""
+Unit tests for hierarchical pathfinding. HPA* routes are allowed to be slightly
+longer than A*, but they must be real paths, found whenever A* finds one, and an
+incrementally updated hierarchy must answer exactly like a freshly built one.
+"""
+
+import random
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.entities import Wall
+from grid_sim.grid import Grid
+from grid_sim.hpa import HierarchicalMap, hierarchy_for
+from search_helpers import random_costs
+
+
+def test_hpa_paths_are_valid_and_complete():
+    # Every query A* can answer gets a connected, correctly priced route
+    for seed in range(60):
+        rng = random.Random(seed)
+        width, height = rng.randint(5, 40), rng.randint(5, 40)
+        costs = random_costs(rng, width, height, walls=rng.random() * 0.3, terrain=rng.random() * 0.3)
+        hierarchy = HierarchicalMap(width, height, costs, cluster_size=rng.randint(3, 10))
+        free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+        if len(free) < 2:
+            continue
+
+        for _ in range(5):
+            start, goal = rng.sample(free, 2)
+            expected = search(width, height, costs.__getitem__, start, goal)
+            route = hierarchy.find_path(start, goal)
+            assert (route is not None) == expected.found, seed
+            if route is None:
+                continue
+            cells = route.cells()
+            assert cells[0] == start and cells[-1] == goal
+            for (x1, y1), (x2, y2) in zip(cells, cells[1:]):
+                assert abs(x1 - x2) + abs(y1 - y2) == 1
+            assert abs(sum(costs[y * width + x] for x, y in cells[1:]) - route.cost) < 1e-6
+            assert route.cost >= expected.cost - 1e-9
+
+
+def test_update_rebuilds_only_affected_clusters():
+    # Blocking an interior cell touches one cluster, and the result matches a rebuild
+    rng = random.Random(7)
+    width = height = 48
+    costs = random_costs(rng, width, height, walls=rng.random() * 0.3, terrain=rng.random() * 0.3)
+    hierarchy = HierarchicalMap(width, height, costs, cluster_size=8)
+
+    assert hierarchy.update_cells({(19, 19): BLOCKED}) == 1
+    # A cell on a cluster border also rebuilds the cluster across it
+    assert hierarchy.update_cells({(23, 20): BLOCKED, (26, 42): 3.0}) == 3
+
+    for x, y, cost in ((19, 19, BLOCKED), (23, 20, BLOCKED), (26, 42, 3.0)):
+        costs[y * width + x] = cost
+    fresh = HierarchicalMap(width, height, costs, cluster_size=8)
+    free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+    for _ in range(20):
+        start, goal = rng.sample(free, 2)
+        a = hierarchy.find_path(start, goal)
+        b = fresh.find_path(start, goal)
+        assert (a is None) == (b is None)
+        if a is not None:
+            assert abs(a.cost - b.cost) < 1e-9
+
+
+def test_hierarchy_for_tracks_grid_changes():
+    # New walls and new fire reach the cached hierarchy without a full rebuild
+    grid = Grid()
+    hierarchy = hierarchy_for(grid, cluster_size=10)
+    rebuilt = hierarchy.rebuilt_clusters
+
+    grid.add_entity(Wall(5, 5))
+    grid.add_fire(15, 15)
+    assert hierarchy_for(grid, cluster_size=10) is hierarchy
+    assert hierarchy.costs[5 * grid.width + 5] == BLOCKED
+    assert hierarchy.costs[15 * grid.width + 15] > 1.0
+    assert hierarchy.rebuilt_clusters - rebuilt < len(hierarchy.nodes)
+
+    # Taking the wall away again is picked up the same way
+    grid.remove_entity(5, 5)
+    assert hierarchy_for(grid, cluster_size=10) is hierarchy
+    assert hierarchy.costs[5 * grid.width + 5] == 1.0
@@ -0,0 +1,64 @@
+# test_landmarks.py
+
+"""
+Unit tests for ALT landmark heuristics. ALT must never overestimate, so A*
+guided by it finds exactly the Manhattan-guided cost, and the per-grid set
+must be rebuilt when the terrain changes.
+"""
+
+import random
+
+from grid_sim.astar import BLOCKED, cost_to_go, search
+from grid_sim.entities import Wall
+from grid_sim.grid import Grid
+from grid_sim.landmarks import LandmarkSet, landmarks_for
+from search_helpers import random_costs
+
+
+def test_alt_search_matches_manhattan_cost():
+    rng = random.Random(5)
+    width = height = 30
+    costs = random_costs(rng, width, height, walls=0.25, terrain=0.4)
+    free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+    landmarks = LandmarkSet.select(width, height, costs, 6, seed=1)
+
+    plain_expanded = alt_expanded = 0
+    for _ in range(40):
+        start, goal = rng.sample(free, 2)
+        plain = search(width, height, costs.__getitem__, start, goal)
+        alt = search(width, height, costs.__getitem__, start, goal, heuristic=landmarks.heuristic(goal, start=start))
+        assert plain.found == alt.found
+        if plain.found:
+            assert abs(plain.cost - alt.cost) < 1e-9
+        plain_expanded += plain.expanded
+        alt_expanded += alt.expanded
+    # A tighter bound than Manhattan has to show up as less work overall
+    assert alt_expanded < plain_expanded
+
+
+def test_heuristic_never_exceeds_true_cost():
+    rng = random.Random(9)
+    width = height = 20
+    costs = random_costs(rng, width, height, walls=0.25, terrain=0.4)
+    free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+    landmarks = LandmarkSet.select(width, height, costs, 4, seed=2)
+
+    for goal in rng.sample(free, 5):
+        exact = cost_to_go(width, height, costs.__getitem__, [goal])
+        h = landmarks.heuristic(goal, scale=2.0)
+        for x, y in free:
+            true_cost = exact[y * width + x]
+            if true_cost != BLOCKED:
+                assert h(x, y) <= 2.0 * true_cost + 1e-9
+
+
+def test_landmarks_cached_per_grid_version():
+    grid = Grid()
+    first = landmarks_for(grid, count=3)
+    assert first is not None and len(first.landmarks) == 3
+    assert landmarks_for(grid, count=3) is first
+
+    grid.add_entity(Wall(5, 5))
+    rebuilt = landmarks_for(grid, count=3)
+    assert rebuilt is not first
+    assert landmarks_for(grid, count=0) is None
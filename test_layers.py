@@ -0,0 +1,96 @@
+# test_layers.py
+
+"""
+Unit tests for the array-backed terrain layers behind Grid. The old
+entity-dict API must keep answering the same way, and the vectorized
+layers must agree with it cell for cell.
+"""
+
+import numpy as np
+
+from grid_sim.astar import BLOCKED
+from grid_sim.cost_model import cost_map_for
+from grid_sim.entities import Entity, Movable, Wall
+from grid_sim.grid import Grid
+from grid_sim.layers import FOREST, WALL, TerrainLayers
+from grid_sim.terrain import Barrier, Forest, Water
+
+
+def test_grid_facade_matches_entity_dict_behaviour():
+    grid = Grid()
+    grid.add_entity(Wall(1, 1))
+    grid.add_entity(Forest(2, 1))
+    grid.add_entity(Water(3, 1))
+    grid.add_entity(Barrier(4, 1))
+    mover = Movable((0, 0, 255), 5, 1)
+    grid.add_entity(mover)
+
+    assert grid.is_blocked(1, 1) and grid.is_blocked(4, 1) and grid.is_blocked(5, 1)
+    assert not grid.is_blocked(2, 1) and not grid.is_blocked(-1, 1)
+    assert grid.get_terrain_modifier(3, 1) == 2.5 and grid.get_terrain_modifier(1, 1) == 1.0
+    assert grid.is_forest(2, 1) and not grid.is_forest(3, 1)
+
+    assert isinstance(grid.entities[(2, 1)], Forest)
+    assert grid.entities.get((5, 1)) is mover
+    assert (0, 0) not in grid.entities and (99, 99) not in grid.entities
+    assert len(grid.entities) == 5
+
+    # Terrain survives a movable passing over it
+    grid.move_entity(mover, 2, 1, ignore_blocking=True)
+    assert grid.entities[(2, 1)] is mover
+    grid.move_entity(mover, 6, 1)
+    assert grid.is_forest(2, 1) and (5, 1) not in grid.entities
+
+    version = grid.version
+    assert isinstance(grid.remove_entity(1, 1), Wall)
+    assert grid.version == version + 1 and not grid.is_blocked(1, 1)
+    assert grid.remove_entity(1, 1) is None and grid.version == version + 1
+
+
+def test_non_terrain_objects_refresh_cached_cost_maps():
+    grid = Grid()
+    cost_map_for(grid)
+    grid.add_entity(Entity((0, 0, 0), 5, 5, blocking=True))
+    assert grid.is_blocked(5, 5) and cost_map_for(grid).is_blocked(5, 5)
+
+    grid.remove_entity(5, 5)
+    assert not cost_map_for(grid).is_blocked(5, 5)
+
+    # Movables are not part of the map and leave the version alone
+    version = grid.version
+    mover = Movable((0, 0, 255), 6, 6)
+    grid.add_entity(mover)
+    grid.move_entity(mover, 7, 6)
+    grid.remove_entity(7, 6)
+    assert grid.version == version
+
+
+def test_vectorized_layers_agree_with_cell_queries():
+    grid = Grid()
+    for x in range(10):
+        grid.add_entity(Wall(x, 4))
+        grid.add_entity(Forest(x, 6))
+    layers = grid.layers
+
+    blocking = layers.blocking
+    assert blocking.shape == (grid.height, grid.width)
+    assert all(blocking[y, x] == grid.is_blocked(x, y) for y in range(grid.height) for x in range(grid.width))
+    assert layers.cost[4, 3] == BLOCKED and layers.cost[6, 3] == 1.6 and layers.cost[0, 0] == 1.0
+    assert layers.cells(WALL) == [(x, 4) for x in range(10)]
+    assert int((layers.codes == FOREST).sum()) == 10
+
+    # Derived layers are rebuilt after a change
+    grid.remove_entity(3, 4)
+    assert not grid.layers.blocking[4, 3]
+
+
+def test_layers_are_compact_and_entities_stable():
+    layers = TerrainLayers(1000, 1000)
+    assert layers.nbytes == 1_000_000
+    assert layers.codes.dtype == np.uint8
+
+    layers.set(7, 9, FOREST)
+    first = layers.entity_at(7, 9)
+    assert isinstance(first, Forest) and (first.x_pos, first.y_pos) == (7, 9)
+    assert layers.entity_at(7, 9).color == first.color
+    assert layers.entity_at(8, 9) is None
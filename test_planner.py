@@ -0,0 +1,77 @@
+# test_planner.py
+
+"""
+Unit tests for the budgeted planner API. Every mode must agree with plain
+A* once it completes, intermediate ARA* answers must respect their bound,
+and the per-frame queue must finish its jobs over several steps.
+"""
+
+import random
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.planner import (
+    MODE_ANYTIME,
+    MODE_ASTAR,
+    MODE_BIDIRECTIONAL,
+    PlanningQueue,
+    ara_star_steps,
+    plan_path,
+    search_steps,
+)
+from search_helpers import random_costs
+
+
+def test_every_mode_matches_astar_cost():
+    rng = random.Random(4)
+    for _ in range(60):
+        width, height = rng.randint(3, 20), rng.randint(3, 20)
+        costs = random_costs(rng, width, height, walls=0.3, terrain=0.35)
+        start = (rng.randrange(width), rng.randrange(height))
+        goal = (rng.randrange(width), rng.randrange(height))
+        expected = search(width, height, costs.__getitem__, start, goal)
+        for mode in (MODE_ASTAR, MODE_ANYTIME, MODE_BIDIRECTIONAL):
+            result = plan_path(width, height, costs.__getitem__, start, goal, mode)
+            assert result.complete
+            assert result.found == expected.found
+            if expected.found:
+                assert abs(result.cost - expected.cost) < 1e-9
+                assert result.bound == 1.0
+                assert result.path[0] == start and result.path[-1] == goal
+
+
+def test_anytime_solutions_respect_their_bound():
+    rng = random.Random(8)
+    width = height = 40
+    costs = random_costs(rng, width, height, walls=0.3, terrain=0.35)
+    free = [(i % width, i // width) for i, c in enumerate(costs) if c != BLOCKED]
+    for _ in range(10):
+        start, goal = rng.sample(free, 2)
+        optimal = search(width, height, costs.__getitem__, start, goal).cost
+        bounds = []
+        for result in ara_star_steps(width, height, costs.__getitem__, start, goal, chunk=10):
+            if result.found:
+                assert result.cost <= result.bound * optimal + 1e-9
+                bounds.append(result.bound)
+        # Each pass can only tighten the bound
+        assert bounds == sorted(bounds, reverse=True)
+
+
+def test_queue_finishes_jobs_across_frames():
+    width = height = 30
+    costs = [1.0] * (width * height)
+    queue = PlanningQueue()
+    routes = {}
+    for key, goal in enumerate([(29, 29), (0, 29), (29, 0)]):
+        steps = search_steps(width, height, costs.__getitem__, (0, 0), goal, MODE_ANYTIME)
+        queue.submit(key, steps, lambda result, key=key: routes.__setitem__(key, result))
+    # Resubmitting a key replaces the old job
+    queue.submit(2, search_steps(width, height, costs.__getitem__, (0, 0), (5, 5)), lambda r: routes.__setitem__(2, r))
+    assert len(queue) == 3
+
+    frames = 0
+    while queue and frames < 1000:
+        queue.step(0.05)
+        frames += 1
+    assert not queue
+    assert routes[0].complete and routes[0].cost == 58.0
+    assert routes[2].path[-1] == (5, 5)
@@ -0,0 +1,130 @@
+# test_replanner.py
+
+"""
+Unit tests for the D* Lite incremental replanner. Each repaired route is checked
+against a fresh A* on the same costs, so the incremental bookkeeping has to agree
+with planning from scratch. The simulation repairs the routes of movables that
+opt in.
+"""
+
+import random
+
+import pytest
+
+from grid_sim.astar import BLOCKED, search
+from grid_sim.map_data import MapData, MovableSpawnData, ZoneData
+from grid_sim.replanner import DStarLite
+from grid_sim.simulation import SimulationManager
+
+
+def _fresh_cost(width, height, costs, start, goal):
+    return search(width, height, costs.__getitem__, start, goal).cost
+
+
+def test_initial_plan_matches_astar():
+    # Makes sure the first D* Lite search is as cheap as A*
+    width, height = 8, 6
+    costs = [1.0] * (width * height)
+    for y in range(0, 5):
+        costs[y * width + 4] = BLOCKED
+
+    planner = DStarLite(width, height, costs, (0, 0), (7, 0))
+    path = planner.path()
+
+    assert path[0] == (0, 0) and path[-1] == (7, 0)
+    assert planner.cost_to_goal() == _fresh_cost(width, height, costs, (0, 0), (7, 0))
+
+
+def test_repair_after_new_obstacles_and_moves_matches_astar():
+    # Makes sure repeated cost changes and start moves keep the route optimal
+    rng = random.Random(7)
+    width, height = 12, 12
+    costs = [1.0] * (width * height)
+    start, goal = (0, 0), (11, 11)
+    planner = DStarLite(width, height, costs, start, goal)
+
+    for _ in range(15):
+        path = planner.path()
+        if path is None or len(path) < 2:
+            break
+        start = path[1]
+        planner.move_start(start)
+
+        changes = {}
+        for _ in range(4):
+            cell = (rng.randrange(width), rng.randrange(height))
+            if cell in (start, goal):
+                continue
+            new_cost = BLOCKED if rng.random() < 0.5 else rng.choice([1.0, 2.5, 13.0])
+            changes[cell] = new_cost
+            costs[cell[1] * width + cell[0]] = new_cost
+        planner.update_costs(changes)
+
+        expected = _fresh_cost(width, height, costs, start, goal)
+        if expected == BLOCKED:
+            assert planner.path() is None
+        else:
+            assert planner.cost_to_goal() == pytest.approx(expected)
+
+
+def test_unreachable_goal_returns_none():
+    # Makes sure walling off the goal is reported as no path
+    width, height = 3, 3
+    costs = [1.0] * 9
+    planner = DStarLite(width, height, costs, (0, 0), (2, 2))
+    planner.update_costs({(1, 2): BLOCKED, (2, 1): BLOCKED})
+    assert planner.path() is None
+
+
+def _corner_routes_sim():
+    # Three movables; the first two get an L-shaped route to their objective
+    map_data = MapData(
+        width=20,
+        height=20,
+        start_zone=ZoneData("Start", 1, 1, 4, 4),
+        dest_zone=ZoneData("Objective", 14, 14, 4, 4),
+        movables=[MovableSpawnData(2, 2), MovableSpawnData(2, 4), MovableSpawnData(3, 3)],
+        objective_cells=[(15, 15), (16, 16), (17, 17)],
+    )
+    sim = SimulationManager(map_data)
+    for movable in sim.movables[:2]:
+        goal_x, goal_y = movable.metrics.objective_cell
+        route = [(x, movable.y_pos) for x in range(movable.x_pos + 1, goal_x + 1)]
+        route += [(goal_x, y) for y in range(movable.y_pos + 1, goal_y + 1)]
+        movable.set_planned_path(route)
+    return sim
+
+
+def test_simulation_repairs_routes_of_movables_that_opt_in():
+    # A hand-drawn route to the objective is only repaired around new
+    # fire when the movable opts in
+    sim = _corner_routes_sim()
+    kept, untouched, idle = sim.movables
+    kept.replan_on_fire = True
+    untouched_route = list(untouched.planned_cells)
+
+    sim.start()
+    assert set(sim._replanners) == {id(kept)}
+
+    fire = (8, kept.y_pos)
+    sim.grid.add_fire(*fire)
+    sim._repair_routes([fire])
+    assert fire not in kept.planned_cells and kept.planned_cells[-1] == kept.metrics.objective_cell
+    assert untouched.planned_cells == untouched_route and not idle.planned_cells
+
+
+def test_fire_away_from_the_route_leaves_it_alone():
+    # Makes sure a repair only swaps routes the fire actually reaches
+    sim = _corner_routes_sim()
+    movable = sim.movables[0]
+    goal_x, goal_y = movable.metrics.objective_cell
+    route = [(movable.x_pos, y) for y in range(movable.y_pos + 1, goal_y + 1)]
+    route += [(x, goal_y) for x in range(movable.x_pos + 1, goal_x + 1)]
+    movable.set_planned_path(route)
+    movable.replan_on_fire = True
+
+    sim.start()
+    fire = (9, 5)
+    sim.grid.add_fire(*fire)
+    sim._repair_routes([fire])
+    assert movable.planned_cells == route
@@ -0,0 +1,50 @@
+# test_smoothing.py
+
+"""
+Unit tests for any-angle path smoothing. The supercover must include both
+cells at an exact corner crossing, and every smoothed segment must keep
+line of sight to the blocked cells of the grid.
+"""
+
+from grid_sim.astar import astar
+from grid_sim.entities import Wall
+from grid_sim.grid import Grid
+from grid_sim.smoothing import blocked_mask, line_of_sight, smooth_path, supercover
+
+
+def test_supercover_includes_corner_cells():
+    xs, ys = supercover((0, 0), (2, 2))
+    cells = set(zip(xs.tolist(), ys.tolist()))
+    # A 45-degree segment passes exactly through the corners between cells
+    assert cells == {(0, 0), (1, 0), (0, 1), (1, 1), (2, 1), (1, 2), (2, 2)}
+
+    xs, ys = supercover((3, 1), (0, 1))
+    assert set(zip(xs.tolist(), ys.tolist())) == {(0, 1), (1, 1), (2, 1), (3, 1)}
+
+
+def test_line_of_sight_blocked_by_wall():
+    grid = Grid()
+    grid.add_entity(Wall(5, 5))
+    blocked = blocked_mask(grid)
+
+    assert not line_of_sight(blocked, (2, 5), (8, 5))
+    # Clipping the wall's corner counts as touching it
+    assert not line_of_sight(blocked, (4, 4), (6, 6))
+    assert line_of_sight(blocked, (2, 4), (8, 4))
+
+
+def test_smooth_path_keeps_line_of_sight():
+    open_grid = Grid()
+    corner = [(x, 0) for x in range(6)] + [(5, y) for y in range(1, 6)]
+    assert smooth_path(blocked_mask(open_grid), corner) == [(0, 0), (5, 5)]
+
+    grid = Grid()
+    for y in range(0, 15):
+        grid.add_entity(Wall(8, y))
+    blocked = blocked_mask(grid)
+    cells = astar(grid, (2, 3), (14, 2))
+    waypoints = smooth_path(blocked, cells)
+
+    assert waypoints[0] == (2, 3) and waypoints[-1] == (14, 2)
+    assert len(waypoints) < len(cells)
+    assert all(line_of_sight(blocked, a, b) for a, b in zip(waypoints, waypoints[1:]))
@@ -0,0 +1,80 @@
+# test_viewport.py
+
+"""
+Unit tests for per-map dimensions: grids, generation and loaded maps of
+any size, and the viewport that fits them onto the fixed play area.
+"""
+
+import random
+
+import numpy as np
+
+from grid_sim.config import CELL_SIZE, MIN_CELL_SIZE
+from grid_sim.generation import generate_walls
+from grid_sim.grid import Grid
+from grid_sim.layers import WALL
+from grid_sim.map_data import MapData, MovableSpawnData, ZoneData
+from grid_sim.map_runtime import build_runtime_world
+from grid_sim.metrics import Zone
+from grid_sim.viewport import Viewport
+from grid_sim.wavefront import passability_from_grid, reachable_mask
+
+
+def test_generation_fills_a_non_default_grid():
+    random.seed(3)
+    np.random.seed(3)
+    grid = Grid(120, 70)
+    start = Zone("Start", 1, 1, 4, 4, (0, 0, 0))
+    dest = Zone("Objective", 114, 64, 4, 4, (0, 0, 0))
+    spawns = [(2, 2), (3, 2)]
+    generate_walls(grid, start, dest, spawns)
+
+    assert grid.layers.codes.shape == (70, 120)
+    walls = grid.layers.cells(WALL)
+    assert walls and all(0 <= x < 120 and 0 <= y < 70 for x, y in walls)
+    assert max(x for x, _ in walls) > 100 and max(y for _, y in walls) > 50
+    assert not any(grid.is_blocked(x, y) for x, y in start.all_cells() + dest.all_cells())
+    reachable = reachable_mask(passability_from_grid(grid), [(116, 66)])
+    assert all(reachable[y, x] for x, y in spawns)
+
+    assert grid.in_bounds(119, 69) and not grid.in_bounds(120, 0) and not grid.in_bounds(0, 70)
+
+
+def test_runtime_world_uses_the_map_size():
+    map_data = MapData(
+        width=200,
+        height=40,
+        walls=[(150, 30), (199, 39)],
+        start_zone=ZoneData("Start", 1, 1, 4, 4, (40, 80, 120)),
+        dest_zone=ZoneData("Objective", 190, 30, 4, 4, (80, 120, 40)),
+        movables=[MovableSpawnData(2, 2)],
+        objective_cells=[(191, 31)],
+    )
+    world = build_runtime_world(MapData.from_dict(map_data.to_dict()))
+
+    assert (world.grid.width, world.grid.height) == (200, 40)
+    assert world.grid.is_blocked(199, 39) and world.grid.is_blocked(150, 30)
+    assert not world.grid.is_blocked(191, 31)
+
+
+def test_viewport_scales_then_scrolls():
+    default = Viewport(30, 30)
+    assert default.cell_size == CELL_SIZE and not default.scrolls
+    assert default.rect(2, 3) == (2 * CELL_SIZE, 3 * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+    assert default.to_cell(45, 70) == (2, 3)
+
+    medium = Viewport(100, 100)
+    assert medium.cell_size == 6 and not medium.scrolls and medium.visible_cells() == (0, 0, 100, 100)
+
+    huge = Viewport(2000, 2000)
+    assert huge.cell_size == MIN_CELL_SIZE and huge.scrolls
+    cols, rows = huge.cols, huge.rows
+    huge.pan(-5, 10)
+    assert (huge.x, huge.y) == (0, 10)
+    huge.pan(5000, 5000)
+    assert huge.visible_cells() == (2000 - cols, 2000 - rows, 2000, 2000)
+    assert huge.to_cell(0, 0) == (2000 - cols, 2000 - rows)
+    assert huge.to_cell(cols * MIN_CELL_SIZE, 0) is None
+    assert huge.is_visible(1999, 1999) and not huge.is_visible(0, 0)
+    huge.center_on(1000, 1000)
+    assert huge.is_visible(1000, 1000) and huge.rect(huge.x, huge.y).topleft == (0, 0)
@@ -0,0 +1,89 @@
+# test_wavefront.py
+
+"""
+Unit tests for the vectorized wavefront engine, checked against a plain
+breadth-first search on small random maps.
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+
+from grid_sim.astar import BLOCKED, cost_to_go
+from grid_sim.wavefront import (
+    UNREACHED,
+    bfs_distances,
+    cost_to_go_many,
+    label_components,
+    passability_from_cells,
+    reachable_mask,
+)
+
+
+def reference_bfs(passable, sources):
+    height, width = passable.shape
+    dist = np.full((height, width), UNREACHED)
+    queue = deque()
+    for x, y in sources:
+        if dist[y, x] == UNREACHED:
+            dist[y, x] = 0
+            queue.append((x, y))
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and passable[ny, nx] and dist[ny, nx] == UNREACHED:
+                dist[ny, nx] = dist[y, x] + 1
+                queue.append((nx, ny))
+    return dist
+
+
+def random_passable(rng):
+    width, height = rng.randint(1, 25), rng.randint(1, 25)
+    return np.array([[rng.random() > 0.35 for _ in range(width)] for _ in range(height)])
+
+
+def test_distances_match_reference_bfs():
+    # Multi-source distances equal a cell-by-cell BFS, blocked sources included
+    for seed in range(150):
+        rng = random.Random(seed)
+        passable = random_passable(rng)
+        height, width = passable.shape
+        sources = [(rng.randrange(width), rng.randrange(height)) for _ in range(rng.randint(1, 3))]
+        assert np.array_equal(bfs_distances(passable, sources), reference_bfs(passable, sources)), seed
+
+
+def test_max_distance_and_reachability():
+    # Cells past max_distance are left unreached; the mask covers everything reachable
+    passable = passability_from_cells(10, 1, [(5, 0)])
+    near = bfs_distances(passable, [(0, 0)], max_distance=3)
+    assert near[0].tolist() == [0, 1, 2, 3, -1, -1, -1, -1, -1, -1]
+    assert reachable_mask(passable, [(0, 0)])[0].tolist() == [True] * 5 + [False] * 5
+
+
+def test_components_match_reachability():
+    # Two cells share a label exactly when one is reachable from the other
+    for seed in range(60):
+        rng = random.Random(seed)
+        passable = random_passable(rng)
+        labels, count = label_components(passable)
+        assert count == len(set(labels[passable].tolist()))
+        assert (labels[~passable] == UNREACHED).all()
+        for y, x in zip(*np.nonzero(passable)):
+            mask = reference_bfs(passable, [(x, y)]) != UNREACHED
+            assert np.array_equal(mask, labels == labels[y, x]), seed
+            break
+
+
+def test_batched_cost_to_go_matches_dijkstra():
+    rng = random.Random(21)
+    width, height = 17, 12
+    costs = [BLOCKED if rng.random() < 0.25 else rng.choice((1.0, 1.6, 2.5)) for _ in range(width * height)]
+    targets = [(rng.randrange(width), rng.randrange(height)) for _ in range(6)]
+    # A small batch size forces several batches
+    fields = cost_to_go_many(np.array(costs).reshape(height, width), targets, batch_cells=500)
+    for field, target in zip(fields, targets):
+        expected = np.array(cost_to_go(width, height, costs.__getitem__, [target])).reshape(height, width)
+        assert np.array_equal(np.isinf(field), np.isinf(expected))
+        assert np.allclose(field[np.isfinite(field)], expected[np.isfinite(expected)])